@@ -0,0 +1,89 @@
+"""
+Micro-benchmark of the LaTeX to Markdown inline conversion.
+
+Compares latex_inline_to_markdown with the chain of regular expression
+substitutions it replaced in make_lines_iterator, on long lines full of
+braces.
+
+    python benchmarks/bench_inline_markup.py --lines 2000 --commands 40
+"""
+from pathlib import Path
+import argparse
+import random
+import re
+import sys
+import timeit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cv_migrator.old_text_to_yaml import latex_inline_to_markdown
+
+
+# The substitutions the converter chained on every line before
+# latex_inline_to_markdown replaced them, in the same order.
+CHAIN = (
+    (r'\\textbf\{(.*?)\}', r'**\1**'),
+    (r'\\textit\{(.*?)\}', r'*\1*'),
+    (r'\\underline\{(.*?)\}', r'**\1**'),
+    (r'\$\^\{(.*?)\}\$', r'^\1^'),
+    (r'\\href\{(.*?)\}\{(.*?)\}', r'[\2](\1)'),
+)
+
+
+def chained_conversion(line: str) -> str:
+    """The five-pass conversion previously done for every line."""
+    for pattern, replacement in CHAIN:
+        line = re.sub(pattern, replacement, line)
+    return line
+
+
+def make_line(rng: random.Random, commands: int) -> str:
+    """Builds a long line mixing inline commands, plain groups and text."""
+    pieces = []
+    for _ in range(commands):
+        choice = rng.randrange(7)
+        word = "word" * rng.randint(1, 4)
+        if choice == 0:
+            pieces.append(f"\\textbf{{{word}}}")
+        elif choice == 1:
+            pieces.append(f"\\textit{{{word}}}")
+        elif choice == 2:
+            pieces.append(f"\\underline{{{word}}}")
+        elif choice == 3:
+            pieces.append(f"$^{{{rng.randint(1, 99)}}}$")
+        elif choice == 4:
+            pieces.append(f"\\href{{https://doi.org/{rng.randint(1, 9999)}}}{{{word}}}")
+        elif choice == 5:
+            pieces.append(f"{{{word}}} {{}}")
+        else:
+            pieces.append(f"plain text, {word};")
+    return " ".join(pieces)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=2000, help="Lines per run.")
+    parser.add_argument("--commands", type=int, default=40, help="Inline commands per line.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    lines = [make_line(rng, args.commands) for _ in range(args.lines)]
+    total_chars = sum(len(line) for line in lines)
+
+    results = {}
+    for name, function in (("chain", chained_conversion), ("single-pass", latex_inline_to_markdown)):
+        best = min(timeit.repeat(lambda: [function(line) for line in lines],
+                                 number=1, repeat=args.repeat))
+        results[name] = best
+        print(f"{name:>12}: {args.lines / best:12.0f} lines/s  "
+              f"{total_chars / best / 1e6:8.2f} MB/s")
+
+    speedup = results["chain"] / results["single-pass"]
+    print(f"{'speedup':>12}: {speedup:.2f}x")
+    return 0 if speedup >= 1 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Startup check of the cv-migrator command line.
+
+Runs `cv-migrator --help` in fresh interpreters and fails if it imports a
+heavy module (PyYAML, the optional backends or the converters themselves)
+or if its median wall time exceeds a budget:
+
+    python benchmarks/check_startup.py
+    python benchmarks/check_startup.py --max-ms 150 --runs 20
+"""
+from pathlib import Path
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules that `cv-migrator --help` must not import.
+HEAVY_MODULES = ("yaml", "msgpack", "numpy", "cv_migrator.old_text_to_yaml",
+                 "cv_migrator.yaml_to_text", "cv_migrator.yaml_backend", "cv_migrator.cv_model",
+                 "cv_migrator.emitters", "cv_migrator.cv_index", "cv_migrator.cv_dedup",
+                 "sqlite3")
+
+
+def imported_modules(command: list[str]) -> set[str]:
+    """
+    Returns the modules imported by command, and their top-level packages,
+    from -X importtime.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", *command], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    modules = set()
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and line.count("|") == 2:
+            name = line.rsplit("|", 1)[1].strip()
+            modules.update((name, name.split(".")[0]))
+    return modules
+
+
+def median_ms(command: list[str], runs: int) -> float:
+    """Returns the median wall time of command, in milliseconds."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *command], cwd=ROOT, stdout=subprocess.DEVNULL,
+                       check=True)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check that cv-migrator --help starts fast.")
+    parser.add_argument("--runs", type=int, default=10, help="Timed runs (default: 10).")
+    parser.add_argument("--max-ms", type=float, default=200.0,
+                        help="Budget for the median run, in milliseconds (default: 200).")
+    args = parser.parse_args(argv)
+
+    command = ["-m", "cv_migrator", "--help"]
+    heavy = sorted(imported_modules(command) & set(HEAVY_MODULES))
+    baseline = median_ms(["-c", "pass"], args.runs)
+    elapsed = median_ms(command, args.runs)
+    print(f"cv-migrator --help: {elapsed:.1f} ms median "
+          f"(bare interpreter {baseline:.1f} ms, budget {args.max_ms:.0f} ms)")
+
+    failed = False
+    if heavy:
+        print(f"FAIL: --help imports {', '.join(heavy)}")
+        failed = True
+    if elapsed > args.max_ms:
+        print(f"FAIL: --help is over budget by {elapsed - args.max_ms:.1f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
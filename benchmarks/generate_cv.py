@@ -0,0 +1,213 @@
+"""
+Generator of synthetic moderncv documents for benchmarks.
+
+    python benchmarks/generate_cv.py out.tex --language es --entries 50 --transcript-rows 200
+"""
+from dataclasses import dataclass
+from pathlib import Path
+import argparse
+import random
+import sys
+
+
+# Section name, list section flag and (subsection name, entry kind) pairs.
+SECTIONS = {
+    "en": [
+        ("Education", False, [("Degrees", "education")]),
+        ("Experience", False, [("Research Experience", "education"),
+                               ("Teaching and Mentoring Experience", "education")]),
+        ("Production", False, [("Publications", "publication"),
+                               ("Posters and Oral Presentations", "poster"),
+                               ("Outreach Experience", "poster")]),
+        ("Participation in Conferences and Schools", True, [(None, "course")]),
+        ("Languages", False, [("International Exams", "language_exam")]),
+    ],
+    "es": [
+        ("Educación", False, [("Títulos", "education")]),
+        ("Experiencia", False, [("Investigación", "education"),
+                                ("Docencia y Formación", "education")]),
+        ("Producción", False, [("Publicaciones", "publication"),
+                               ("Posters y Presentaciones Orales", "poster"),
+                               ("Divulgación Científica", "poster")]),
+        ("Cursos y Congresos", True, [(None, "course")]),
+        ("Idiomas", False, [("Exámenes Internacionales", "language_exam")]),
+    ],
+}
+
+TRANSCRIPT = {
+    "en": ("University Transcript", "Assignment & Grade & Duration"),
+    "es": ("Resumen de Certificado Analítico", "Asignatura & Nota & Duración"),
+}
+
+WORDS = {
+    "en": ("analysis microscopy protein dynamics cell imaging fluorescence model "
+           "quantitative single molecule study of the in with and signalling").split(),
+    "es": ("análisis microscopía proteína dinámica célula imágenes fluorescencia "
+           "modelo cuantitativo estudio de la en con y señalización").split(),
+}
+SURNAMES = "Corbat Pérez Smith García Müller Rossi Dupont Silva Ivanova Tanaka".split()
+PLACES = ["Buenos Aires", "Trieste, Italy", "Heidelberg, Germany", "Paris, France", "Córdoba"]
+
+
+@dataclass
+class CVConfig:
+    """Shape of a generated document."""
+    language: str = "en"
+    sections: int = 5
+    entries: int = 10
+    href_density: float = 0.2
+    bold_density: float = 0.2
+    multiline_fraction: float = 0.2
+    transcript_rows: int = 0
+    seed: int = 0
+
+
+def _sentence(rng: random.Random, config: CVConfig, words: int) -> str:
+    pieces = []
+    for _ in range(words):
+        word = rng.choice(WORDS[config.language])
+        roll = rng.random()
+        if roll < config.bold_density:
+            word = f"\\textbf{{{word}}}"
+        elif roll < config.bold_density + config.href_density:
+            word = f"\\href{{https://doi.org/10.{rng.randint(1000, 9999)}/{rng.randint(1, 99999)}}}{{{word}}}"
+        pieces.append(word)
+    return " ".join(pieces)
+
+
+def _authors(rng: random.Random) -> str:
+    authors = [f"{chr(rng.randint(65, 90))}. {rng.choice(SURNAMES)}"
+               for _ in range(rng.randint(1, 8))]
+    authors[rng.randrange(len(authors))] = "\\underline{A. Corbat}"
+    return ", ".join(authors)
+
+
+def _description(rng: random.Random, config: CVConfig) -> str:
+    if rng.random() < config.multiline_fraction:
+        return " \\\\\n    ".join(_sentence(rng, config, rng.randint(5, 15))
+                                   for _ in range(rng.randint(2, 6)))
+    return _sentence(rng, config, rng.randint(0, 12))
+
+
+def _cventry(rng: random.Random, config: CVConfig, kind: str) -> str:
+    year = rng.randint(2000, 2025)
+    date = f"{year}" if rng.random() < 0.5 else f"{year}--{year + rng.randint(1, 5)}"
+    title = _sentence(rng, config, rng.randint(3, 10)) or "Untitled"
+    description = _description(rng, config)
+    if kind == "education":
+        fields = [date, title, rng.choice(["UBA", "FCEN", "CONICET"]), rng.choice(PLACES),
+                  "", description]
+    elif kind == "publication":
+        fields = [date, title, f"Journal of {rng.choice(WORDS['en']).title()}",
+                  _authors(rng), "", description]
+    elif kind == "poster":
+        fields = [date, title, f"Meeting on {rng.choice(WORDS['en'])}", _authors(rng),
+                  "", description]
+    elif kind == "course":
+        language = "Language: English" if rng.random() < 0.5 else ""
+        fields = [date, title, f"{rng.randint(4, 120)} hs", rng.choice(PLACES), language,
+                  description]
+    elif kind == "language_exam":
+        fields = [date, rng.choice(["FCE", "CAE", "TOEFL", "DELF"]), "", "", "", description]
+    else:
+        fields = [date, title, rng.choice(["UBA", "CONICET"]), rng.choice(PLACES), "",
+                  description]
+    return "\\cventry" + "".join("{" + field + "}" for field in fields)
+
+
+def generate_cv(config: CVConfig) -> str:
+    """
+    Builds a synthetic moderncv document.
+
+    The first sections are the built-in ones of the language, in order;
+    sections beyond them are extra sections with generic entries.
+
+    Args:
+        config: Shape of the document.
+
+    Returns:
+        The LaTeX source.
+    """
+    rng = random.Random(config.seed)
+    lines = [
+        "\\documentclass[11pt,a4paper,sans]{moderncv}",
+        "\\moderncvstyle{classic}",
+        "\\name{Agustin}{Corbat}",
+        "\\title{Curriculum Vitae}",
+        "\\begin{document}",
+        "\\makecvtitle",
+        "",
+    ]
+
+    known = SECTIONS[config.language]
+    for index in range(config.sections):
+        if index < len(known):
+            name, is_list, subsections = known[index]
+        else:
+            name, is_list, subsections = f"Extra Section {index}", False, [("Items", "generic")]
+        lines.append(f"\\section{{{name}}}")
+        for subsection, kind in subsections:
+            if not is_list:
+                lines.append(f"\\subsection{{{subsection}}}")
+            lines.extend(_cventry(rng, config, kind) for _ in range(config.entries))
+        if name in ("Languages", "Idiomas"):
+            lines.append("\\cvitemwithcomment{English}{Advanced}{}")
+        lines.append("% " + _sentence(rng, config, 4))
+        lines.append("")
+
+    if config.transcript_rows:
+        title, header = TRANSCRIPT[config.language]
+        lines.append(f"\\title{{{title}}}")
+        lines.append(f"\\section{{{rng.choice(WORDS[config.language]).title()}}}")
+        lines.append("\\begin{tabular}{lll}")
+        lines.append(header + " \\\\ \\hline")
+        for row in range(config.transcript_rows):
+            grade = rng.randint(4, 10)
+            if rng.random() < 0.8:
+                lines.append(f"Subject {row} & {grade} & {rng.randint(2, 16) * 8} hs \\\\ \\hline")
+            else:
+                lines.append(f"Subject {row} & {grade} \\\\ \\hline")
+        lines.append("\\end{tabular}")
+
+    lines.append("\\end{document}")
+    return "\n".join(lines) + "\n"
+
+
+def count_entries(tex: str) -> int:
+    """Returns the number of \\cventry commands and transcript rows in a document."""
+    headers = tuple(header for _, header in TRANSCRIPT.values())
+    rows = sum(1 for line in tex.splitlines()
+               if " & " in line and not line.startswith(headers))
+    return tex.count("\\cventry") + rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic moderncv document.")
+    parser.add_argument("output", type=Path, help="Path of the .tex file to write, or -.")
+    parser.add_argument("--language", choices=sorted(SECTIONS), default="en")
+    parser.add_argument("--sections", type=int, default=5)
+    parser.add_argument("--entries", type=int, default=10,
+                        help="\\cventry items per subsection.")
+    parser.add_argument("--href-density", type=float, default=0.2,
+                        help="Probability of a word being a \\href.")
+    parser.add_argument("--bold-density", type=float, default=0.2,
+                        help="Probability of a word being in \\textbf.")
+    parser.add_argument("--multiline-fraction", type=float, default=0.2,
+                        help="Fraction of entries with multi-line descriptions.")
+    parser.add_argument("--transcript-rows", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    config = CVConfig(args.language, args.sections, args.entries, args.href_density,
+                      args.bold_density, args.multiline_fraction, args.transcript_rows,
+                      args.seed)
+    tex = generate_cv(config)
+    if str(args.output) == "-":
+        sys.stdout.write(tex)
+    else:
+        args.output.write_text(tex, encoding="utf8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""
+Benchmarks of both conversion directions on synthetic CVs.
+
+Measures convert_tex_to_yaml, convert_yaml_to_tex and the full round trip in
+lines/s and entries/s, optionally saving the results as a baseline or
+comparing them against one:
+
+    python benchmarks/run_benchmarks.py --save-baseline benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --compare benchmarks/baseline.json
+"""
+from pathlib import Path
+import argparse
+import json
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from generate_cv import CVConfig, count_entries, generate_cv
+from cv_migrator.old_text_to_yaml import convert_tex_to_yaml
+from cv_migrator.yaml_to_text import convert_yaml_to_tex
+
+
+# Name -> document shape.
+SCENARIOS = {
+    "small-en": CVConfig(language="en", sections=5, entries=5),
+    "medium-es": CVConfig(language="es", sections=8, entries=40, multiline_fraction=0.3),
+    "large-en": CVConfig(language="en", sections=12, entries=200, href_density=0.3,
+                         bold_density=0.3, multiline_fraction=0.3),
+    "transcript-es": CVConfig(language="es", sections=1, entries=5, transcript_rows=5000),
+}
+
+
+def best_time(function, repeat: int) -> float:
+    """Returns the fastest of several runs of function, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_scenario(config: CVConfig, workdir: Path, repeat: int) -> dict:
+    """
+    Benchmarks one document shape.
+
+    Returns:
+        A mapping from measured direction to its seconds, lines/s and entries/s.
+    """
+    tex = generate_cv(config)
+    lines = tex.count("\n")
+    entries = count_entries(tex)
+
+    tex_path = workdir / "main.tex"
+    tex_path.write_text(tex, encoding="utf8")
+    yaml_path = tex_path.with_suffix(".yaml")
+    convert_tex_to_yaml(tex_path)
+
+    # convert_yaml_to_tex writes next to its input, so it gets its own copy
+    # to keep the generated .tex intact.
+    roundtrip_dir = workdir / "roundtrip"
+    roundtrip_dir.mkdir(exist_ok=True)
+    roundtrip_yaml = roundtrip_dir / "main.yaml"
+    shutil.copy(yaml_path, roundtrip_yaml)
+    yaml_lines = yaml_path.read_text(encoding="utf8").count("\n")
+
+    def roundtrip():
+        convert_tex_to_yaml(tex_path)
+        shutil.copy(yaml_path, roundtrip_yaml)
+        convert_yaml_to_tex(roundtrip_yaml)
+
+    timings = {
+        "to-yaml": (best_time(lambda: convert_tex_to_yaml(tex_path), repeat), lines),
+        "to-tex": (best_time(lambda: convert_yaml_to_tex(roundtrip_yaml), repeat), yaml_lines),
+        "roundtrip": (best_time(roundtrip, repeat), lines),
+    }
+    return {
+        direction: {
+            "seconds": seconds,
+            "lines_per_sec": line_count / seconds,
+            "entries_per_sec": entries / seconds,
+        }
+        for direction, (seconds, line_count) in timings.items()
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Lists the measurements whose entries/s dropped more than threshold
+    (a fraction) below the baseline.
+    """
+    regressions = []
+    for scenario, directions in results.items():
+        for direction, metrics in directions.items():
+            reference = baseline.get(scenario, {}).get(direction)
+            if not reference:
+                continue
+            change = metrics["entries_per_sec"] / reference["entries_per_sec"] - 1
+            if change < -threshold:
+                regressions.append(f"{scenario} {direction}: {change:+.1%} entries/s")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark both conversion directions.")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="Scenario to run; may be repeated (default: all).")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement.")
+    parser.add_argument("--save-baseline", type=Path, default=None,
+                        help="Write the results to this JSON file.")
+    parser.add_argument("--compare", type=Path, default=None,
+                        help="Baseline JSON file to compare the results with.")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="Slowdown fraction reported as a regression (default: 0.15).")
+    args = parser.parse_args(argv)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in args.scenario or SCENARIOS:
+            workdir = Path(tmp) / name
+            workdir.mkdir()
+            results[name] = run_scenario(SCENARIOS[name], workdir, args.repeat)
+            for direction, metrics in results[name].items():
+                print(f"{name:>14} {direction:>9}: {metrics['seconds'] * 1000:9.2f} ms "
+                      f"{metrics['lines_per_sec']:10.0f} lines/s "
+                      f"{metrics['entries_per_sec']:9.0f} entries/s")
+
+    if args.save_baseline:
+        report = {"python": platform.python_version(), "results": results}
+        args.save_baseline.write_text(json.dumps(report, indent=2) + "\n", encoding="utf8")
+        print(f"Saved baseline to {args.save_baseline}.")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf8"))["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print(f"No regressions above {args.threshold:.0%} against {args.compare}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
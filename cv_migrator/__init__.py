@@ -0,0 +1,6 @@
+"""
+Migrate moderncv LaTeX CVs to YAML and back.
+
+The command line is cv_migrator.cli; each tool lives in its own module and
+is imported only when used.
+"""
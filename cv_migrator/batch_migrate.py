@@ -0,0 +1,383 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+from pathlib import Path
+import argparse
+import glob
+import os
+import sys
+import time
+
+from . import profiling
+from .conversion_cache import DEFAULT_MAX_AGE, DEFAULT_MAX_BYTES, ConversionCache, write_atomic
+from .diagnostics import Diagnostics
+from .emitters import FORMATS, get_emitter
+from .old_text_to_yaml import convert_tex_to_yaml, parse_tex_file
+from .section_registry import load_registry_config
+from .tex_includes import GRAPH_FILENAME, IncludeGraph, IncludeResolver, fingerprint_files
+from .yaml_backend import BACKENDS, set_backend
+from .yaml_to_text import convert_yaml_to_tex
+
+
+# Direction -> (input suffix, output suffix, converter)
+DIRECTIONS = {
+    "to-yaml": (".tex", ".yaml", convert_tex_to_yaml),
+    "to-tex": (".yaml", ".tex", convert_yaml_to_tex),
+}
+
+
+def collect_input_files(inputs, direction: str, pattern: str = None) -> list[Path]:
+    """
+    Expands files, directories and glob patterns into the list of files to convert.
+
+    Args:
+        inputs: Paths to files or directories, or glob patterns.
+        direction: Either "to-yaml" or "to-tex"; selects the input suffix.
+        pattern: Glob pattern used inside directories. Defaults to main*.tex
+            or main*.yaml depending on the direction.
+
+    Returns:
+        A sorted list of unique input files.
+    """
+    suffix = DIRECTIONS[direction][0]
+    if pattern is None:
+        pattern = "main*" + suffix
+
+    files = set()
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            files.update(p for p in path.glob(pattern) if p.is_file())
+        elif path.is_file():
+            files.add(path)
+        else:
+            matches = glob.glob(item, recursive=True)
+            if not matches:
+                print(f"Warning: {item} did not match any file.", file=sys.stderr)
+            files.update(Path(match) for match in matches if Path(match).is_file())
+    return sorted(files)
+
+
+def init_worker(sections_config: Path = None, yaml_backend: str = "auto"):
+    """
+    Prepares a worker process: loads the sections config and selects the
+    YAML backend.
+    """
+    if sections_config:
+        load_registry_config(sections_config)
+    set_backend(yaml_backend)
+
+
+def convert_file(filepath: Path, direction: str, cache: ConversionCache = None,
+                 cache_extra: bytes = b"", compact: bool = False, output_format: str = "yaml",
+                 dependencies: list[Path] = None, keep_going: bool = False,
+                 update: bool = False):
+    """
+    Converts a single file inside a worker process.
+
+    Args:
+        filepath: Path to the file to convert.
+        direction: Either "to-yaml" or "to-tex".
+        cache: Cache to look the output up in and store it to, if any.
+        cache_extra: Extra bytes the output depends on, added to the cache key.
+        compact: Write repeated strings as YAML aliases (to-yaml only).
+        output_format: Output format of emitters.py (to-yaml only).
+        dependencies: The files the input includes, whose content is part
+            of the cache key, or None if unknown; the cache is then only
+            filled.
+        keep_going: Leave out the entries that fail to parse and record
+            them instead of failing the file (to-yaml only).
+        update: Rewrite only the sections of the existing output that
+            changed (to-tex only).
+
+    Returns:
+        A tuple with the file path, whether it succeeded, the elapsed time in
+        seconds, an error message (empty on success), the cache status:
+        "hit", "unchanged" (hit and the output was already up to date),
+        "miss", or "" when no cache is used, and the files included by each
+        file read (IncludeResolver.includes), or None if it was not parsed,
+        and the failures recorded with keep_going (diagnostics.Diagnostic).
+    """
+    start = time.perf_counter()
+    _, output_suffix, convert = DIRECTIONS[direction]
+    if compact:
+        convert = partial(convert, compact=True)
+    if output_format != "yaml":
+        convert = partial(convert, output_format=output_format)
+        output_suffix = get_emitter(output_format).suffix
+    if update:
+        convert = partial(convert, update=True)
+    resolver = None
+    diagnostics = Diagnostics() if keep_going else None
+    if direction == "to-yaml":
+        # Included files are parsed in this process: the batch is already
+        # spread over the workers.
+        resolver = IncludeResolver(filepath, parse_tex_file, workers=1)
+        convert = partial(convert, resolver=resolver, diagnostics=diagnostics)
+    status = ""
+    try:
+        if cache is None:
+            convert(filepath)
+        else:
+            output_path = filepath.with_suffix(output_suffix)
+            data = filepath.read_bytes()
+            cached = None
+            if dependencies is not None:
+                key = cache.key(data, direction, cache_extra + fingerprint_files(dependencies))
+                cached = cache.get(key)
+            if cached is None:
+                status = "miss"
+                convert(filepath)
+                if resolver is not None:
+                    dependencies = resolver.files()
+                # An output that leaves entries out is not cached, so that
+                # the next run reports them again.
+                if not diagnostics:
+                    key = cache.key(data, direction,
+                                    cache_extra + fingerprint_files(dependencies))
+                    cache.put(key, output_path.read_bytes())
+            elif output_path.is_file() and output_path.read_bytes() == cached:
+                status = "unchanged"
+            else:
+                status = "hit"
+                write_atomic(output_path, cached)
+    except (Exception, SystemExit) as e:
+        # convert_yaml_to_tex calls sys.exit on malformed YAML; report it
+        # as a failure instead of letting it take down the worker.
+        if diagnostics is not None and isinstance(e, Exception):
+            # The file could not be parsed at all, such as for an unclosed brace.
+            diagnostics.record(e, filepath, getattr(e, "line_number", None))
+        return (filepath, False, time.perf_counter() - start, f"{type(e).__name__}: {e}", status,
+                None, diagnostics.records if diagnostics is not None else [])
+    includes = resolver.includes if resolver is not None and status in ("", "miss") else None
+    return (filepath, True, time.perf_counter() - start, "", status, includes,
+            diagnostics.records if diagnostics is not None else [])
+
+
+def convert_files(filepaths: list[Path], dependencies: list, *args, **kwargs) -> list[tuple]:
+    """
+    Converts files one after the other in a worker process, so that the
+    files they include are parsed once for all of them.
+
+    Args:
+        filepaths: Paths to the files to convert.
+        dependencies: The dependencies of each file, as in convert_file.
+        args: The other arguments of convert_file, after filepath and
+            direction included.
+        kwargs: Keyword arguments of convert_file, such as keep_going.
+
+    Returns:
+        The results of convert_file.
+    """
+    return [convert_file(filepath, *args, dependencies=file_dependencies, **kwargs)
+            for filepath, file_dependencies in zip(filepaths, dependencies)]
+
+
+def group_by_includes(files: list[Path], graph: IncludeGraph) -> list[list[Path]]:
+    """
+    Groups the documents that include a file in common, according to the
+    include graph, so that one worker converts them together.
+    """
+    parent = list(range(len(files)))
+
+    def root(index):
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    first_includer = {}
+    for index, filepath in enumerate(files):
+        for dependency in graph.dependencies(filepath) or ():
+            parent[root(index)] = root(first_includer.setdefault(dependency, index))
+    groups = {}
+    for index, filepath in enumerate(files):
+        groups.setdefault(root(index), []).append(filepath)
+    return list(groups.values())
+
+
+def migrate(files: list[Path], direction: str = "to-yaml", workers: int = None,
+            sections_config: Path = None, cache: ConversionCache = None,
+            yaml_backend: str = "auto", compact: bool = False,
+            output_format: str = "yaml", graph: IncludeGraph = None,
+            diagnostics: Diagnostics = None, update: bool = False) -> int:
+    """
+    Converts files in parallel, printing a summary line per file.
+
+    The pool keeps one interpreter per worker alive for the whole batch,
+    so modules and compiled regexes are loaded once per worker instead of
+    once per file. Documents that the include graph says share an included
+    file are converted by the same worker, which parses that file once.
+
+    Args:
+        files: The files to convert.
+        direction: Either "to-yaml" or "to-tex".
+        workers: Number of worker processes. Defaults to the CPU count.
+        sections_config: Optional sections config file loaded in every worker.
+        cache: Cache of outputs; files whose input is unchanged are served
+            from it instead of being converted again.
+        yaml_backend: YAML backend used by the workers.
+        compact: Write repeated authors, venues and locations as YAML
+            aliases (to-yaml only).
+        output_format: Output format of emitters.py (to-yaml only).
+        graph: Files included by the documents in earlier runs (to-yaml
+            with a cache only); it is updated and saved.
+        diagnostics: Leave out the entries that fail to parse and record
+            them, and the files that fail, there (to-yaml only).
+        update: Rewrite only the sections of the existing .tex files that
+            changed (to-tex only). Their content is part of the cache key.
+
+    Returns:
+        The number of files that failed to convert.
+    """
+    if not files:
+        print("No files to convert.")
+        return 0
+
+    if direction != "to-yaml":
+        # An update depends on the .tex it starts from.
+        dependencies = {filepath: [filepath.with_suffix(".tex")] if update else []
+                        for filepath in files}
+        groups = [[filepath] for filepath in files]
+    elif graph is not None:
+        dependencies = {filepath: graph.dependencies(filepath) for filepath in files}
+        groups = group_by_includes(files, graph)
+    else:
+        dependencies = {filepath: None for filepath in files}
+        groups = [[filepath] for filepath in files]
+
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, len(groups))
+    failures = 0
+    cache_counts = {"hit": 0, "unchanged": 0, "miss": 0}
+    cache_extra = Path(sections_config).read_bytes() if sections_config else b""
+    if compact:
+        cache_extra += b"\0compact"
+    if output_format != "yaml":
+        cache_extra += b"\0format=" + output_format.encode()
+    if update:
+        cache_extra += b"\0update"
+    keep_going = diagnostics is not None
+    start = time.perf_counter()
+
+    if workers == 1:
+        init_worker(sections_config, yaml_backend)
+        results = (convert_file(filepath, direction, cache, cache_extra, compact,
+                                output_format, dependencies[filepath], keep_going, update)
+                   for filepath in files)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                       initargs=(sections_config, yaml_backend))
+        futures = [executor.submit(convert_files, group,
+                                   [dependencies[filepath] for filepath in group],
+                                   direction, cache, cache_extra, compact, output_format,
+                                   keep_going=keep_going, update=update)
+                   for group in groups]
+        results = (result for future in as_completed(futures) for result in future.result())
+
+    try:
+        for filepath, ok, elapsed, error, status, includes, records in results:
+            if includes is not None and graph is not None:
+                graph.record(filepath, includes)
+            if status:
+                cache_counts[status] += 1
+            details = f"{elapsed * 1000:.1f} ms" + (f", cache {status}" if status else "")
+            if diagnostics is not None:
+                diagnostics.extend(records)
+                if ok and records:
+                    details += f", {len(records)} failed entries left out"
+            if ok:
+                print(f"[ OK ] {filepath} ({details})")
+            else:
+                failures += 1
+                print(f"[FAIL] {filepath} ({details}): {error}")
+    finally:
+        if workers > 1:
+            executor.shutdown()
+        if graph is not None:
+            graph.save()
+
+    total = time.perf_counter() - start
+    print(f"Converted {len(files) - failures}/{len(files)} files in {total:.2f} s "
+          f"using {workers} worker(s).")
+    if cache is not None:
+        hits = cache_counts["hit"] + cache_counts["unchanged"]
+        removed, removed_bytes = cache.evict()
+        print(f"Cache: {hits} hit(s) ({cache_counts['unchanged']} already up to date), "
+              f"{cache_counts['miss']} miss(es); evicted {removed} entries "
+              f"({removed_bytes / 1024:.0f} KiB).")
+    return failures
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Convert many CV files in parallel.")
+    parser.add_argument("inputs", nargs="+",
+                        help="Files, directories or glob patterns to convert. A file included "
+                             "by documents converted before rebuilds those documents.")
+    parser.add_argument("--direction", choices=sorted(DIRECTIONS), default="to-yaml",
+                        help="Conversion direction (default: to-yaml).")
+    parser.add_argument("--pattern", default=None,
+                        help="Glob used inside directories (default: main*.tex or main*.yaml).")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="Number of worker processes (default: CPU count).")
+    parser.add_argument("--sections-config", type=Path, default=None,
+                        help="YAML or JSON file registering extra sections.")
+    parser.add_argument("--yaml-backend", choices=BACKENDS, default="auto",
+                        help="YAML backend: libyaml when available (auto), or force one.")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Convert every file, without reading or filling the cache.")
+    parser.add_argument("--cache-dir", type=Path, default=None,
+                        help="Cache directory (default: ~/.cache/cv_migrator).")
+    parser.add_argument("--cache-max-size", type=float, default=DEFAULT_MAX_BYTES / 2**20,
+                        help="Evict least recently used entries above this size in MiB "
+                             "(default: %(default).0f).")
+    parser.add_argument("--cache-max-age", type=float, default=DEFAULT_MAX_AGE / 86400,
+                        help="Evict entries unused for this many days (default: %(default).0f).")
+    parser.add_argument("--compact", action="store_true",
+                        help="Write repeated authors, venues and locations as YAML aliases "
+                             "(to-yaml only).")
+    parser.add_argument("--format", choices=FORMATS, default="yaml",
+                        help="Output format for to-yaml (default: yaml). to-tex reads any "
+                             "format, chosen by file suffix; use --pattern to select the files.")
+    parser.add_argument("--keep-going", nargs="?", const="-", default=None, metavar="REPORT",
+                        help="Leave out the entries that fail to parse instead of failing the "
+                             "file, and write a JSON report of every failure to REPORT "
+                             "(default: stderr) (to-yaml only).")
+    parser.add_argument("--update", action="store_true",
+                        help="Rewrite only the sections of existing .tex files that changed, "
+                             "keeping their preamble and formatting (to-tex only).")
+    args = parser.parse_args(argv)
+    if args.compact and (args.direction != "to-yaml" or args.format != "yaml"):
+        parser.error("--compact only applies to --direction to-yaml with --format yaml.")
+    if args.format != "yaml" and args.direction != "to-yaml":
+        parser.error("--format only applies to --direction to-yaml.")
+    if args.keep_going is not None and args.direction != "to-yaml":
+        parser.error("--keep-going only applies to --direction to-yaml.")
+    if args.update and args.direction != "to-tex":
+        parser.error("--update only applies to --direction to-tex.")
+    try:
+        get_emitter(args.format)
+    except ValueError as e:
+        parser.error(str(e))
+
+    cache = None
+    graph = None
+    if not args.no_cache:
+        cache = ConversionCache(args.cache_dir, max_bytes=int(args.cache_max_size * 2**20),
+                                max_age=args.cache_max_age * 86400)
+        if args.direction == "to-yaml":
+            graph = IncludeGraph.load(cache.directory / GRAPH_FILENAME)
+
+    files = collect_input_files(args.inputs, args.direction, args.pattern)
+    if graph is not None:
+        files = graph.documents_to_rebuild(files)
+    diagnostics = Diagnostics() if args.keep_going is not None else None
+    failures = migrate(files, args.direction, args.workers, args.sections_config, cache,
+                       args.yaml_backend, args.compact, args.format, graph, diagnostics,
+                       args.update)
+    if diagnostics is not None:
+        profiling.write_report(diagnostics.report(files=len(files)), args.keep_going)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+The cv-migrator command line.
+
+Every tool of the project is a subcommand, implemented by the main function
+of its module:
+
+    cv-migrator to-yaml main.tex --format json
+    cv-migrator to-tex main.yaml
+    cv-migrator batch ./CV_A_corbat --workers 8
+    cv-migrator index query cvs.sqlite --author Corbat
+    cv-migrator <command> --help
+
+Modules are imported only once their subcommand is chosen, so PyYAML and the
+optional backends are loaded only by the commands that need them and
+`cv-migrator --help` starts fast. benchmarks/check_startup.py keeps it so.
+"""
+import argparse
+import importlib
+import sys
+
+
+PROG = "cv-migrator"
+
+# Subcommand: (module with a main(argv, prog) function, help).
+COMMANDS = {
+    "to-yaml": ("old_text_to_yaml", "Convert a LaTeX CV to YAML, JSON, JSON Lines or MessagePack."),
+    "to-tex": ("yaml_to_text", "Convert a YAML (or JSON, JSON Lines, MessagePack) CV to LaTeX."),
+    "batch": ("batch_migrate", "Convert many CV files in parallel."),
+    "watch": ("watch_mode", "Reconvert CV files when they change."),
+    "worker": ("cv_worker", "Run a long-lived conversion worker."),
+    "transcript": ("transcript", "Extract and summarize transcript tables."),
+    "index": ("cv_index", "Index CV entries in SQLite and query them."),
+    "dedup": ("cv_dedup", "Find duplicate publications and posters across CVs."),
+}
+
+
+def _version() -> str:
+    from importlib.metadata import PackageNotFoundError, version
+    try:
+        return version(PROG)
+    except PackageNotFoundError:
+        return "unknown (not installed)"
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Builds the top-level parser, which only picks the subcommand."""
+    commands = "\n".join(f"  {name:<12}{help}" for name, (_, help) in COMMANDS.items())
+    parser = argparse.ArgumentParser(
+        prog=PROG,
+        description="Migrate moderncv LaTeX CVs to YAML and back.",
+        epilog=f"commands:\n{commands}\n\nRun '{PROG} <command> --help' for the options "
+               "of a command.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--version", action="store_true", help="Show the version and exit.")
+    parser.add_argument("command", nargs="?", choices=COMMANDS, metavar="command",
+                        help="One of the commands below.")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.version:
+        print(f"{PROG} {_version()}")
+        return 0
+    if args.command is None:
+        parser.print_help()
+        return 2
+
+    module_name, _ = COMMANDS[args.command]
+    module = importlib.import_module(f".{module_name}", __package__)
+    return module.main(args.args, prog=f"{PROG} {args.command}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
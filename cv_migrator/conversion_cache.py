@@ -0,0 +1,181 @@
+"""
+On-disk cache of conversion outputs keyed by the content of the input.
+
+A key is the SHA-256 of the input bytes, the conversion direction and a
+tag of the converter version, so changing the converter code invalidates
+every entry without having to clear the cache by hand.
+"""
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+
+
+CONVERTER_VERSION = "0.1.0"
+
+# Modules whose source is part of the converter tag.
+CONVERTER_MODULES = (
+    "old_text_to_yaml.py", "yaml_to_text.py", "section_registry.py", "yaml_backend.py",
+    "cv_model.py", "emitters.py", "latex_tokenizer.py", "tex_includes.py",
+)
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_AGE = 30 * 24 * 60 * 60
+
+
+def default_cache_dir() -> Path:
+    """Returns $XDG_CACHE_HOME/cv_migrator, or ~/.cache/cv_migrator."""
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "cv_migrator"
+
+
+@lru_cache(maxsize=1)
+def converter_tag() -> str:
+    """
+    Returns a tag identifying the converter: its version and a digest of
+    the source of the converter modules.
+    """
+    digest = hashlib.sha256(CONVERTER_VERSION.encode())
+    here = Path(__file__).resolve().parent
+    for name in CONVERTER_MODULES:
+        try:
+            digest.update((here / name).read_bytes())
+        except OSError:
+            digest.update(name.encode())
+    return f"{CONVERTER_VERSION}-{digest.hexdigest()[:12]}"
+
+
+class ConversionCache:
+    """
+    Content-addressed store of conversion outputs with eviction by total
+    size and by age.
+
+    Entries are plain files written atomically, so several worker processes
+    can share one cache directory.
+    """
+
+    def __init__(self, directory: Path = None, max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_age: float = DEFAULT_MAX_AGE):
+        self.directory = Path(directory) if directory else default_cache_dir()
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+    def key(self, data: bytes, direction: str, extra: bytes = b"") -> str:
+        """
+        Computes the cache key of an input.
+
+        Args:
+            data: The input file content.
+            direction: The conversion direction.
+            extra: Anything else the output depends on, such as the content
+                of a sections config file.
+
+        Returns:
+            The hex digest used as key.
+        """
+        digest = hashlib.sha256()
+        for part in (converter_tag().encode(), direction.encode(), extra, data):
+            digest.update(len(part).to_bytes(8, "little"))
+            digest.update(part)
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / key
+
+    def get(self, key: str):
+        """
+        Returns the cached output of a key, or None on a miss.
+
+        A hit refreshes the entry's modification time, which eviction uses
+        as its last-used time.
+        """
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def put(self, key: str, data: bytes):
+        """Stores the output of a key."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(path, data)
+
+    def evict(self) -> tuple[int, int]:
+        """
+        Removes entries older than max_age, then the least recently used
+        ones until the cache fits in max_bytes.
+
+        Returns:
+            The number of entries and bytes removed.
+        """
+        if not self.directory.is_dir():
+            return 0, 0
+
+        now = time.time()
+        entries = []
+        removed = removed_bytes = 0
+        for path in self.directory.glob("??/*"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if now - stat.st_mtime > self.max_age:
+                removed += 1
+                removed_bytes += stat.st_size
+                path.unlink(missing_ok=True)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+            removed_bytes += size
+        return removed, removed_bytes
+
+
+def write_atomic(path: Path, data: bytes):
+    """Writes bytes to a temporary file next to path and renames it over path."""
+    with open_atomic(path, "wb") as file:
+        file.write(data)
+
+
+@contextmanager
+def open_atomic(path: Path, mode: str = "w"):
+    """
+    Opens a temporary file next to path for writing, and renames it over
+    path once the block exits without an error. Readers of path see either
+    the previous content or the whole new one.
+
+    Args:
+        path: The file to write.
+        mode: "w" for UTF-8 text, or "wb".
+
+    Yields:
+        The open temporary file.
+    """
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode, **({} if "b" in mode else {"encoding": "utf8"})) as file:
+            yield file
+        if path.exists():
+            shutil.copymode(path, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
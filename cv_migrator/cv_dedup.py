@@ -0,0 +1,356 @@
+"""
+Detection of duplicate publications and posters across CVs.
+
+The same paper is listed under "Publications" in main_en.tex, under
+"Publicaciones" in main_es.tex and again in the CVs of its co-authors. This
+module groups such entries, read from CV files or from a cv_index database,
+into clusters and can write one canonical entry per cluster:
+
+    cv-migrator dedup ./CV_A_corbat ./CV_B_author/main.yaml
+    cv-migrator dedup --index cvs.sqlite --report clusters.json --canonical shared.yaml
+
+Only entries of the publication and poster kinds of section_registry are
+compared, each with entries of its own kind. Titles are compared as sets of
+normalized words (no markup, accents, case or punctuation) and authors as
+sets of surnames. Rather than comparing every pair of entries, each title
+gets a MinHash signature and the signature is cut into bands; only entries
+sharing a band are compared (locality-sensitive hashing), so tens of
+thousands of entries are clustered in roughly linear time. Entries are
+duplicates when their titles and authors are similar enough, and
+duplicates of duplicates end up in the same cluster.
+"""
+from array import array
+from functools import lru_cache
+from pathlib import Path
+import argparse
+import hashlib
+import json
+import random
+import sys
+
+from .batch_migrate import collect_input_files
+from .cv_index import (CVIndex, IndexedEntry, author_key, iter_source_entries, normalize_text,
+                       read_cv, split_authors)
+from .emitters import emitter_for_path
+from .section_registry import REGISTRY, load_registry_config
+
+
+# Entry kinds of section_registry that are deduplicated.
+DEDUP_KINDS = ("publication", "poster")
+
+# Modulus of the MinHash permutations, a Mersenne prime above 2**60.
+_PRIME = (1 << 61) - 1
+
+
+def title_words(title: str) -> frozenset[str]:
+    """Returns the normalized words of a title."""
+    return frozenset(normalize_text(title or "").split())
+
+
+@lru_cache(maxsize=65536)
+def author_surnames(authors: str) -> frozenset[str]:
+    """Returns the normalized surnames of an author list."""
+    return frozenset(author_key(name).rsplit(" ", 1)[-1] for name in split_authors(authors))
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    """Returns the Jaccard similarity of two sets; 1 if both are empty."""
+    union = len(a | b)
+    return len(a & b) / union if union else 1.0
+
+
+class MinHasher:
+    """
+    MinHash signatures of sets of words.
+
+    The hashes of each word are computed once and kept in compact arrays,
+    so a signature is the element-wise minimum of arrays already built.
+    """
+
+    def __init__(self, num_perm: int = 32, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._permutations = [(rng.randrange(1, _PRIME), rng.randrange(_PRIME))
+                              for _ in range(num_perm)]
+        self._words: dict[str, array] = {}
+
+    def word_hashes(self, word: str) -> array:
+        """Returns the hash of a word under every permutation."""
+        hashes = self._words.get(word)
+        if hashes is None:
+            base = int.from_bytes(hashlib.blake2b(word.encode("utf8"), digest_size=8).digest(),
+                                  "little")
+            hashes = self._words[word] = array(
+                "Q", [(a * base + b) % _PRIME for a, b in self._permutations])
+        return hashes
+
+    def signature(self, words) -> tuple[int, ...]:
+        """Returns the signature of a non-empty set of words."""
+        return tuple(map(min, zip(*map(self.word_hashes, words))))
+
+
+class DuplicateFinder:
+    """
+    Clusters near-duplicate entries as they are added.
+
+    Entries are duplicates when they have the same kind, the Jaccard
+    similarity of their title words is at least title_threshold and that of
+    their author surnames at least author_threshold (entries without
+    authors match on the title alone).
+    """
+
+    def __init__(self, title_threshold: float = 0.8, author_threshold: float = 0.5,
+                 num_perm: int = 32, bands: int = 8, seed: int = 1):
+        """
+        Args:
+            title_threshold: Minimum similarity of the titles.
+            author_threshold: Minimum similarity of the author surnames.
+            num_perm: Length of the MinHash signatures.
+            bands: Bands the signatures are cut into. More bands find more
+                candidates with less similar titles, at the cost of more
+                comparisons.
+
+        Raises:
+            ValueError: If num_perm is not a multiple of bands.
+        """
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands}).")
+        self.title_threshold = title_threshold
+        self.author_threshold = author_threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm, seed)
+        self.entries: list[IndexedEntry] = []
+        self.kinds: list[str] = []
+        self._titles: list[frozenset] = []
+        self._authors: list[frozenset] = []
+        self._parents: list[int] = []
+        self._buckets: dict[tuple, list[int]] = {}
+        self._exact: dict[tuple, int] = {}
+
+    def add(self, entry: IndexedEntry, kind: str) -> bool:
+        """
+        Adds an entry, joining the cluster of any duplicate added before.
+
+        Returns:
+            False if the entry has no title and was left out.
+        """
+        words = title_words(entry.entry.get("title"))
+        if not words:
+            return False
+        authors = author_surnames(entry.entry.get("authors") or "")
+        index = len(self.entries)
+        self.entries.append(entry)
+        self.kinds.append(kind)
+        self._titles.append(words)
+        self._authors.append(authors)
+
+        # Copies of an entry added before, the most common duplicates, join
+        # it without being hashed.
+        first = self._exact.setdefault((kind, words, authors), index)
+        if first != index:
+            self._parents.append(self._find(first))
+            return True
+        self._parents.append(index)
+
+        signature = self.hasher.signature(words)
+        compared = set()
+        for band in range(self.bands):
+            # The hash of the band stands for it: a collision only adds a
+            # candidate, which is compared anyway.
+            key = (kind, band, hash(signature[band * self.rows:(band + 1) * self.rows]))
+            bucket = self._buckets.setdefault(key, [])
+            for other in bucket:
+                if other in compared or self._find(other) == self._find(index):
+                    continue
+                compared.add(other)
+                if self._similar(index, other):
+                    self._parents[self._find(index)] = self._find(other)
+            bucket.append(index)
+        return True
+
+    def _similar(self, a: int, b: int) -> bool:
+        if jaccard(self._titles[a], self._titles[b]) < self.title_threshold:
+            return False
+        authors_a = self._authors[a]
+        authors_b = self._authors[b]
+        return not (authors_a and authors_b) \
+            or jaccard(authors_a, authors_b) >= self.author_threshold
+
+    def _find(self, index: int) -> int:
+        parents = self._parents
+        root = index
+        while parents[root] != root:
+            root = parents[root]
+        while parents[index] != root:
+            next_index = parents[index]
+            parents[index] = root
+            index = next_index
+        return root
+
+    def clusters(self, min_size: int = 2) -> list[list[IndexedEntry]]:
+        """
+        Returns the clusters of at least min_size entries, in the order of
+        their first entry; entries keep the order they were added in.
+        """
+        groups: dict[int, list[IndexedEntry]] = {}
+        for index, entry in enumerate(self.entries):
+            groups.setdefault(self._find(index), []).append(entry)
+        return [group for group in groups.values() if len(group) >= min_size]
+
+
+def read_entries(paths):
+    """
+    Reads the entries of CV files.
+
+    Args:
+        paths: .tex files, or files in a format of emitters.py.
+
+    Yields:
+        IndexedEntry instances, in file and document order.
+
+    Raises:
+        ValueError: If a file cannot be read; see read_cv.
+    """
+    for path in paths:
+        content, _ = read_cv(path)
+        for position, (section, subsection, entry) in enumerate(iter_source_entries(content)):
+            yield IndexedEntry(Path(path), section, subsection, position, entry)
+
+
+def find_duplicates(entries, **kwargs) -> DuplicateFinder:
+    """
+    Clusters the publications and posters among entries.
+
+    Args:
+        entries: IndexedEntry instances, as from read_entries or CVIndex.query.
+        **kwargs: Thresholds and LSH parameters of DuplicateFinder.
+
+    Returns:
+        The finder holding the entries compared; see DuplicateFinder.clusters.
+    """
+    finder = DuplicateFinder(**kwargs)
+    for entry in entries:
+        kind = REGISTRY.kind(entry.section, entry.subsection)
+        if kind in DEDUP_KINDS:
+            finder.add(entry, kind)
+    return finder
+
+
+def canonical_entry(cluster: list[IndexedEntry]) -> IndexedEntry:
+    """Returns the most complete entry of a cluster: most fields filled, then most text."""
+    return max(cluster, key=lambda item: (sum(1 for value in item.entry.values() if value),
+                                          sum(len(str(value)) for value in item.entry.values())))
+
+
+def canonical_content(clusters: list[list[IndexedEntry]]) -> dict:
+    """
+    Builds CV content with the canonical entry of every cluster, under the
+    section and subsection it was found in.
+    """
+    content = {}
+    for cluster in clusters:
+        canonical = canonical_entry(cluster)
+        if canonical.subsection is None:
+            content.setdefault(canonical.section, []).append(canonical.entry)
+        else:
+            content.setdefault(canonical.section, {}).setdefault(
+                canonical.subsection, []).append(canonical.entry)
+    return content
+
+
+def cluster_report(clusters: list[list[IndexedEntry]]) -> list[dict]:
+    """Describes clusters as JSON-serializable mappings."""
+    report = []
+    for cluster in clusters:
+        canonical = canonical_entry(cluster)
+        report.append({
+            "title": canonical.entry.get("title"),
+            "canonical": cluster.index(canonical),
+            "entries": [{"source": str(item.source), "section": item.section,
+                         "subsection": item.subsection, "position": item.position,
+                         "entry": item.entry} for item in cluster],
+        })
+    return report
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(
+        prog=prog, description="Find duplicate publications and posters across CVs.")
+    parser.add_argument("inputs", nargs="*",
+                        help="Files (.tex, .yaml, .json, .jsonl, .msgpack), directories or "
+                             "glob patterns.")
+    parser.add_argument("--index", type=Path, default=None,
+                        help="Read the entries from this cv_index database instead.")
+    parser.add_argument("--pattern", default=None,
+                        help="Glob used inside directories (default: main*.tex).")
+    parser.add_argument("--title-threshold", type=float, default=0.8,
+                        help="Minimum Jaccard similarity of title words (default: 0.8).")
+    parser.add_argument("--author-threshold", type=float, default=0.5,
+                        help="Minimum Jaccard similarity of author surnames (default: 0.5).")
+    parser.add_argument("--report", default=None,
+                        help="Write the clusters as JSON to this file (- for stdout).")
+    parser.add_argument("--canonical", type=Path, default=None,
+                        help="Write one entry per cluster, duplicates or not, to this file "
+                             "(.yaml, .json, .jsonl or .msgpack).")
+    parser.add_argument("--sections-config", type=Path, default=None,
+                        help="YAML or JSON file registering extra sections.")
+    args = parser.parse_args(argv)
+    if not args.inputs and args.index is None:
+        parser.error("Give CV files or --index.")
+    if args.sections_config:
+        load_registry_config(args.sections_config)
+
+    failed = False
+    if args.index is not None:
+        if not args.index.is_file():
+            parser.error(f"{args.index} does not exist.")
+        with CVIndex(args.index) as index:
+            entries = index.query()
+    else:
+        entries = []
+        for path in collect_input_files(args.inputs, "to-yaml", args.pattern):
+            try:
+                entries.extend(read_entries([path]))
+            except (Exception, SystemExit) as e:
+                print(f"Error reading {path}: {type(e).__name__}: {e}", file=sys.stderr)
+                failed = True
+
+    finder = find_duplicates(entries, title_threshold=args.title_threshold,
+                             author_threshold=args.author_threshold)
+    clusters = finder.clusters()
+    # Keep stdout for the JSON report when it goes there.
+    output = sys.stderr if args.report == "-" else sys.stdout
+    for cluster in clusters:
+        print(f"{len(cluster)} entries: {canonical_entry(cluster).entry.get('title')}",
+              file=output)
+        for item in cluster:
+            where = item.section if item.subsection is None \
+                else f"{item.section} / {item.subsection}"
+            print(f"  {item.source}: {where} #{item.position}", file=output)
+    print(f"Found {len(clusters)} {'cluster' if len(clusters) == 1 else 'clusters'} of "
+          f"duplicates among {len(finder.entries)} publications and posters.", file=output)
+
+    if args.report == "-":
+        json.dump(cluster_report(clusters), sys.stdout, ensure_ascii=False, indent=1)
+        sys.stdout.write("\n")
+    elif args.report:
+        with open(args.report, 'w', encoding="utf8") as file:
+            json.dump(cluster_report(clusters), file, ensure_ascii=False, indent=1)
+    if args.canonical:
+        every_cluster = finder.clusters(min_size=1)
+        emitter = emitter_for_path(args.canonical)
+        if emitter.binary:
+            with open(args.canonical, 'wb') as file:
+                emitter.dump(canonical_content(every_cluster), file)
+        else:
+            with open(args.canonical, 'w', encoding="utf8") as file:
+                emitter.dump(canonical_content(every_cluster), file)
+        print(f"Wrote {len(every_cluster)} canonical "
+              f"{'entry' if len(every_cluster) == 1 else 'entries'} to {args.canonical}.",
+              file=output)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,513 @@
+"""
+SQLite index of the entries of many CVs.
+
+Entries parsed from .tex CVs (as convert_tex_to_yaml parses them) or loaded
+from YAML, JSON, JSON Lines and MessagePack files are stored with their
+source file, section, subsection, all their fields as JSON and a digest of
+their content, next to the columns queries filter on: title, venue, years
+and authors. Questions such as "all publications since 2020 in journal X"
+are then answered by SQLite without loading any CV:
+
+    cv-migrator index update cvs.sqlite ./CV_A_corbat ./CV_B_author
+    cv-migrator index query cvs.sqlite --subsection Publications --since 2020 --venue "X"
+
+    with CVIndex("cvs.sqlite") as index:
+        index.update(paths)
+        for entry in index.query(section="Production", author="Corbat"):
+            print(entry.source, entry.entry["title"])
+
+Updates are incremental. A source whose file and included files have the
+same modification time and size as when it was indexed is skipped without
+being read; one whose content, or the converter, changed has its entries
+replaced in a single transaction.
+"""
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+import argparse
+import hashlib
+import json
+import re
+import sqlite3
+import sys
+import unicodedata
+
+from .batch_migrate import collect_input_files
+from .conversion_cache import converter_tag
+from .cv_model import to_plain
+from .emitters import emitter_for_path, iter_records
+from .old_text_to_yaml import open_tex_source, parse_tex_file, tex_to_dict
+from .section_registry import load_registry_config
+from .tex_includes import IncludeResolver, file_signature, fingerprint_files
+
+
+# Indexes built with another schema version are dropped and rebuilt.
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    files TEXT NOT NULL,
+    converter TEXT NOT NULL,
+    content_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    source_id INTEGER NOT NULL REFERENCES sources (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    section TEXT NOT NULL,
+    subsection TEXT,
+    title TEXT,
+    venue TEXT,
+    date TEXT,
+    year_from INTEGER,
+    year_to INTEGER,
+    fields TEXT NOT NULL,
+    content_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entry_authors (
+    entry_id INTEGER NOT NULL REFERENCES entries (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    name_key TEXT NOT NULL,
+    surname_key TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_source ON entries (source_id);
+CREATE INDEX IF NOT EXISTS entries_section ON entries (section, subsection);
+CREATE INDEX IF NOT EXISTS entries_date ON entries (year_to, year_from);
+CREATE INDEX IF NOT EXISTS entry_authors_entry ON entry_authors (entry_id);
+CREATE INDEX IF NOT EXISTS entry_authors_name ON entry_authors (name_key);
+CREATE INDEX IF NOT EXISTS entry_authors_surname ON entry_authors (surname_key);
+"""
+
+_TABLES = ("entry_authors", "entries", "sources")
+
+_YEAR_RE = re.compile(r'(?<!\d)(1[89]\d\d|2\d\d\d)(?!\d)')
+_LINK_RE = re.compile(r'\[([^\]]*)\]\([^)]*\)')
+_MARKUP_RE = re.compile(r'\*\*|__|[*^~]')
+_MARKUP_CHAR_RE = re.compile(r'[\[*_^~]')
+_AUTHOR_SEPARATOR_RE = re.compile(r'\s*(?:([,;&])|\band\b)\s*')
+_INITIALS_RE = re.compile(r'(?:[^\W\d_](?:\.|[\s-]|$)[\s-]*)+')
+_NOT_WORD_RE = re.compile(r'[\W_]+')
+
+
+def strip_markdown(text: str) -> str:
+    """Returns text without the Markdown emphasis and links of the converters."""
+    if not _MARKUP_CHAR_RE.search(text):
+        return text.strip()
+    return _MARKUP_RE.sub("", _LINK_RE.sub(r'\1', text)).strip()
+
+
+def normalize_text(text: str) -> str:
+    """Returns text without markup, accents, case or punctuation, for comparisons."""
+    text = strip_markdown(text)
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(char for char in text if not unicodedata.combining(char))
+    return " ".join(_NOT_WORD_RE.sub(" ", text.casefold()).split())
+
+
+@lru_cache(maxsize=65536)
+def author_key(name: str) -> str:
+    """
+    Normalizes an author name for lookups: given names first, and no markup,
+    accents, case or punctuation, so "**A. Corbát**", "Corbat, A." and
+    "a corbat" have the same key.
+    """
+    surname, comma, given = strip_markdown(name).partition(",")
+    return normalize_text(f"{given} {surname}" if comma else surname)
+
+
+def split_authors(authors: str) -> list[str]:
+    """
+    Splits an author list on commas, semicolons, ampersands and "and".
+
+    Initials after a comma belong to the name before it, as in
+    "Corbat, A. and Author, B.".
+    """
+    parts = _AUTHOR_SEPARATOR_RE.split(strip_markdown(authors))
+    names = []
+    for separator, name in zip([None, *parts[1::2]], parts[::2]):
+        if separator == "," and names and "," not in names[-1] \
+                and _INITIALS_RE.fullmatch(name):
+            names[-1] = f"{names[-1]}, {name}"
+        else:
+            names.append(name)
+    return [name for name in names if author_key(name) not in ("", "et al")]
+
+
+def entry_years(date: str) -> tuple[int | None, int | None]:
+    """Returns the first and last years written in a date, such as 2016--2021."""
+    years = [int(year) for year in _YEAR_RE.findall(date or "")]
+    if not years:
+        return None, None
+    return min(years), max(years)
+
+
+def read_cv(path: Path) -> tuple[dict, list[Path]]:
+    """
+    Reads a CV file: a .tex file with the files it includes, or a file in a
+    format of emitters.py.
+
+    Returns:
+        The CV content, keyed by section name, and the included files.
+    """
+    path = Path(path)
+    if path.suffix == ".tex":
+        resolver = IncludeResolver(path, parse_tex_file)
+        with open_tex_source(path) as source:
+            content = tex_to_dict(source, resolver)
+        return content, resolver.files()
+    emitter = emitter_for_path(path)
+    if emitter.binary:
+        with open(path, 'rb') as file:
+            content = emitter.load(file)
+    else:
+        with open(path, 'r', encoding="utf8") as file:
+            content = emitter.load(file)
+    return content or {}, []
+
+
+def iter_source_entries(content: dict):
+    """
+    Walks the entries of CV content, leaving out free text, language levels
+    and transcript rows.
+
+    Args:
+        content: The CV content, keyed by section name.
+
+    Yields:
+        Tuples of section, subsection (None in list sections) and the entry
+        as a plain mapping.
+    """
+    for record in iter_records(content):
+        if record["record"] != "entry":
+            continue
+        entry = to_plain(record["entry"])
+        if isinstance(entry, dict):
+            yield record["section"], record["subsection"], entry
+
+
+@dataclass
+class IndexedEntry:
+    """An entry returned by CVIndex.query."""
+    source: Path
+    section: str
+    subsection: str | None
+    position: int
+    entry: dict
+
+
+@dataclass
+class UpdateSummary:
+    """
+    What CVIndex.update did.
+
+    Attributes:
+        indexed: Sources (re)indexed.
+        unchanged: Sources skipped because they did not change.
+        entries: Entries written.
+        errors: Sources that could not be read, with the error message.
+    """
+    indexed: int = 0
+    unchanged: int = 0
+    entries: int = 0
+    errors: list[tuple[Path, str]] = field(default_factory=list)
+
+
+class CVIndex:
+    """
+    A SQLite database of CV entries.
+
+    Use it as a context manager, or call close when done.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Args:
+            path: The database file, created if missing, or ":memory:".
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        if str(path) != ":memory:":
+            self.connection.execute("PRAGMA journal_mode = WAL")
+            self.connection.execute("PRAGMA synchronous = NORMAL")
+        self._create_schema()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def _create_schema(self):
+        (version,) = self.connection.execute("PRAGMA user_version").fetchone()
+        with self.connection:
+            if version != SCHEMA_VERSION:
+                for table in _TABLES:
+                    self.connection.execute(f"DROP TABLE IF EXISTS {table}")
+            self.connection.executescript(_SCHEMA)
+            self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def update(self, paths, extra: bytes = b"") -> UpdateSummary:
+        """
+        Indexes CV files, skipping those that did not change since they
+        were indexed.
+
+        Args:
+            paths: .tex files, or files in a format of emitters.py.
+            extra: Anything else the entries depend on, such as the content
+                of a sections config file; changing it reindexes every file.
+
+        Returns:
+            What was done. A file that fails to parse is reported in the
+            summary and keeps its previous entries.
+        """
+        summary = UpdateSummary()
+        converter = hashlib.sha256(converter_tag().encode() + extra).hexdigest()
+        for path in paths:
+            path = Path(path).resolve()
+            row = self.connection.execute(
+                "SELECT id, files, converter, content_hash FROM sources WHERE path = ?",
+                (str(path),)).fetchone()
+            if row is not None and row[2] == converter and self._unchanged(json.loads(row[1])):
+                summary.unchanged += 1
+                continue
+
+            try:
+                content, dependencies = read_cv(path)
+            except (Exception, SystemExit) as e:
+                summary.errors.append((path, f"{type(e).__name__}: {e}"))
+                continue
+            files = [path, *dependencies]
+            content_hash = hashlib.sha256(converter.encode() + fingerprint_files(files)).hexdigest()
+            signatures = json.dumps([[str(file), *(file_signature(file) or (None, None))]
+                                     for file in files])
+            if row is not None and row[2] == converter and row[3] == content_hash:
+                # Touched but not modified: only remember the new times.
+                with self.connection:
+                    self.connection.execute("UPDATE sources SET files = ? WHERE id = ?",
+                                            (signatures, row[0]))
+                summary.unchanged += 1
+                continue
+
+            summary.entries += self._replace(path, row and row[0], signatures, converter,
+                                             content_hash, iter_source_entries(content))
+            summary.indexed += 1
+        return summary
+
+    @staticmethod
+    def _unchanged(files: list) -> bool:
+        return all(list(file_signature(path) or (None, None)) == [mtime_ns, size]
+                   for path, mtime_ns, size in files)
+
+    def _replace(self, path, source_id, files, converter, content_hash, entries) -> int:
+        """Replaces the entries of a source in one transaction; returns their number."""
+        with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            if source_id is None:
+                source_id = self.connection.execute(
+                    "INSERT INTO sources (path, files, converter, content_hash) VALUES (?, ?, ?, ?)",
+                    (str(path), files, converter, content_hash)).lastrowid
+            else:
+                self.connection.execute("DELETE FROM entries WHERE source_id = ?", (source_id,))
+                self.connection.execute(
+                    "UPDATE sources SET files = ?, converter = ?, content_hash = ? WHERE id = ?",
+                    (files, converter, content_hash, source_id))
+
+            # Ids are assigned here, under the write lock, so that entries and
+            # their authors are inserted in two bulk statements.
+            (last_id,) = self.connection.execute(
+                "SELECT COALESCE(MAX(id), 0) FROM entries").fetchone()
+            entry_rows = []
+            author_rows = []
+            for position, (section, subsection, entry) in enumerate(entries):
+                entry_id = last_id + position + 1
+                fields = json.dumps(entry, ensure_ascii=False, default=str)
+                digest = hashlib.sha256(json.dumps(entry, ensure_ascii=False, sort_keys=True,
+                                                   default=str).encode("utf8")).hexdigest()
+                date = str(entry.get("date") or "") or None
+                venue = entry.get("journal") or entry.get("event")
+                entry_rows.append((
+                    entry_id, source_id, position, section, subsection,
+                    entry.get("title") or entry.get("name"), venue, date, *entry_years(date),
+                    fields, digest,
+                ))
+                authors = entry.get("authors")
+                if isinstance(authors, str):
+                    for author_position, name in enumerate(split_authors(authors)):
+                        key = author_key(name)
+                        author_rows.append((entry_id, author_position, name, key,
+                                            key.rsplit(" ", 1)[-1]))
+            self.connection.executemany(
+                "INSERT INTO entries (id, source_id, position, section, subsection, title, "
+                "venue, date, year_from, year_to, fields, content_hash) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", entry_rows)
+            self.connection.executemany(
+                "INSERT INTO entry_authors (entry_id, position, name, name_key, surname_key) "
+                "VALUES (?, ?, ?, ?, ?)", author_rows)
+        return len(entry_rows)
+
+    def remove(self, paths) -> int:
+        """Removes sources and their entries; returns how many were indexed."""
+        with self.connection:
+            return sum(self.connection.execute("DELETE FROM sources WHERE path = ?",
+                                               (str(Path(path).resolve()),)).rowcount
+                       for path in paths)
+
+    def prune(self) -> int:
+        """Removes the sources whose file no longer exists; returns their number."""
+        missing = [path for (path,) in self.connection.execute("SELECT path FROM sources")
+                   if not Path(path).is_file()]
+        return self.remove(missing)
+
+    def sources(self) -> list[Path]:
+        """Returns the indexed files."""
+        return [Path(path) for (path,) in
+                self.connection.execute("SELECT path FROM sources ORDER BY path")]
+
+    def query(self, section: str = None, subsection: str = None, since: int = None,
+              until: int = None, author: str = None, venue: str = None, title: str = None,
+              source: Path = None, limit: int = None) -> list[IndexedEntry]:
+        """
+        Looks entries up. Every given filter must match.
+
+        Args:
+            section: Exact section name.
+            subsection: Exact subsection name.
+            since: Entries whose last year is this one or later.
+            until: Entries whose first year is this one or earlier.
+            author: An author, by surname if a single word ("Corbat") or by
+                full name ("A. Corbat"), ignoring case, accents and markup.
+            venue: Text in the journal or event, ignoring ASCII case.
+            title: Text in the title or name, ignoring ASCII case.
+            source: The file the entries come from.
+            limit: Maximum number of entries returned.
+
+        Returns:
+            The entries, by source and then in document order.
+        """
+        conditions = []
+        parameters = []
+        for column, value in (("e.section", section), ("e.subsection", subsection),
+                              ("s.path", source and str(Path(source).resolve()))):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                parameters.append(value)
+        if since is not None:
+            conditions.append("e.year_to >= ?")
+            parameters.append(since)
+        if until is not None:
+            conditions.append("e.year_from <= ?")
+            parameters.append(until)
+        if author is not None:
+            key = author_key(author)
+            column = "name_key" if " " in key else "surname_key"
+            conditions.append(f"e.id IN (SELECT entry_id FROM entry_authors WHERE {column} = ?)")
+            parameters.append(key)
+        for column, value in (("e.venue", venue), ("e.title", title)):
+            if value is not None:
+                escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                conditions.append(f"{column} LIKE ? ESCAPE '\\'")
+                parameters.append(f"%{escaped}%")
+
+        sql = ("SELECT s.path, e.section, e.subsection, e.position, e.fields "
+               "FROM entries e JOIN sources s ON s.id = e.source_id")
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY s.path, e.position"
+        if limit is not None:
+            sql += " LIMIT ?"
+            parameters.append(limit)
+        return [IndexedEntry(Path(path), section, subsection, position, json.loads(fields))
+                for path, section, subsection, position, fields
+                in self.connection.execute(sql, parameters)]
+
+
+def format_entry(entry: IndexedEntry) -> str:
+    """Formats a query result as one line of text."""
+    where = entry.section if entry.subsection is None else f"{entry.section} / {entry.subsection}"
+    fields = entry.entry
+    text = f"{entry.source}: {where}: {fields.get('date', '')} " \
+           f"{fields.get('title') or fields.get('name', '')}"
+    venue = fields.get("journal") or fields.get("event")
+    if venue:
+        text += f" ({venue})"
+    if fields.get("authors"):
+        text += f", {fields['authors']}"
+    return text
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog,
+                                     description="Index CV entries in SQLite and query them.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    update = commands.add_parser("update", help="Index CV files, skipping unchanged ones.")
+    update.add_argument("database", type=Path, help="The SQLite file, created if missing.")
+    update.add_argument("inputs", nargs="+",
+                        help="Files (.tex, .yaml, .json, .jsonl, .msgpack), directories or "
+                             "glob patterns.")
+    update.add_argument("--pattern", default=None,
+                        help="Glob used inside directories (default: main*.tex).")
+    update.add_argument("--prune", action="store_true",
+                        help="Remove indexed files that no longer exist.")
+    update.add_argument("--sections-config", type=Path, default=None,
+                        help="YAML or JSON file registering extra sections.")
+
+    query = commands.add_parser("query", help="Print the indexed entries matching filters.")
+    query.add_argument("database", type=Path, help="The SQLite file.")
+    query.add_argument("--section", default=None, help="Exact section name.")
+    query.add_argument("--subsection", default=None, help="Exact subsection name.")
+    query.add_argument("--since", type=int, default=None,
+                       help="Entries of this year or later.")
+    query.add_argument("--until", type=int, default=None,
+                       help="Entries of this year or earlier.")
+    query.add_argument("--author", default=None,
+                       help="Author surname, or full name as in the CV.")
+    query.add_argument("--venue", default=None, help="Text in the journal or event.")
+    query.add_argument("--title", default=None, help="Text in the title or name.")
+    query.add_argument("--source", type=Path, default=None, help="Only entries of this file.")
+    query.add_argument("--limit", type=int, default=None, help="Maximum number of entries.")
+    query.add_argument("--json", action="store_true",
+                       help="Print one JSON object per entry instead of text.")
+    args = parser.parse_args(argv)
+
+    if args.command == "query":
+        if not args.database.is_file():
+            parser.error(f"{args.database} does not exist.")
+        with CVIndex(args.database) as index:
+            entries = index.query(args.section, args.subsection, args.since, args.until,
+                                  args.author, args.venue, args.title, args.source, args.limit)
+        for entry in entries:
+            if args.json:
+                print(json.dumps({"source": str(entry.source), "section": entry.section,
+                                  "subsection": entry.subsection, "entry": entry.entry},
+                                 ensure_ascii=False))
+            else:
+                print(format_entry(entry))
+        return 0
+
+    extra = b""
+    if args.sections_config:
+        load_registry_config(args.sections_config)
+        extra = args.sections_config.read_bytes()
+    files = collect_input_files(args.inputs, "to-yaml", args.pattern)
+    with CVIndex(args.database) as index:
+        removed = index.prune() if args.prune else 0
+        summary = index.update(files, extra)
+    for path, message in summary.errors:
+        print(f"Error indexing {path}: {message}", file=sys.stderr)
+    print(f"Indexed {summary.indexed} file(s) ({summary.entries} entries), "
+          f"{summary.unchanged} unchanged, {len(summary.errors)} failed"
+          + (f", {removed} removed." if args.prune else "."))
+    return 1 if summary.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
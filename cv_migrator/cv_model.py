@@ -0,0 +1,189 @@
+"""
+Typed entries shared by both converters.
+
+old_text_to_yaml.py parses each \\cventry into one of these classes and
+yaml_to_text.py reads YAML mappings back into them before formatting, so
+both directions agree on the fields of every kind of entry. The classes use
+__slots__, which keeps large parsed corpora small in memory, and reject
+unknown fields, so a typo fails at construction instead of silently
+producing an empty field.
+
+Entries dump to YAML as plain mappings with their fields in declaration
+order. Fields that are None are left out.
+"""
+from collections.abc import Mapping
+from dataclasses import dataclass, field, fields
+import sys
+
+from .yaml_backend import register_representer
+
+
+Description = list[str] | str
+
+# Fields whose values repeat across entries: author lists, venues, locations.
+SHARED_FIELDS = ("authors", "journal", "event", "location")
+
+
+class EntryModel:
+    """Conversions to and from YAML mappings shared by every entry class."""
+
+    __slots__ = ()
+
+    @classmethod
+    def field_names(cls) -> tuple[str, ...]:
+        return tuple(f.name for f in fields(cls))
+
+    @classmethod
+    def from_mapping(cls, mapping: Mapping):
+        """
+        Builds an entry from a YAML mapping.
+
+        Missing fields take their defaults.
+
+        Args:
+            mapping: The entry as loaded from YAML.
+
+        Returns:
+            The entry.
+
+        Raises:
+            ValueError: If the mapping is not a mapping or has unknown fields.
+        """
+        if not isinstance(mapping, Mapping):
+            raise ValueError(f"Expected a mapping for {cls.__name__}, got {mapping!r}.")
+        unknown = [key for key in mapping if key not in cls.field_names()]
+        if unknown:
+            raise ValueError(f"Unknown field(s) {', '.join(map(str, unknown))} in "
+                             f"{cls.__name__}; expected {', '.join(cls.field_names())}.")
+        return cls(**mapping)
+
+    @classmethod
+    def coerce(cls, entry):
+        """Returns entry if it already is an instance, or builds one from a mapping."""
+        if isinstance(entry, cls):
+            return entry
+        return cls.from_mapping(entry)
+
+    def to_mapping(self) -> dict:
+        """Returns the entry as a mapping in field order, leaving out None fields."""
+        mapping = {}
+        for name in self.field_names():
+            value = getattr(self, name)
+            if value is not None:
+                mapping[name] = value
+        return mapping
+
+
+@dataclass(slots=True)
+class EducationEntry(EntryModel):
+    """Education, experience and other entries placed at a location."""
+    name: str = ""
+    date: str = ""
+    location: str = ""
+    description: Description = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class GenericEntry(EntryModel):
+    """Entry of a section without a dedicated kind."""
+    name: str = ""
+    date: str = ""
+    location: str = ""
+    description: Description = ""
+    extras: list[str] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class PublicationEntry(EntryModel):
+    title: str = ""
+    date: str = ""
+    journal: str = ""
+    authors: str = ""
+    description: Description = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class PosterEntry(EntryModel):
+    """Poster, oral presentation or outreach entry."""
+    title: str = ""
+    date: str = ""
+    event: str = ""
+    authors: str = ""
+    description: Description = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class CourseEntry(EntryModel):
+    """Course, school or conference entry. The language is optional."""
+    name: str = ""
+    date: str = ""
+    extension: str = ""
+    location: str = ""
+    language: str | None = None
+    description: Description = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class LanguageExamEntry(EntryModel):
+    name: str = ""
+    date: str = ""
+    description: Description = field(default_factory=list)
+
+
+ENTRY_TYPES = (EducationEntry, GenericEntry, PublicationEntry, PosterEntry, CourseEntry,
+               LanguageExamEntry)
+
+
+def to_plain(data):
+    """
+    Converts entries nested in parsed CV data to plain mappings.
+
+    Args:
+        data: A content dict, section, subsection or entry.
+
+    Returns:
+        The same structure with dicts and lists only.
+    """
+    if isinstance(data, EntryModel):
+        return {key: to_plain(value) for key, value in data.to_mapping().items()}
+    if isinstance(data, dict):
+        return {key: to_plain(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [to_plain(item) for item in data]
+    return data
+
+
+def intern_shared_fields(data):
+    """
+    Interns the SHARED_FIELDS values of every entry, in place, so that equal
+    values are one object in memory and compact YAML dumps alias them.
+
+    Args:
+        data: A content dict, section, subsection or entry.
+
+    Returns:
+        data.
+    """
+    if isinstance(data, EntryModel):
+        for name in SHARED_FIELDS:
+            value = getattr(data, name, None)
+            if isinstance(value, str):
+                setattr(data, name, sys.intern(value))
+    elif isinstance(data, dict):
+        for key, value in data.items():
+            if key in SHARED_FIELDS and isinstance(value, str):
+                data[key] = sys.intern(value)
+            else:
+                intern_shared_fields(value)
+    elif isinstance(data, list):
+        for item in data:
+            intern_shared_fields(item)
+    return data
+
+
+def _represent_entry(dumper, entry):
+    return dumper.represent_dict(entry.to_mapping())
+
+
+for _entry_type in ENTRY_TYPES:
+    register_representer(_entry_type, _represent_entry)
@@ -0,0 +1,259 @@
+"""
+Long-running conversion worker speaking JSON lines.
+
+Each request is one JSON object per line:
+
+    {"id": 1, "direction": "to-yaml", "text": "\\section{Education} ..."}
+    {"id": 2, "direction": "to-tex", "path": "cv/main.yaml"}
+    {"id": 3, "direction": "to-yaml", "path": "cv/main.tex", "write": true}
+    {"id": 4, "direction": "to-yaml", "path": "cv/main.tex", "compact": true}
+
+"text" converts the given text, "path" converts the content of a file along
+with the files it pulls in with \\input or \\include, and "write": true
+writes the output next to the file like the command-line converters and
+returns its path. "compact": true writes repeated authors, venues and
+locations as YAML aliases (to-yaml only). Each response is one JSON line:
+
+    {"id": 1, "ok": true, "result": "Education: ..."}
+    {"id": 2, "ok": false, "error": "ValueError: ..."}
+
+By default requests are read from stdin and answered on stdout in order.
+With --socket the worker listens on a Unix socket instead and serves
+concurrent requests from a thread or process pool; responses on a
+connection may then arrive in any order and are matched by "id".
+"""
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+import argparse
+import json
+import os
+import signal
+import socketserver
+import sys
+import threading
+
+from .old_text_to_yaml import convert_tex_to_yaml, parse_tex_file, tex_to_yaml_text
+from .section_registry import load_registry_config
+from .tex_includes import IncludeResolver
+from .yaml_backend import BACKENDS, set_backend
+from .yaml_to_text import convert_yaml_to_tex, yaml_to_tex_text
+
+
+DIRECTIONS = {
+    "to-yaml": (tex_to_yaml_text, convert_tex_to_yaml),
+    "to-tex": (yaml_to_tex_text, convert_yaml_to_tex),
+}
+
+
+def run_request(request: dict) -> str:
+    """
+    Runs a single conversion request.
+
+    Args:
+        request: The decoded request.
+
+    Returns:
+        The converted text, or the output path when the request asks to write.
+    """
+    try:
+        convert_text, convert_file = DIRECTIONS[request.get("direction")]
+    except KeyError:
+        raise ValueError(f"Unknown direction {request.get('direction')!r}; "
+                         f"use one of {', '.join(DIRECTIONS)}.") from None
+    if request.get("compact"):
+        if request["direction"] != "to-yaml":
+            raise ValueError("'compact' only applies to the to-yaml direction.")
+        convert_text = partial(convert_text, compact=True)
+        convert_file = partial(convert_file, compact=True)
+
+    if "text" in request:
+        return convert_text(request["text"])
+    if "path" in request:
+        path = Path(request["path"])
+        if request["direction"] == "to-yaml":
+            # Files pulled in with \\input or \\include are parsed in this
+            # process, which may itself be one of the pool's.
+            resolver = IncludeResolver(path, parse_tex_file, workers=1)
+            convert_text = partial(convert_text, resolver=resolver)
+            convert_file = partial(convert_file, resolver=resolver)
+        if request.get("write"):
+            return str(convert_file(path))
+        with open(path, 'r', encoding="utf8") as file:
+            return convert_text(file)
+    raise ValueError("The request needs a 'text' or a 'path'.")
+
+
+def handle_request(request: dict) -> dict:
+    """
+    Runs a request and wraps its result or error in a response.
+    """
+    try:
+        return {"id": request.get("id"), "ok": True, "result": run_request(request)}
+    except (Exception, SystemExit) as e:
+        # convert_yaml_to_tex calls sys.exit on malformed YAML files.
+        return {"id": request.get("id"), "ok": False, "error": f"{type(e).__name__}: {e}"}
+
+
+def decode_request(line: str):
+    """
+    Decodes a request line.
+
+    Returns:
+        The request mapping, or an error response if the line is not a JSON object.
+    """
+    try:
+        request = json.loads(line)
+    except json.JSONDecodeError as e:
+        return None, {"id": None, "ok": False, "error": f"JSONDecodeError: {e}"}
+    if not isinstance(request, dict):
+        return None, {"id": None, "ok": False, "error": "ValueError: request must be an object"}
+    return request, None
+
+
+def init_worker(sections_config: Path = None, yaml_backend: str = "auto"):
+    """Loads the sections config and selects the YAML backend."""
+    if sections_config:
+        load_registry_config(sections_config)
+    set_backend(yaml_backend)
+
+
+def serve_stdio(stdin=None, stdout=None):
+    """
+    Answers requests read from stdin on stdout, one at a time.
+
+    Diagnostics printed by the converters go to stderr so they do not mix
+    with the responses.
+    """
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    previous = sys.stdout
+    sys.stdout = sys.stderr
+    try:
+        for line in stdin:
+            if not line.strip():
+                continue
+            request, response = decode_request(line)
+            if request is not None:
+                response = handle_request(request)
+            stdout.write(json.dumps(response, ensure_ascii=False) + "\n")
+            stdout.flush()
+    finally:
+        sys.stdout = previous
+
+
+class _ConnectionHandler(socketserver.StreamRequestHandler):
+    """Reads the requests of one connection and answers them as they finish."""
+
+    def handle(self):
+        lock = threading.Lock()
+        # Responses not written yet. The connection is closed when handle()
+        # returns, so it waits for the callbacks to write them: wait() on
+        # the futures returns before their callbacks have run.
+        outstanding = 0
+        written = threading.Condition()
+
+        def send(response):
+            data = (json.dumps(response, ensure_ascii=False) + "\n").encode("utf8")
+            with lock:
+                self.wfile.write(data)
+                self.wfile.flush()
+
+        def send_result(future, request_id):
+            nonlocal outstanding
+            try:
+                try:
+                    response = future.result()
+                except Exception as e:
+                    response = {"id": request_id, "ok": False,
+                                "error": f"{type(e).__name__}: {e}"}
+                send(response)
+            except OSError:
+                # The client went away.
+                pass
+            finally:
+                with written:
+                    outstanding -= 1
+                    written.notify_all()
+
+        for raw_line in self.rfile:
+            line = raw_line.decode("utf8")
+            if not line.strip():
+                continue
+            request, response = decode_request(line)
+            if request is None:
+                send(response)
+                continue
+            with written:
+                outstanding += 1
+            future = self.server.executor.submit(handle_request, request)
+            future.add_done_callback(lambda f, request_id=request.get("id"): send_result(f, request_id))
+        with written:
+            written.wait_for(lambda: outstanding == 0)
+
+
+class _WorkerServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    # Editors may connect many clients at once; the default backlog is 5.
+    request_queue_size = 128
+
+
+def serve_socket(socket_path: Path, workers: int = None, pool: str = "thread",
+                 sections_config: Path = None, yaml_backend: str = "auto"):
+    """
+    Serves requests on a Unix socket until interrupted.
+
+    Args:
+        socket_path: Path of the socket to create; a stale one is replaced.
+        workers: Size of the pool running the conversions.
+        pool: "thread" or "process".
+        sections_config: Optional sections config file.
+        yaml_backend: YAML backend to use.
+    """
+    init_worker(sections_config, yaml_backend)
+    if pool == "process":
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                       initargs=(sections_config, yaml_backend))
+    else:
+        executor = ThreadPoolExecutor(max_workers=workers)
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    # Exit through the finally clause below on SIGTERM too, removing the socket.
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    with executor, _WorkerServer(str(socket_path), _ConnectionHandler) as server:
+        server.executor = executor
+        print(f"Listening on {socket_path}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(socket_path)
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Run a long-lived conversion worker.")
+    parser.add_argument("--socket", type=Path, default=None,
+                        help="Listen on this Unix socket instead of stdin/stdout.")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="Pool size for --socket (default: depends on the pool).")
+    parser.add_argument("--pool", choices=("thread", "process"), default="thread",
+                        help="Pool running socket requests (default: thread).")
+    parser.add_argument("--sections-config", type=Path, default=None,
+                        help="YAML or JSON file registering extra sections.")
+    parser.add_argument("--yaml-backend", choices=BACKENDS, default="auto",
+                        help="YAML backend: libyaml when available (auto), or force one.")
+    args = parser.parse_args(argv)
+
+    if args.socket:
+        serve_socket(args.socket, args.workers, args.pool, args.sections_config,
+                     args.yaml_backend)
+    else:
+        init_worker(args.sections_config, args.yaml_backend)
+        serve_stdio()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
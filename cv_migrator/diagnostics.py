@@ -0,0 +1,122 @@
+"""
+Failures recorded by conversions that keep going.
+
+With --keep-going, old_text_to_yaml.py and batch_migrate.py leave out the
+entries, transcript rows and includes that fail to parse instead of
+stopping, and record each failure with its file, line, section and source
+text (included files are named by their absolute path, as the documents
+are). The report is written as JSON once every file is done:
+
+    {
+      "files": 2,
+      "failures": 1,
+      "diagnostics": [
+        {"file": "/home/cv/main_en.tex", "line": 42, "section": "Production",
+         "subsection": "Publications",
+         "error": "ValueError: Unexpected number of parts in entry.",
+         "raw": "\\\\cventry{2021}{A paper}{Journal}"}
+      ]
+    }
+
+A file that cannot be parsed at all, such as one with an unclosed brace, is
+recorded once, without a section, and produces no output.
+"""
+from dataclasses import asdict, dataclass
+from pathlib import Path
+import linecache
+import re
+
+
+# Source lines gathered at most for the raw text of a failure.
+MAX_RAW_LINES = 50
+
+_ESCAPED_RE = re.compile(r'\\[\\{}%]')
+_COMMENT_RE = re.compile(r'%.*')
+
+
+@dataclass
+class Diagnostic:
+    """A failure: where it happened, the error and the source text."""
+    file: str
+    line: int | None
+    section: str | None
+    subsection: str | None
+    error: str
+    raw: str | None
+
+
+def source_text(filepath, line: int) -> str | None:
+    """
+    Returns the source of whatever starts on a line of a file: the line, and
+    the following ones up to where the braces opened on it are closed.
+
+    Args:
+        filepath: The file.
+        line: The 1-based line number.
+
+    Returns:
+        The text, or None if the file or line cannot be read.
+    """
+    lines = linecache.getlines(str(filepath))
+    if not 0 < line <= len(lines):
+        return None
+    depth = 0
+    text = []
+    for source_line in lines[line - 1:line - 1 + MAX_RAW_LINES]:
+        text.append(source_line)
+        code = _COMMENT_RE.sub("", _ESCAPED_RE.sub("", source_line))
+        depth += code.count("{") - code.count("}")
+        if depth <= 0:
+            break
+    return "".join(text).rstrip("\n")
+
+
+class Diagnostics:
+    """The failures of one or more conversions, in the order they happened."""
+
+    def __init__(self):
+        self.records: list[Diagnostic] = []
+
+    def __len__(self):
+        return len(self.records)
+
+    def record(self, error: BaseException, file, line: int = None, section: str = None,
+               subsection: str = None, raw: str = None) -> Diagnostic:
+        """
+        Records a failure.
+
+        Args:
+            error: The exception raised.
+            file: The file being converted, or "-" for stdin.
+            line: The line where the failing entry or row starts.
+            section: The section being read, if any.
+            subsection: The subsection being read, if any.
+            raw: The source text that failed. Defaults to the text starting
+                on line, read from file.
+
+        Returns:
+            The recorded diagnostic.
+        """
+        if str(file) != "-":
+            file = Path(file).resolve()
+            if raw is None and line is not None:
+                raw = source_text(file, line)
+        diagnostic = Diagnostic(str(file), line, section or None, subsection or None,
+                                f"{type(error).__name__}: {error}", raw)
+        self.records.append(diagnostic)
+        return diagnostic
+
+    def extend(self, records):
+        """Adds diagnostics recorded elsewhere, such as in a worker process."""
+        self.records.extend(records)
+
+    def report(self, **extra) -> dict:
+        """
+        Returns the report as JSON-serializable data.
+
+        Args:
+            **extra: Fields added before the diagnostics, such as the
+                number of files converted.
+        """
+        return {**extra, "failures": len(self.records),
+                "diagnostics": [asdict(record) for record in self.records]}
@@ -0,0 +1,240 @@
+"""
+Output formats for CV content: YAML, JSON, JSON Lines and MessagePack.
+
+Each format is an Emitter that writes the content dict to an open file and
+reads it back, so both converters can use any of them:
+
+    emitter = get_emitter("jsonl")
+    with open("main.jsonl", "w", encoding="utf8") as file:
+        emitter.dump(content, file)
+
+JSON Lines writes one record per line, in document order, so consumers can
+stream entries without building the whole tree (see iter_entries):
+
+    {"record": "section", "section": "Production", "list": false}
+    {"record": "subsection", "section": "Production", "subsection": "Publications"}
+    {"record": "entry", "section": "Production", "subsection": "Publications", "entry": {...}}
+    {"record": "item", "section": "Languages", "key": "English", "value": {"level": "Advanced"}}
+    {"record": "text", "section": "Skills", "text": "Python, LaTeX and **microscopy**."}
+
+YAML and JSON Lines can also be read one section at a time, with
+iter_sections, so a renderer holds a single section in memory.
+
+MessagePack needs the optional msgpack package, which is imported only when
+the format is used.
+"""
+from dataclasses import dataclass
+from typing import Callable
+import importlib.util
+import json
+
+from .cv_model import EntryModel
+from .yaml_backend import dump_yaml, iter_yaml_sections, load_yaml
+
+
+@dataclass(frozen=True)
+class Emitter:
+    """
+    A file format for CV content.
+
+    iter_sections, when the format has it, reads an open file lazily and
+    yields its (section name, content) pairs in order.
+    """
+    name: str
+    suffix: str
+    dump: Callable
+    load: Callable
+    binary: bool = False
+    iter_sections: Callable = None
+
+
+EMITTERS: dict[str, Emitter] = {}
+
+
+def register_emitter(emitter: Emitter):
+    """Registers a format, replacing any format with the same name."""
+    EMITTERS[emitter.name] = emitter
+
+
+def get_emitter(name: str) -> Emitter:
+    """
+    Looks a format up by name.
+
+    Raises:
+        ValueError: If the format is unknown or its dependency is missing.
+    """
+    try:
+        emitter = EMITTERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown format {name!r}; use one of {', '.join(EMITTERS)}.") from None
+    if name == "msgpack" and importlib.util.find_spec("msgpack") is None:
+        raise ValueError("The msgpack format requires the msgpack package.")
+    return emitter
+
+
+def emitter_for_path(filepath) -> Emitter:
+    """Returns the format of a file from its suffix, defaulting to YAML."""
+    suffix = str(filepath).rpartition(".")[2].lower()
+    for emitter in EMITTERS.values():
+        if emitter.suffix == "." + suffix:
+            return get_emitter(emitter.name)
+    return EMITTERS["yaml"]
+
+
+def _default(value):
+    """Serializes cv_model entries for the JSON and MessagePack encoders."""
+    if isinstance(value, EntryModel):
+        return value.to_mapping()
+    raise TypeError(f"Object of type {type(value).__name__} is not serializable")
+
+
+def dump_json(content: dict, stream):
+    json.dump(content, stream, ensure_ascii=False, indent=2, default=_default)
+    stream.write("\n")
+
+
+def load_json(stream) -> dict:
+    return json.load(stream)
+
+
+def iter_records(content: dict):
+    """
+    Flattens CV content into JSON Lines records, in document order.
+
+    Args:
+        content: The CV content, keyed by section name.
+
+    Yields:
+        One mapping per section, subsection, entry, keyed item and line of
+        free text.
+    """
+    for section, section_content in content.items():
+        if isinstance(section_content, list):
+            yield {"record": "section", "section": section, "list": True}
+            for entry in section_content:
+                yield {"record": "entry", "section": section, "subsection": None, "entry": entry}
+            continue
+        if not isinstance(section_content, dict):
+            raise ValueError(f"Section {section!r} is neither a mapping nor a list.")
+
+        yield {"record": "section", "section": section, "list": False}
+        for key, value in section_content.items():
+            if key == "free_text" and isinstance(value, list):
+                for text in value:
+                    yield {"record": "text", "section": section, "text": text}
+            elif isinstance(value, list):
+                yield {"record": "subsection", "section": section, "subsection": key}
+                for entry in value:
+                    yield {"record": "entry", "section": section, "subsection": key,
+                           "entry": entry}
+            else:
+                # Language levels and transcript rows.
+                yield {"record": "item", "section": section, "key": key, "value": value}
+
+
+def content_from_records(records) -> dict:
+    """
+    Rebuilds CV content from JSON Lines records.
+
+    Args:
+        records: An iterable of records as written by iter_records.
+
+    Returns:
+        The CV content, keyed by section name.
+    """
+    content = {}
+    for record in records:
+        kind = record.get("record")
+        section = record.get("section")
+        if kind == "section":
+            content[section] = [] if record.get("list") else {}
+        elif kind == "subsection":
+            content[section][record["subsection"]] = []
+        elif kind == "entry":
+            subsection = record.get("subsection")
+            target = content[section] if subsection is None else content[section][subsection]
+            target.append(record["entry"])
+        elif kind == "item":
+            content[section][record["key"]] = record["value"]
+        elif kind == "text":
+            content[section].setdefault("free_text", []).append(record["text"])
+        else:
+            raise ValueError(f"Unknown JSON Lines record {kind!r}.")
+    return content
+
+
+def iter_jsonl_records(stream):
+    """Decodes the records of a JSON Lines file one line at a time."""
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON on line {line_number}: {e}") from None
+
+
+def iter_entries(stream):
+    """
+    Streams the entries of a JSON Lines file.
+
+    Args:
+        stream: Open JSON Lines file.
+
+    Yields:
+        Tuples of section, subsection (None in list sections) and entry.
+        Free text is left out.
+    """
+    for record in iter_jsonl_records(stream):
+        if record.get("record") == "entry":
+            yield record["section"], record["subsection"], record["entry"]
+
+
+def iter_jsonl_sections(stream):
+    """
+    Rebuilds the sections of a JSON Lines file one at a time.
+
+    Args:
+        stream: Open JSON Lines file.
+
+    Yields:
+        Tuples of section name and content, in file order.
+    """
+    records = []
+    for record in iter_jsonl_records(stream):
+        if record.get("record") == "section" and records:
+            yield from content_from_records(records).items()
+            records = []
+        records.append(record)
+    if records:
+        yield from content_from_records(records).items()
+
+
+def dump_jsonl(content: dict, stream):
+    for record in iter_records(content):
+        stream.write(json.dumps(record, ensure_ascii=False, default=_default))
+        stream.write("\n")
+
+
+def load_jsonl(stream) -> dict:
+    return content_from_records(iter_jsonl_records(stream))
+
+
+def dump_msgpack(content: dict, stream):
+    import msgpack
+    stream.write(msgpack.packb(content, default=_default, use_bin_type=True))
+
+
+def load_msgpack(stream) -> dict:
+    import msgpack
+    return msgpack.unpackb(stream.read(), raw=False)
+
+
+register_emitter(Emitter("yaml", ".yaml", dump_yaml, load_yaml,
+                         iter_sections=iter_yaml_sections))
+register_emitter(Emitter("json", ".json", dump_json, load_json))
+register_emitter(Emitter("jsonl", ".jsonl", dump_jsonl, load_jsonl,
+                         iter_sections=iter_jsonl_sections))
+register_emitter(Emitter("msgpack", ".msgpack", dump_msgpack, load_msgpack, binary=True))
+
+FORMATS = tuple(EMITTERS)
@@ -0,0 +1,192 @@
+"""
+Streaming tokenizer of LaTeX sources.
+
+Splits a document into command, group, text, comment and newline tokens,
+each with the line and column where it starts:
+
+    for token in tokenize(open("main.tex", encoding="utf8")):
+        if token.kind == COMMAND and token.name == "section":
+            ...
+
+Lines are pulled lazily from any iterable of lines (or a whole text), and
+every character is matched once by a single regular expression, so sources
+of any size are tokenized in linear time and constant memory. Commands,
+groups and comments may start anywhere in a line and groups may span lines;
+putting them back together is left to the parsers (see TokenStream).
+
+A group that closes on the line it opens, holds no comment and nests at
+most one level of braces, such as {2021} or {A \\textbf{bold} title}, is a
+single GROUP token: the arguments of most commands are read in one match.
+Any other group is delimited by BEGIN_GROUP and END_GROUP tokens around
+the tokens it holds.
+
+Only the characters that structure CV sources are special: backslashes,
+braces, percent signs and line breaks. Everything else, including $, & and
+[ ], is text.
+"""
+from collections import deque
+from typing import NamedTuple
+import re
+
+
+COMMAND = "command"
+GROUP = "group"
+BEGIN_GROUP = "begin_group"
+END_GROUP = "end_group"
+TEXT = "text"
+COMMENT = "comment"
+NEWLINE = "newline"
+
+_TOKEN_RE = re.compile(
+    # Control words (with an optional star, as in \section*) and control
+    # symbols such as \\, \{ or \%. A backslash ending a line stands alone.
+    r'(?P<command>\\(?:[A-Za-z@]+\*?|.?))'
+    # One-line groups nesting at most one level, matched atomically so that
+    # a group closing on a later line fails in linear time.
+    r'|(?P<group>\{(?>[^\\{}%\n]+|\\[A-Za-z@]+\*?|\\[^\n]|\{[^\\{}%\n]*\})*\})'
+    r'|(?P<begin_group>\{)'
+    r'|(?P<end_group>\})'
+    r'|(?P<comment>%[^\n]*)'
+    r'|(?P<newline>\n)'
+    r'|(?P<text>[^\\{}%\n]+)'
+)
+
+
+class Token(NamedTuple):
+    """A piece of LaTeX source and where it starts (1-based line and column)."""
+    kind: str
+    text: str
+    line: int
+    column: int
+
+    @property
+    def name(self) -> str:
+        """The name of a command without its backslash, such as "section"."""
+        return self.text[1:]
+
+
+class UnbalancedBracesError(ValueError):
+    """
+    Raised when a braced group is still open at the end of the input.
+
+    Attributes:
+        line_number: The line where the unclosed group starts.
+    """
+
+    def __init__(self, line_number: int, depth: int):
+        self.line_number = line_number
+        self.depth = depth
+        super().__init__(f"Unbalanced braces: group opened on line {line_number} "
+                         f"is not closed ({depth} brace(s) missing).")
+
+
+def tokenize(source):
+    """
+    Tokenizes a LaTeX source.
+
+    Args:
+        source: The LaTeX text, or an iterable of its lines, such as an open
+            file or the list of str.splitlines(). Chunks must end at line
+            boundaries; one that does not end with a line break is taken to
+            end its line. It is consumed lazily.
+
+    Yields:
+        The tokens, in source order. Text never spans a line break, which
+        is a token of its own.
+    """
+    if isinstance(source, str):
+        source = (source,)
+    new = tuple.__new__
+    finditer = _TOKEN_RE.finditer
+    line = 1
+    unterminated = None
+    for chunk in source:
+        if unterminated is not None:
+            # The previous chunk ended a line without a line break.
+            yield unterminated
+            line += 1
+            unterminated = None
+        line_start = 0
+        for match in finditer(chunk):
+            kind = match.lastgroup
+            start = match.start()
+            yield new(Token, (kind, match[0], line, start - line_start + 1))
+            if kind == NEWLINE:
+                line += 1
+                line_start = start + 1
+        if chunk and chunk[-1] != "\n":
+            unterminated = new(Token, (NEWLINE, "\n", line, len(chunk) - line_start + 1))
+
+
+class TokenStream:
+    """
+    Iterator over tokens with a bounded lookahead window.
+
+    Only the tokens in the window are held in memory, so the source is read
+    in constant space whatever its size.
+    """
+
+    def __init__(self, tokens, lookahead: int = 4):
+        self._tokens = iter(tokens)
+        self._window = deque()
+        self._lookahead = lookahead
+        self._iterator = self._iterate()
+
+    def _iterate(self):
+        # Tokens peeked while this generator is suspended come before the
+        # one it pulls next.
+        window = self._window
+        while window:
+            yield window.popleft()
+        for token in self._tokens:
+            yield token
+            while window:
+                yield window.popleft()
+
+    def __iter__(self):
+        return self._iterator
+
+    def __next__(self) -> Token:
+        return next(self._iterator)
+
+    def peek(self, offset: int = 1):
+        """
+        Returns an upcoming token without consuming it.
+
+        Args:
+            offset: 1 for the next token, 2 for the one after, and so on, up
+                to the lookahead size.
+
+        Returns:
+            The token, or None if the source ends before it.
+        """
+        if not 0 < offset <= self._lookahead:
+            raise ValueError(f"Lookahead is limited to {self._lookahead} tokens.")
+        while len(self._window) < offset:
+            try:
+                self._window.append(next(self._tokens))
+            except StopIteration:
+                return None
+        return self._window[offset - 1]
+
+    def push_back(self, token: Token):
+        """Puts back a consumed token, to be the next one."""
+        self._window.appendleft(token)
+
+    def skip_blank(self, newlines: bool = True):
+        """
+        Consumes whitespace and comments.
+
+        Args:
+            newlines: Whether line breaks are skipped too.
+
+        Returns:
+            The next token, not consumed, or None at the end of the source.
+        """
+        for token in self._iterator:
+            kind = token.kind
+            if not (kind == COMMENT or (kind == TEXT and token.text.isspace())
+                    or (newlines and kind == NEWLINE)):
+                self._window.appendleft(token)
+                return token
+        return None
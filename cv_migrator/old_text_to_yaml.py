@@ -0,0 +1,1071 @@
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+import argparse
+import io
+import mmap
+import os
+import re
+import sys
+
+from . import profiling
+from .cv_model import (CourseEntry, EducationEntry, GenericEntry, LanguageExamEntry,
+                       PosterEntry, PublicationEntry, intern_shared_fields)
+from .diagnostics import Diagnostics
+from .emitters import FORMATS, get_emitter
+from .latex_tokenizer import (BEGIN_GROUP, COMMAND, COMMENT, END_GROUP, GROUP, NEWLINE, TEXT,
+                              Token, TokenStream, UnbalancedBracesError, tokenize)
+from .section_registry import REGISTRY, load_registry_config
+from .tex_includes import INCLUDE_COMMANDS, INCLUDE_EVENT, IncludeResolver
+from .yaml_backend import BACKENDS, dump_yaml, set_backend
+
+
+# Files at least this large are read through a memory map instead of a
+# buffered text handle.
+MMAP_THRESHOLD = 64 * 1024 * 1024
+
+
+def convert_tex_to_yaml(filepath: Path, compact: bool = False, output_format: str = "yaml",
+                        resolver: IncludeResolver = None, diagnostics: Diagnostics = None):
+    """
+    Converts a LaTeX CV file to YAML, or to another format of emitters.py.
+
+    The output is written next to the input with the suffix of the format.
+    A filepath of "-" reads the LaTeX from stdin and writes to stdout.
+    Files pulled in with \\input or \\include are resolved relative to the
+    directory of filepath and parsed as part of it.
+
+    Args:
+        filepath: Path to the .tex file to convert, or "-".
+        compact: Write repeated authors, venues and locations once, with
+            YAML anchors and aliases (YAML only).
+        output_format: One of emitters.FORMATS.
+        resolver: Reads the included files; afterwards its includes tell
+            which files were read. Defaults to a new one for filepath.
+        diagnostics: Record the entries that fail to parse there and leave
+            them out, instead of stopping at the first one.
+
+    Returns:
+        The path of the written file, or None when writing to stdout.
+    """
+    emitter = get_emitter(output_format)
+    if compact and emitter.name != "yaml":
+        raise ValueError("Compact output is only available for YAML.")
+
+    if resolver is None and str(filepath) != "-":
+        resolver = IncludeResolver(filepath, parse_tex_file)
+    with open_tex_source(filepath) as source:
+        content = tex_to_dict(profiling.profiled_lines("read", source), resolver, diagnostics)
+    if compact:
+        intern_shared_fields(content)
+
+    # Serialize fully before opening the output, so a failure leaves it untouched.
+    with profiling.stage("dump"):
+        buffer = io.BytesIO() if emitter.binary else io.StringIO()
+        emitter.dump(content, buffer, **({"compact": True} if compact else {}))
+        data = buffer.getvalue()
+
+    with profiling.stage("write"):
+        if str(filepath) == "-":
+            if emitter.binary:
+                sys.stdout.buffer.write(data)
+            else:
+                sys.stdout.write(data)
+            return None
+
+        # Write next to the input
+        output_filepath = filepath.with_suffix(emitter.suffix)
+        if emitter.binary:
+            output_filepath.write_bytes(data)
+        else:
+            with open(output_filepath, 'w', encoding="utf8") as output_file:
+                output_file.write(data)
+    return output_filepath
+
+
+def tex_to_dict(source, resolver: IncludeResolver = None,
+                diagnostics: Diagnostics = None) -> dict:
+    """
+    Parses a LaTeX CV, without touching the filesystem unless it has to
+    read included files.
+
+    Args:
+        source: The LaTeX text, or an iterable of its lines.
+        resolver: Reads the files of \\input and \\include commands;
+            without one they are ignored.
+        diagnostics: Record the entries that fail to parse there and leave
+            them out, instead of raising.
+
+    Returns:
+        The CV content, keyed by section name. Entries are cv_model
+        classes; cv_model.to_plain turns them into plain mappings.
+    """
+    if isinstance(source, str):
+        source = io.StringIO(source)
+    return parse_tex_lines(source, resolver, diagnostics)
+
+
+def tex_to_yaml_text(source, compact: bool = False, resolver: IncludeResolver = None) -> str:
+    """
+    Converts a LaTeX CV to YAML text without writing any file.
+
+    Args:
+        source: The LaTeX text, or an iterable of its lines.
+        compact: Write repeated authors, venues and locations once, with
+            YAML anchors and aliases.
+        resolver: Reads the files of \\input and \\include commands;
+            without one they are ignored.
+
+    Returns:
+        The YAML text.
+    """
+    content = tex_to_dict(source, resolver)
+    if compact:
+        intern_shared_fields(content)
+    return dump_yaml(content, compact=compact)
+
+
+@contextmanager
+def open_tex_source(filepath, use_mmap: bool = None):
+    """
+    Opens a LaTeX source as a stream of lines.
+
+    Args:
+        filepath: Path to the file, or "-" for stdin.
+        use_mmap: Whether to read the file through a memory map. Defaults to
+            doing so for files of at least MMAP_THRESHOLD bytes.
+
+    Yields:
+        An iterable of text lines that is consumed lazily.
+    """
+    if str(filepath) == "-":
+        yield io.TextIOWrapper(sys.stdin.buffer, encoding="utf8")
+        return
+
+    if use_mmap is None:
+        use_mmap = os.path.getsize(filepath) >= MMAP_THRESHOLD
+    if use_mmap:
+        with open(filepath, 'rb') as raw_file, \
+                mmap.mmap(raw_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield (line.decode("utf8") for line in iter(buffer.readline, b""))
+    else:
+        with open(filepath, 'r', encoding="utf8") as file:
+            yield file
+
+
+# Commands the parser acts on; any other command is kept as text.
+_PARSED_COMMANDS = frozenset(
+    "\\" + name for base in ("section", "subsection", "title", "cventry", "cvitemwithcomment")
+    for name in (base, base + "*")) | {"\\href"} | INCLUDE_COMMANDS
+
+# Escaped braces in the arguments of commands, written as plain braces.
+_ESCAPED_BRACE_RE = re.compile(r'\\([{}])')
+
+
+def parse_tex_lines(lines, resolver: IncludeResolver = None,
+                    diagnostics: Diagnostics = None) -> dict:
+    """
+    Parses the lines of a LaTeX CV into a dictionary of sections.
+
+    Args:
+        lines: Any iterable of lines, such as an open file. It is consumed
+            lazily.
+        resolver: Reads the files of \\input and \\include commands;
+            without one they are ignored.
+        diagnostics: Record the entries that fail to parse there and leave
+            them out, instead of raising.
+
+    Returns:
+        The CV content, keyed by section name.
+    """
+    return CVBuilder(resolver, diagnostics).build(parse_tex_events(lines))
+
+
+def parse_tex_events(lines) -> list[tuple]:
+    """
+    Parses the lines of a LaTeX file into the events of CVTokenParser.
+
+    Args:
+        lines: Any iterable of lines, such as an open file.
+
+    Returns:
+        The events, in source order.
+    """
+    return CVTokenParser(profiling.profiled_lines("tokenize", tokenize(lines))).parse()
+
+
+def parse_tex_file(filepath) -> list[tuple]:
+    """Parses a LaTeX file into the events of CVTokenParser."""
+    with open_tex_source(filepath) as source:
+        return parse_tex_events(source)
+
+
+def locate_structure(text: str) -> tuple[list[tuple[tuple, int]], int]:
+    """
+    Finds where the commands of LaTeX text start, as parse_tex_events reads
+    them: wherever they appear, also after other text on their line, and
+    not in comments or inside arguments.
+
+    Text split at these offsets is split where the converter sees the
+    structure of the document.
+
+    Returns:
+        The event of every title, section, subsection, entry, item and
+        include command with the index in text where the command starts,
+        in source order; and the index of the first \\end{document}, or
+        len(text) without one.
+    """
+    parser = _StructureParser(text)
+    parser.parse()
+    line_starts = [0]
+    line_starts.extend(match.end() for match in re.finditer("\n", text))
+
+    def offset(token):
+        return line_starts[token.line - 1] + token.column - 1
+
+    end = len(text) if parser.end is None else offset(parser.end)
+    return [(event, offset(token)) for event, token in parser.starts], end
+
+
+class CVTokenParser:
+    """
+    Turns the tokens of latex_tokenizer into the events of a CV.
+
+    Titles, sections, subsections, entries and includes are recognized
+    wherever their command appears, also when it shares a line with other
+    commands or its arguments span several lines. The remaining text is
+    gathered line by line and converted to Markdown.
+
+    Events are tuples, replayed in order by CVBuilder:
+
+        ("section", name)           ("subsection", name)
+        ("title", title)            ("line", markdown_text, line)
+        ("entry", parts, line)      ("item", parts, line)
+        ("include", command, name, line)
+        ("error", message, line)
+
+    An error event stands for a command that could not be read; CVBuilder
+    raises it, or records it and goes on when it keeps going.
+
+    They do not depend on the sections or files before them, so a file
+    can be parsed on its own and its events reused wherever it is included.
+    """
+
+    def __init__(self, tokens):
+        self.tokens = TokenStream(tokens)
+        self.events: list[tuple] = []
+        self._line: list[str] = []
+
+    def parse(self) -> list[tuple]:
+        """
+        Consumes all the tokens.
+
+        Returns:
+            The events, in source order.
+        """
+        line = self._line
+        token = None
+        for token in self.tokens:
+            kind = token.kind
+            if kind == NEWLINE:
+                self._end_line(token.line)
+            elif kind == COMMAND and token.text in _PARSED_COMMANDS:
+                self._command(token)
+            elif kind != COMMENT:
+                # Text, groups, and inline markup or other commands, which
+                # are dropped with their line unless it holds some text.
+                line.append(token.text)
+        self._end_line(token.line if token is not None else 1)
+        return self.events
+
+    def _command(self, token: Token):
+        if token.text == "\\href":
+            self._line.append(self._read_href(token))
+            return
+        self._end_line(token.line)
+        name = token.name.rstrip("*")
+        if name == "cventry":
+            with profiling.stage("arguments"):
+                parts = self._read_arguments(token, 6, extra=True)
+            self.events.append(("entry", [part.strip() for part in parts if part.strip()],
+                                token.line))
+        elif name == "cvitemwithcomment":
+            parts = self._read_arguments(token, 3)
+            self.events.append(("item", [part.strip() for part in parts if part.strip()],
+                                token.line))
+        else:
+            try:
+                argument = self._read_argument(token)
+            except UnbalancedBracesError:
+                raise
+            except ValueError as e:
+                self.events.append(("error", str(e), token.line))
+                return
+            if token.text in INCLUDE_COMMANDS:
+                self.events.append((INCLUDE_EVENT, token.text, argument, token.line))
+            else:
+                # \section, \subsection or \title.
+                self.events.append((name, argument))
+
+    def _end_line(self, line_number: int):
+        """Turns the text gathered since the last line break into a line event."""
+        if not self._line:
+            return
+        line = latex_inline_to_markdown("".join(self._line).strip()).strip()
+        self._line.clear()
+        if line:
+            self.events.append(("line", line, line_number))
+
+    def _read_arguments(self, command: Token, count: int, extra: bool = False) -> list[str]:
+        """
+        Reads up to count {..} arguments of a command, skipping an optional
+        [..] argument first.
+
+        Args:
+            command: The command, already consumed.
+            count: Number of arguments of the command.
+            extra: Also read the groups that follow the last argument on
+                its line, as extra arguments.
+
+        Returns:
+            The arguments found before any other text or command.
+        """
+        self._skip_optional_argument()
+        arguments = []
+        while len(arguments) < count or extra:
+            token = self.tokens.skip_blank(newlines=len(arguments) < count)
+            if token is None or token.kind not in (GROUP, BEGIN_GROUP):
+                break
+            arguments.append(self._read_group(next(self.tokens)))
+        return arguments
+
+    def _read_argument(self, command: Token) -> str:
+        """
+        Reads the {..} argument of a command.
+
+        Raises:
+            ValueError: If the command has no argument.
+        """
+        token = self.tokens.skip_blank()
+        if token is None or token.kind not in (GROUP, BEGIN_GROUP):
+            raise ValueError(f"Expected {{...}} after {command.text} on line {command.line}, "
+                             f"column {command.column}.")
+        return self._read_group(next(self.tokens))
+
+    def _skip_optional_argument(self):
+        token = self.tokens.skip_blank(newlines=False)
+        if token is None or token.kind != TEXT or not token.text.lstrip().startswith("["):
+            return
+        for token in self.tokens:
+            if token.kind == NEWLINE or (token.kind == TEXT and "]" in token.text):
+                return
+
+    def _read_group(self, opening: Token) -> str:
+        """
+        Reads a group up to its closing brace.
+
+        Line breaks in the group become single spaces, with the whitespace
+        around them removed, and comments are dropped with their line break.
+
+        Args:
+            opening: The GROUP token, or the opening brace of a longer
+                group, already consumed.
+
+        Returns:
+            The text of the group, converted to Markdown.
+
+        Raises:
+            UnbalancedBracesError: If the source ends inside the group.
+        """
+        if opening.kind == GROUP:
+            text = opening.text[1:-1]
+            if "\\" not in text and "{" not in text:
+                # Plain text, which holds no markup to convert.
+                return text
+            return _ESCAPED_BRACE_RE.sub(r'\1', latex_inline_to_markdown(text))
+        tokens = self.tokens
+        pieces = []
+        line_start = 0
+        strip_leading = False
+        depth = 1
+        for token in tokens:
+            kind = token.kind
+            if kind == TEXT:
+                text = token.text
+                if strip_leading:
+                    text = text.lstrip()
+                    if not text:
+                        continue
+                    strip_leading = False
+                pieces.append(text)
+                continue
+            if kind == NEWLINE or kind == COMMENT:
+                if kind == COMMENT:
+                    following = tokens.peek()
+                    if following is None or following.kind != NEWLINE:
+                        continue
+                    next(tokens)
+                else:
+                    # Remove the trailing whitespace of the line.
+                    while len(pieces) > line_start:
+                        text = pieces[-1].rstrip()
+                        if text:
+                            pieces[-1] = text
+                            break
+                        pieces.pop()
+                    pieces.append(" ")
+                line_start = len(pieces)
+                strip_leading = True
+                continue
+
+            strip_leading = False
+            if kind == BEGIN_GROUP:
+                depth += 1
+            elif kind == END_GROUP:
+                depth -= 1
+                if not depth:
+                    return _ESCAPED_BRACE_RE.sub(r'\1', latex_inline_to_markdown("".join(pieces)))
+            elif kind == COMMAND and token.text == "\\href":
+                pieces.append(self._read_href(token))
+                continue
+            pieces.append(token.text)
+        raise UnbalancedBracesError(opening.line, depth)
+
+    def _read_href(self, command: Token) -> str:
+        """
+        Reads an \\href, turning the form split over three lines used in
+        some CVs (\\href \\\\, then the url and the link text on the next
+        lines) into a Markdown link.
+
+        Returns:
+            The link, or the command itself when it is not split.
+        """
+        tokens = self.tokens
+        offset = 0
+        # \\ and the line break, each possibly preceded by spaces.
+        for expected in ("\\\\", "\n"):
+            offset += 1
+            token = tokens.peek(offset)
+            if token is not None and token.kind == TEXT and token.text.isspace():
+                offset += 1
+                token = tokens.peek(offset)
+            if token is None or token.text != expected:
+                return command.text
+        for _ in range(offset):
+            next(tokens)
+
+        url = self._read_line()
+        link_text = self._read_line(keep_newline=True)
+        if url is None or link_text is None:
+            return ""
+        url = url.rstrip("\\").strip()
+        return f"[{link_text}]({url})"
+
+    def _read_line(self, keep_newline: bool = False):
+        """
+        Reads the source up to the end of the line or of the enclosing group.
+
+        Args:
+            keep_newline: Leave the line break unconsumed.
+
+        Returns:
+            The stripped source, or None at the end of the source.
+        """
+        tokens = self.tokens
+        if tokens.peek() is None:
+            return None
+        pieces = []
+        while (token := tokens.peek()) is not None and token.kind != END_GROUP:
+            if token.kind == NEWLINE:
+                if not keep_newline:
+                    next(tokens)
+                break
+            next(tokens)
+            if token.kind != COMMENT:
+                pieces.append(token.text)
+        return "".join(pieces).strip()
+
+
+class _StructureParser(CVTokenParser):
+    """
+    A CVTokenParser that records the command of every event but errors,
+    and the first \\end{document}. Text is not converted.
+    """
+
+    def __init__(self, text: str):
+        self.starts: list[tuple[tuple, Token]] = []
+        self.end: Token | None = None
+        super().__init__(self._watch(tokenize(text)))
+
+    def _watch(self, tokens):
+        previous = None
+        for token in tokens:
+            if (self.end is None and token.kind == GROUP and token.text == "{document}"
+                    and previous is not None and previous.text == "\\end"):
+                self.end = previous
+            previous = token
+            yield token
+
+    def _command(self, token: Token):
+        count = len(self.events)
+        super()._command(token)
+        if len(self.events) > count and self.events[-1][0] != "error":
+            self.starts.append((self.events[-1], token))
+
+    def _end_line(self, line_number: int):
+        # Only the commands matter here.
+        self._line.clear()
+
+
+class CVBuilder:
+    """
+    Builds the CV content by replaying the events of CVTokenParser.
+
+    Which section an entry or a line belongs to, and whether a line is a
+    transcript row, is decided here from the events before it. The events
+    of an included file are replayed where it is included, as if its text
+    were there.
+
+    With diagnostics, an event that fails (an entry or transcript row that
+    does not parse, a missing include) is recorded there and left out, and
+    the events after it are replayed as usual.
+    """
+
+    def __init__(self, resolver: IncludeResolver = None, diagnostics: Diagnostics = None):
+        self.resolver = resolver
+        self.diagnostics = diagnostics
+        self.content: dict = {}
+        self.section_name = ''
+        self.subsection_name = ''
+        self.in_transcript = False
+        self._including: list[Path] = []
+
+    def build(self, events: list[tuple]) -> dict:
+        """
+        Replays the events of the main file.
+
+        Returns:
+            The CV content, keyed by section name.
+
+        Raises:
+            ValueError: If an entry does not parse, or an included file is
+                missing or includes itself, unless failures are recorded in
+                diagnostics.
+        """
+        document = None
+        if self.resolver is not None:
+            document = self.resolver.document
+            try:
+                self.resolver.prefetch(events)
+            except ValueError:
+                if self.diagnostics is None:
+                    raise
+                # The failing include is recorded when it is replayed.
+        self._replay(events, document)
+        return self.content
+
+    def _replay(self, events: list[tuple], filepath: Path):
+        for event in events:
+            try:
+                kind = event[0]
+                if kind == "line":
+                    self._add_line(event[1])
+                elif kind == "section":
+                    self._start_section(event[1])
+                elif kind == INCLUDE_EVENT:
+                    self._include(*event[1:], filepath)
+                elif kind == "error":
+                    raise ValueError(event[1])
+                elif self.in_transcript:
+                    # Only sections matter in a transcript; the rest is table rows.
+                    continue
+                elif kind == "entry":
+                    self._add_entry(event[1], event[2])
+                elif kind == "subsection":
+                    self.subsection_name = event[1]
+                    self.content[self.section_name][self.subsection_name] = []
+                elif kind == "title":
+                    self.in_transcript = REGISTRY.is_transcript_title(event[1])
+                elif kind == "item" and REGISTRY.is_languages_section(self.section_name):
+                    parts = event[1]
+                    if len(parts) < 2:
+                        raise ValueError(f"Unexpected number of parts in languages entry on "
+                                         f"line {event[2]}.")
+                    self.content[self.section_name][parts[0]] = {"level": parts[1]}
+            except Exception as e:
+                if self.diagnostics is None:
+                    raise
+                self._record(e, event, filepath)
+
+    def _record(self, error: Exception, event: tuple, filepath: Path):
+        """Records a failed event in the diagnostics."""
+        kind = event[0]
+        # Every event but sections, subsections and titles ends with its line.
+        line = event[-1] if len(event) > 2 else None
+        raw = None
+        if filepath is None:
+            # Text read from stdin cannot be read again: rebuild the source.
+            if kind in ("entry", "item"):
+                command = "\\cventry" if kind == "entry" else "\\cvitemwithcomment"
+                raw = command + "".join(f"{{{part}}}" for part in event[1])
+            elif kind == INCLUDE_EVENT:
+                raw = f"{event[1]}{{{event[2]}}}"
+            elif kind == "line":
+                raw = event[1]
+        self.diagnostics.record(error, filepath or "-", line, self.section_name,
+                                self.subsection_name, raw)
+
+    def _include(self, command: str, name: str, line: int, includer: Path):
+        if self.resolver is None:
+            return
+        filepath, events = self.resolver.load(command, name, includer, line)
+        if filepath in self._including or filepath == self.resolver.document:
+            raise ValueError(f"{command}{{{name}}} on line {line} of {includer.name} "
+                             f"includes {filepath.name} within itself.")
+        self._including.append(filepath)
+        self._replay(events, filepath)
+        self._including.pop()
+
+    def _start_section(self, section_name: str):
+        self.section_name = section_name
+        self.subsection_name = ''
+        if self.in_transcript or not REGISTRY.is_list_section(section_name):
+            self.content[section_name] = {}
+        else:
+            self.content[section_name] = []
+
+    def _add_entry(self, parts: list[str], line: int):
+        section_name, subsection_name = self.section_name, self.subsection_name
+        with profiling.entry(section_name, subsection_name, line):
+            with profiling.stage("section_dispatch"):
+                parse = REGISTRY.parser(section_name, subsection_name)
+            with profiling.stage(getattr(parse, "__name__", "parse")):
+                content_to_save = parse(parts)
+
+            if subsection_name:
+                self.content[section_name][subsection_name].append(content_to_save)
+            else:
+                self.content[section_name].append(content_to_save)
+
+    def _add_line(self, line: str):
+        if self.in_transcript:
+            if self.section_name in self.content and is_transcript_row(line):
+                assignment, grade, duration = parse_transcript_row(line)
+                row = {"grade": grade}
+                if duration is not None:
+                    row["duration"] = duration
+                self.content[self.section_name][assignment] = row
+        elif line.startswith("\\"):
+            # Lines of other commands, such as \name{..}{..} or \begin{document}.
+            return
+        elif REGISTRY.is_languages_section(self.section_name):
+            return
+        elif self.section_name in self.content:
+            self.content[self.section_name].setdefault("free_text", []).append(line)
+
+
+# Tokens of latex_inline_to_markdown. Commands whose argument holds no braces or
+# other commands ("leaves", groups 1-5) are converted from a single match; the
+# rest open a frame (group 6 or "$^{") that is closed by its matching brace.
+# Outside of a command plain braces are irrelevant, so they are only tokenized
+# while a frame is open.
+_INLINE_COMMAND_PATTERN = (
+    r'\\(textbf|textit|underline)\{([^{}\\$]*)\}'
+    r'|\$\^\{([^{}\\$]*)\}\$'
+    r'|\\href\{([^{}\\]*)\}\{([^{}\\$]*)\}'
+    r'|\\(textbf|textit|underline|href)\{|\$\^\{'
+)
+_INLINE_COMMAND_RE = re.compile(_INLINE_COMMAND_PATTERN)
+_INLINE_TOKEN_RE = re.compile(_INLINE_COMMAND_PATTERN + r'|\{[^{}\\]*\}|\\[{}]|[{}]')
+_INLINE_MARKERS = {"textbf": "**", "underline": "**", "textit": "*", "$^": "^"}
+
+
+@profiling.profiled("inline_markup")
+def latex_inline_to_markdown(latex_text: str) -> str:
+    """
+    Converts bold, italics, underline, superscript and hyperlink commands to
+    Markdown in a single pass.
+
+    The text is tokenized once and commands are matched with a stack, so
+    nested commands such as \\textbf{a \\textit{b}} become **a *b*** and
+    braces inside a command do not end it early. Unclosed commands are left
+    as they are.
+
+    Args:
+        latex_text: The LaTeX text string.
+
+    Returns:
+        The Markdown text string.
+    """
+    match = _INLINE_COMMAND_RE.search(latex_text)
+    if match is None:
+        return latex_text
+
+    markers = _INLINE_MARKERS
+    out: list[str] = []
+    buffer = out
+    # Each frame is [kind, opener, content, plain brace depth, url].
+    stack: list[list] = []
+    pos = 0
+    while match is not None:
+        start, end = match.span()
+        if start != pos:
+            buffer.append(latex_text[pos:start])
+        pos = end
+        group = match.lastindex
+
+        if group == 2:
+            marker = markers[match.group(1)]
+            buffer.append(marker + match.group(2) + marker)
+        elif group == 3:
+            buffer.append("^" + match.group(3) + "^")
+        elif group == 5:
+            buffer.append(f"[{match.group(5)}]({match.group(4)})")
+        elif group == 6 or match.group() == "$^{":
+            frame = [match.group(6) or "$^", match.group(), [], 0, None]
+            stack.append(frame)
+            buffer = frame[2]
+        else:
+            token = match.group()
+            if token == "}":
+                frame = stack[-1]
+                if frame[3]:
+                    frame[3] -= 1
+                    buffer.append(token)
+                else:
+                    stack.pop()
+                    kind, opener, content, _, url = frame
+                    content = "".join(content)
+                    buffer = stack[-1][2] if stack else out
+                    if kind == "href":
+                        if latex_text.startswith("{", pos):
+                            # The url is complete, the link text group follows.
+                            frame = ["href_text", opener + content + "}{", [], 0, content]
+                            stack.append(frame)
+                            buffer = frame[2]
+                            pos += 1
+                        else:
+                            buffer.append(opener + content + "}")
+                    elif kind == "href_text":
+                        buffer.append(f"[{content}]({url})")
+                    elif kind == "$^":
+                        if latex_text.startswith("$", pos):
+                            buffer.append(f"^{content}^")
+                            pos += 1
+                        else:
+                            buffer.append(opener + content + "}")
+                    else:
+                        marker = markers[kind]
+                        buffer.append(marker + content + marker)
+            elif token == "{":
+                stack[-1][3] += 1
+                buffer.append(token)
+            else:
+                # Escaped brace or brace-free plain group, kept verbatim.
+                buffer.append(token)
+
+        token_re = _INLINE_TOKEN_RE if stack else _INLINE_COMMAND_RE
+        match = token_re.search(latex_text, pos)
+
+    buffer.append(latex_text[pos:])
+    # Unclosed commands are written back unchanged.
+    while stack:
+        _, opener, content, _, _ = stack.pop()
+        buffer = stack[-1][2] if stack else out
+        buffer.append(opener + "".join(content))
+    return "".join(out)
+
+
+def parse_braced_groups(text: str) -> list[str]:
+    """
+    Parses top-level {..} groups while preserving nested braces inside a group.
+    """
+    groups = []
+    current = []
+    depth = 0
+    for token in tokenize(text):
+        if token.kind == GROUP and not depth:
+            groups.append(_ESCAPED_BRACE_RE.sub(r'\1', token.text[1:-1]))
+            continue
+        if token.kind == BEGIN_GROUP:
+            depth += 1
+            if depth == 1:
+                current = []
+                continue
+        elif token.kind == END_GROUP and depth:
+            depth -= 1
+            if not depth:
+                groups.append(_ESCAPED_BRACE_RE.sub(r'\1', "".join(current)))
+                continue
+        if depth:
+            current.append(token.text)
+    return groups
+
+
+# Trailing row terminators of a transcript table: \\ and \hline.
+_ROW_END_RE = re.compile(r'(?:\s*(?:\\\\|\\hline))+\s*$')
+
+# First cells of the header row of a transcript table.
+TRANSCRIPT_HEADERS = ("Assignment", "Asignatura")
+
+
+def is_transcript_row(line: str) -> bool:
+    """
+    Checks whether a line of a transcript holds a row of grades.
+
+    Args:
+        line: The stripped line.
+
+    Returns:
+        False for commands, comments, blank lines and header rows.
+    """
+    return bool(line) and not line.startswith(("\\", "%") + TRANSCRIPT_HEADERS)
+
+
+def parse_transcript_row(line: str) -> tuple[str, str, str | None]:
+    """
+    Parses a row of a transcript table: "Assignment & Grade [& Duration] \\\\".
+
+    Args:
+        line: The stripped line.
+
+    Returns:
+        The assignment, the grade and the duration, or None when the row
+        has no duration column.
+    """
+    parts = _ROW_END_RE.sub("", line).split("&")
+    if len(parts) < 2:
+        raise ValueError(f"Expected 'assignment & grade' in transcript row: {line!r}")
+    duration = parts[2].strip() if len(parts) == 3 else None
+    return parts[0].strip(), parts[1].strip(), duration
+
+
+def parse_education(parts):
+    """
+    Parses the education section from the LaTeX entry.
+
+    Args:
+        parts: The parts of the LaTeX entry.
+
+    Returns:
+        The parsed entry.
+    """
+    if len(parts) >= 4:
+        date, title, sub_location, location = parts[:4]
+        content = EducationEntry(
+            name=title.strip(),
+            date=date.strip(),
+            location=", ".join([sub_location.strip(), location.strip()]),
+            description=parts[4:] if len(parts) > 4 else [],
+        )
+    elif len(parts) == 3:
+        date, title, location = parts[:3]
+        content = EducationEntry(
+            name=title.strip(),
+            date=date.strip(),
+            location=location.strip(),
+            description=parts[2],
+        )
+    else:
+        raise ValueError("Unexpected number of parts in education entry "
+                         f"({len(parts)}): {parts!r}.")
+    return content
+
+
+def parse_generic(parts):
+    """
+    Parses an entry of a section without a dedicated parser.
+
+    Args:
+        parts: The parts of the LaTeX entry.
+
+    Returns:
+        The parsed entry.
+    """
+    if len(parts) >= 4:
+        date, title, location, description = parts[:4]
+        content = GenericEntry(
+            name=title.strip(),
+            date=date.strip(),
+            location=location.strip(),
+            description=description.strip(),
+            extras=parts[4:] if len(parts) > 4 else [],
+        )
+    else:
+        raise ValueError("Unexpected number of parts in entry "
+                         f"({len(parts)}): {parts!r}.")
+    return content
+
+
+def parse_publication(parts):
+    """
+    Parses the publications subsection from the LaTeX entry.
+
+    Args:
+        parts: The parts of the LaTeX entry.
+
+    Returns:
+        The parsed entry.
+    """
+    if len(parts) >= 4:
+        date, title, journal, authors = parts[:4]
+        content = PublicationEntry(
+            title=title.strip(),
+            date=date.strip(),
+            journal=journal.strip(),
+            authors=authors.strip(),
+            description=parts[4:] if len(parts) > 4 else [],
+        )
+    else:
+        raise ValueError("Unexpected number of parts in publication entry "
+                         f"({len(parts)}): {parts!r}.")
+    return content
+
+
+def parse_poster(parts):
+    """
+    Parses the posters subsection from the LaTeX entry.
+
+    Args:
+        parts: The parts of the LaTeX entry.
+
+    Returns:
+        The parsed entry.
+    """
+    if len(parts) >= 4:
+        date, title, event, authors = parts[:4]
+        content = PosterEntry(
+            title=title.strip(),
+            date=date.strip(),
+            event=event.strip(),
+            authors=authors.strip(),
+            description=parts[4:] if len(parts) > 4 else [],
+        )
+    else:
+        raise ValueError("Unexpected number of parts in poster entry "
+                         f"({len(parts)}): {parts!r}.")
+    return content
+
+
+def parse_course(parts):
+    """
+    Parses the courses subsection from the LaTeX entry.
+
+    Args:
+        parts: The parts of the LaTeX entry.
+
+    Returns:
+        The parsed entry.
+    """
+    if len(parts) >= 5:
+        date, title, extension, location, language = parts[:5]
+        content = CourseEntry(
+            name=title.strip(),
+            date=date.strip(),
+            extension=extension.strip(),
+            location=location.strip(),
+            language=language.lstrip("Language: ").lstrip("Idioma: ").strip(),
+            description=parts[5:] if len(parts) > 5 else [],
+        )
+    elif len(parts) == 4:
+        date, title, extension, location = parts[:4]
+        content = CourseEntry(
+            name=title.strip(),
+            date=date.strip(),
+            extension=extension.strip(),
+            location=location.strip(),
+            description=parts[4:] if len(parts) > 4 else [],
+        )
+    else:
+        raise ValueError("Unexpected number of parts in course entry "
+                         f"({len(parts)}): {parts!r}.")
+    return content
+
+
+def parse_language_exam(parts):
+    """
+    Parses the languages subsection from the LaTeX entry.
+
+    Args:
+        parts: The parts of the LaTeX entry.
+
+    Returns:
+        The parsed entry.
+    """
+    if len(parts) >= 2:
+        date, exam = parts[:2]
+        content = LanguageExamEntry(
+            name=exam.strip(),
+            date=date.strip(),
+            description=parts[2:] if len(parts) > 2 else [],
+        )
+    else:
+        raise ValueError("Unexpected number of parts in language exam entry "
+                         f"({len(parts)}): {parts!r}.")
+    return content
+
+
+REGISTRY.bind_handlers("cv_migrator.old_text_to_yaml", globals())
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Convert a LaTeX CV to YAML.")
+    parser.add_argument("tex_file", help="Path to the .tex file, or - to read stdin.")
+    parser.add_argument("--sections-config", type=Path, default=None,
+                        help="YAML or JSON file registering extra sections.")
+    parser.add_argument("--yaml-backend", choices=BACKENDS, default="auto",
+                        help="YAML emitter: libyaml when available (auto), or force one.")
+    parser.add_argument("--compact", action="store_true",
+                        help="Write repeated authors, venues and locations as YAML aliases.")
+    parser.add_argument("--format", choices=FORMATS, default="yaml",
+                        help="Output format (default: yaml).")
+    parser.add_argument("--profile", nargs="?", const="-", default=None, metavar="REPORT",
+                        help="Write a JSON report of the time spent per stage to REPORT "
+                             "(default: stderr).")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="Processes parsing large \\input/\\include files concurrently "
+                             "(default: CPU count).")
+    parser.add_argument("--keep-going", nargs="?", const="-", default=None, metavar="REPORT",
+                        help="Leave out the entries that fail to parse instead of stopping, and "
+                             "write a JSON report of the failures to REPORT (default: stderr).")
+    args = parser.parse_args(argv)
+    if args.compact and args.format != "yaml":
+        parser.error("--compact only applies to --format yaml.")
+    try:
+        get_emitter(args.format)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.sections_config:
+        load_registry_config(args.sections_config)
+    set_backend(args.yaml_backend)
+
+    # Specify the path to the .tex file
+    tex_file_path = Path(args.tex_file)
+    
+    # Convert the .tex file to .yaml
+    resolver = None
+    if args.tex_file != "-":
+        resolver = IncludeResolver(tex_file_path, parse_tex_file, workers=args.workers)
+    diagnostics = Diagnostics() if args.keep_going else None
+    converted = True
+    with profiling.Profiler() if args.profile else nullcontext() as profiler:
+        try:
+            convert_tex_to_yaml(tex_file_path, args.compact, args.format, resolver, diagnostics)
+        except Exception as e:
+            if diagnostics is None:
+                raise
+            # The file could not be parsed at all, such as for an unclosed brace.
+            diagnostics.record(e, args.tex_file, getattr(e, "line_number", None))
+            converted = False
+    if profiler:
+        profiling.write_report(profiler.report(file=args.tex_file, direction="to-yaml"),
+                               args.profile)
+    if diagnostics is not None:
+        profiling.write_report(diagnostics.report(files=1), args.keep_going)
+    if args.tex_file != "-" and converted:
+        print(f"Converted {tex_file_path} to {args.format.upper()} format"
+              + (f", leaving out {len(diagnostics)} failed entries." if diagnostics else "."))
+    return 0 if converted else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
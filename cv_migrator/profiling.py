@@ -0,0 +1,171 @@
+"""
+Per-stage timing of conversions.
+
+The converters mark their stages (reading, tokenizing, inline markup
+conversion, argument reading, section dispatch, parse_* and format_* calls, YAML load
+and dump, writing) and their entries. While a Profiler is active, each stage
+accumulates wall time and calls; otherwise marking costs a global lookup.
+
+    with Profiler() as profiler:
+        convert_tex_to_yaml(path)
+    write_report(profiler.report(), "-")
+
+Stage times are exclusive: a stage entered inside another one pauses it,
+so the stage times add up to the total. A profiler is meant for a single
+thread of work.
+"""
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+import functools
+import json
+import sys
+import time
+
+
+_active = None
+
+
+class Profiler:
+    """Accumulates stage times, entry counts and the slowest entry."""
+
+    def __init__(self):
+        self.seconds = Counter()
+        self.calls = Counter()
+        self.entries = Counter()
+        self.slowest_entry = None
+        self._stack = []
+        self._start = time.perf_counter()
+        self._previous = None
+
+    def __enter__(self):
+        """Makes this the active profiler until the block exits."""
+        global _active
+        self._previous, _active = _active, self
+        return self
+
+    def __exit__(self, *exc_info):
+        global _active
+        _active = self._previous
+
+    def enter(self, name: str):
+        now = time.perf_counter()
+        if self._stack:
+            parent, started = self._stack[-1]
+            self.seconds[parent] += now - started
+        self._stack.append([name, now])
+        self.calls[name] += 1
+
+    def exit(self):
+        now = time.perf_counter()
+        name, started = self._stack.pop()
+        self.seconds[name] += now - started
+        if self._stack:
+            self._stack[-1][1] = now
+
+    @contextmanager
+    def stage(self, name: str):
+        """Times a block as a stage."""
+        if self._stack and self._stack[-1][0] == name:
+            # Recursive call of the same stage: already being timed.
+            yield
+            return
+        self.enter(name)
+        try:
+            yield
+        finally:
+            self.exit()
+
+    @contextmanager
+    def entry(self, section: str, subsection: str = None, line: int = None):
+        """Counts an entry of a section and times it against the slowest one."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            self.entries[section] += 1
+            if self.slowest_entry is None or seconds > self.slowest_entry["seconds"]:
+                self.slowest_entry = {"section": section, "subsection": subsection or None,
+                                      "line": line, "seconds": seconds}
+
+    def report(self, **details) -> dict:
+        """
+        Builds the JSON-serializable report.
+
+        Args:
+            details: Extra top-level keys, such as the file and direction.
+
+        Returns:
+            The total time, the time and calls of every stage (plus "other"
+            for unmarked code), entries per section and the slowest entry.
+        """
+        total = time.perf_counter() - self._start
+        stages = {name: {"seconds": self.seconds[name], "calls": self.calls[name]}
+                  for name in sorted(self.seconds, key=self.seconds.get, reverse=True)}
+        stages["other"] = {"seconds": max(total - sum(self.seconds.values()), 0.0), "calls": 0}
+        return {
+            **details,
+            "total_seconds": total,
+            "stages": stages,
+            "entries": dict(self.entries),
+            "slowest_entry": self.slowest_entry,
+        }
+
+
+def active_profiler():
+    """Returns the active Profiler, or None."""
+    return _active
+
+
+def stage(name: str):
+    """Returns a context manager timing a stage, or a no-op one when not profiling."""
+    return nullcontext() if _active is None else _active.stage(name)
+
+
+def entry(section: str, subsection: str = None, line: int = None):
+    """Returns a context manager timing an entry, or a no-op one when not profiling."""
+    return nullcontext() if _active is None else _active.entry(section, subsection, line)
+
+
+def profiled(name: str):
+    """Decorator timing every call of a function as a stage."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if _active is None:
+                return function(*args, **kwargs)
+            with _active.stage(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def profiled_lines(name: str, lines):
+    """
+    Times the reading of each line of an iterable as a stage.
+
+    Returns lines itself when not profiling.
+    """
+    profiler = _active
+    if profiler is None:
+        return lines
+
+    def timed():
+        iterator = iter(lines)
+        while True:
+            with profiler.stage(name):
+                line = next(iterator, None)
+            if line is None:
+                return
+            yield line
+    return timed()
+
+
+def write_report(report: dict, destination: str):
+    """Writes a report as JSON to a file, or to stderr when destination is "-"."""
+    text = json.dumps(report, indent=2, ensure_ascii=False) + "\n"
+    if str(destination) == "-":
+        sys.stderr.write(text)
+    else:
+        with open(destination, 'w', encoding="utf8") as file:
+            file.write(text)
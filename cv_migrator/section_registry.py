@@ -0,0 +1,287 @@
+"""
+Routing of CV sections to the functions that parse and format their entries.
+
+Both converters look entries up here, so old_text_to_yaml.py and
+yaml_to_text.py always agree on which kind of entry a (section, subsection)
+holds. Extra languages and custom sections can be added with a YAML or JSON
+config file:
+
+    kinds:
+      patent:
+        parse: my_parsers:parse_patent
+        format: my_parsers:format_patent
+    sections:
+      - names: [Formação]
+        kind: education
+      - names: [Production, Producción]
+        subsections:
+          - names: [Patents, Patentes]
+            kind: patent
+    transcript_titles: [Histórico Escolar]
+"""
+from functools import lru_cache
+from pathlib import Path
+import importlib
+import json
+import sys
+import unicodedata
+
+
+# Section and subsection names of the built-in kinds, in English and Spanish.
+# Sections without a kind hold "generic" entries.
+DEFAULT_CONFIG = {
+    "sections": [
+        {"names": ["Education", "Educación"], "kind": "education"},
+        {"names": ["Experience", "Experiencia"], "kind": "education"},
+        {
+            "names": ["Production", "Producción"],
+            "kind": "education",
+            "subsections": [
+                {"names": ["Publications", "Publicaciones"], "kind": "publication"},
+                {"names": ["Posters and Oral Presentations", "Posters y Presentaciones Orales"],
+                 "kind": "poster"},
+                {"names": ["Outreach Experience", "Divulgación Científica"], "kind": "poster"},
+            ],
+        },
+        {
+            "names": ["Participation in Conferences and Schools", "Cursos y Congresos"],
+            "kind": "course",
+            "list": True,
+        },
+        {
+            "names": ["Languages", "Idiomas"],
+            "kind": "education",
+            "languages": True,
+            "subsections": [
+                {"names": ["International Exams", "Exámenes Internacionales"],
+                 "kind": "language_exam"},
+            ],
+        },
+    ],
+    "transcript_titles": ["University Transcript", "Resumen de Certificado Analítico"],
+}
+
+DEFAULT_KIND = "generic"
+
+
+@lru_cache(maxsize=1024)
+def normalize_name(name: str) -> str:
+    """
+    Normalizes a section or subsection name for lookups.
+
+    Args:
+        name: The name as written in the document.
+
+    Returns:
+        The NFC-normalized, stripped and case-folded name.
+    """
+    return unicodedata.normalize("NFC", name).strip().casefold()
+
+
+def resolve_handler(handler):
+    """
+    Resolves a handler given as a callable or as a "module:function" string.
+    """
+    if callable(handler):
+        return handler
+    module_name, _, attribute = handler.partition(":")
+    if not attribute:
+        raise ValueError(f"Handler {handler!r} must have the form 'module:function'.")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+class SectionRegistry:
+    """
+    Maps normalized (section, subsection) names to entry kinds, and entry
+    kinds to their (parse, format) handler pair.
+    """
+
+    def __init__(self):
+        self._kinds: dict[str, list] = {}
+        self._routes: dict[tuple, str] = {}
+        self._flags: dict[str, set] = {}
+        self._transcript_titles: set[str] = set()
+
+    def register_kind(self, kind: str, parse=None, format=None):
+        """
+        Registers or updates the handlers of an entry kind.
+
+        Args:
+            kind: Name of the entry kind.
+            parse: Function turning the \\cventry fields into an entry, or a
+                "module:function" string resolved on first use.
+            format: Function turning an entry into a \\cventry line, or a
+                "module:function" string resolved on first use.
+        """
+        handlers = self._kinds.setdefault(kind, [None, None])
+        if parse is not None:
+            handlers[0] = parse
+        if format is not None:
+            handlers[1] = format
+
+    def register_section(self, name: str, kind: str = None, subsection: str = None,
+                         list_section: bool = False, languages: bool = False):
+        """
+        Routes a section, or a subsection of it, to an entry kind.
+
+        Args:
+            name: The section name.
+            kind: The entry kind of the section or subsection.
+            subsection: The subsection name, if routing a subsection.
+            list_section: Whether the section holds its entries directly in a
+                list instead of in subsections.
+            languages: Whether \\cvitemwithcomment lines of the section are
+                language levels.
+        """
+        section_key = normalize_name(name)
+        key = (section_key, normalize_name(subsection) if subsection else None)
+        if kind is not None:
+            self._routes[key] = kind
+        flags = self._flags.setdefault(section_key, set())
+        if list_section:
+            flags.add("list")
+        if languages:
+            flags.add("languages")
+
+    def register_transcript_title(self, title: str):
+        """Registers a \\title that starts a university transcript."""
+        self._transcript_titles.add(normalize_name(title))
+
+    def bind_handlers(self, module_name: str, namespace: dict):
+        """
+        Replaces "module_name:function" handlers with the functions of an
+        already loaded namespace.
+
+        The converters call this on import, which also keeps them from being
+        imported a second time when they run as scripts.
+        """
+        prefix = module_name + ":"
+        for handlers in self._kinds.values():
+            for i, handler in enumerate(handlers):
+                if isinstance(handler, str) and handler.startswith(prefix):
+                    handlers[i] = namespace[handler[len(prefix):]]
+
+    def load_config(self, config: dict, base_dir: Path = None):
+        """
+        Adds the kinds, sections and transcript titles of a config mapping.
+
+        Args:
+            config: Mapping with the layout shown in the module docstring.
+            base_dir: Directory added to sys.path so that handler modules
+                next to the config file can be imported.
+        """
+        if base_dir is not None and str(base_dir) not in sys.path:
+            sys.path.insert(0, str(base_dir))
+
+        for kind, handlers in (config.get("kinds") or {}).items():
+            self.register_kind(kind, handlers.get("parse"), handlers.get("format"))
+
+        for section in config.get("sections") or []:
+            for name in section["names"]:
+                self.register_section(name, section.get("kind"),
+                                      list_section=section.get("list", False),
+                                      languages=section.get("languages", False))
+                for subsection in section.get("subsections") or []:
+                    for subsection_name in subsection["names"]:
+                        self.register_section(name, subsection.get("kind"), subsection_name)
+
+        for title in config.get("transcript_titles") or []:
+            self.register_transcript_title(title)
+
+    def kind(self, section: str, subsection: str = None) -> str:
+        """
+        Returns the entry kind of a section or subsection.
+
+        Subsections without their own route use the kind of their section,
+        and unknown sections use DEFAULT_KIND.
+        """
+        section_key = normalize_name(section)
+        if subsection:
+            kind = self._routes.get((section_key, normalize_name(subsection)))
+            if kind is not None:
+                return kind
+        return self._routes.get((section_key, None), DEFAULT_KIND)
+
+    def handlers(self, kind: str) -> list:
+        """
+        Returns the [parse, format] pair of an entry kind, resolving string
+        handlers on first use.
+        """
+        return [self._handler(kind, 0), self._handler(kind, 1)]
+
+    def _handler(self, kind: str, index: int):
+        """
+        Returns one handler of an entry kind (0: parse, 1: format), resolving
+        it on first use. Only that one is resolved, so that converting in
+        one direction does not import the module of the other.
+        """
+        try:
+            handlers = self._kinds[kind]
+        except KeyError:
+            raise ValueError(f"Unknown entry kind {kind!r}.") from None
+        handler = handlers[index]
+        if handler is not None and not callable(handler):
+            handler = handlers[index] = resolve_handler(handler)
+        return handler
+
+    def parser(self, section: str, subsection: str = None):
+        """Returns the function parsing the entries of a (sub)section."""
+        kind = self.kind(section, subsection)
+        parse = self._handler(kind, 0)
+        if parse is None:
+            raise ValueError(f"Entry kind {kind!r} has no parse handler.")
+        return parse
+
+    def formatter(self, section: str, subsection: str = None):
+        """Returns the function formatting the entries of a (sub)section."""
+        kind = self.kind(section, subsection)
+        format_entry = self._handler(kind, 1)
+        if format_entry is None:
+            raise ValueError(f"Entry kind {kind!r} has no format handler.")
+        return format_entry
+
+    def is_list_section(self, section: str) -> bool:
+        """Whether a section holds its entries directly in a list."""
+        return "list" in self._flags.get(normalize_name(section), ())
+
+    def is_languages_section(self, section: str) -> bool:
+        """Whether \\cvitemwithcomment lines of a section are language levels."""
+        return "languages" in self._flags.get(normalize_name(section), ())
+
+    def is_transcript_title(self, title: str) -> bool:
+        """Whether a \\title starts a university transcript."""
+        return normalize_name(title) in self._transcript_titles
+
+
+def load_registry_config(filepath: Path, registry: SectionRegistry = None):
+    """
+    Loads a YAML or JSON sections config file into a registry.
+
+    Args:
+        filepath: Path to the config file. Files ending in .json are read as
+            JSON, anything else as YAML.
+        registry: Registry to update. Defaults to the shared REGISTRY.
+    """
+    filepath = Path(filepath)
+    registry = registry or REGISTRY
+    with open(filepath, 'r', encoding="utf8") as file:
+        if filepath.suffix == ".json":
+            config = json.load(file)
+        else:
+            import yaml
+            config = yaml.safe_load(file)
+    registry.load_config(config or {}, base_dir=filepath.resolve().parent)
+
+
+REGISTRY = SectionRegistry()
+REGISTRY.load_config(DEFAULT_CONFIG)
+for _kind, _parse, _format in (
+    ("education", "parse_education", "format_education_entry"),
+    ("generic", "parse_generic", "format_generic_entry"),
+    ("publication", "parse_publication", "format_publication_entry"),
+    ("poster", "parse_poster", "format_poster_entry"),
+    ("course", "parse_course", "format_course_entry"),
+    ("language_exam", "parse_language_exam", "format_language_exam_entry"),
+):
+    REGISTRY.register_kind(_kind, "cv_migrator.old_text_to_yaml:" + _parse,
+                           "cv_migrator.yaml_to_text:" + _format)
@@ -0,0 +1,319 @@
+"""
+Resolution of \\input and \\include in LaTeX CVs.
+
+Included files are resolved relative to the directory of the main file, as
+LaTeX does, and parsed on their own: the parser turns a file into events
+that do not depend on the files around it, and old_text_to_yaml.CVBuilder
+replays the events of an included file where it is included.
+
+    resolver = IncludeResolver(Path("cv/main_en.tex"), parse_tex_file)
+    content = tex_to_dict(text, resolver)
+    resolver.includes  # {cv/main_en.tex: [cv/sections/publications.tex], ...}
+
+Parsed files are kept in FRAGMENT_CACHE by path, modification time and
+size, so a fragment shared by several documents (such as a publications
+list used by main_en.tex and main_es.tex) is parsed once per process.
+Large sets of included files are parsed concurrently in worker processes.
+
+An IncludeGraph records the files each converted document read, so that
+later runs know which documents to rebuild when one of them changes.
+"""
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import hashlib
+import json
+import os
+import threading
+
+from .conversion_cache import write_atomic
+
+
+# Event of the parser for an include: (INCLUDE_EVENT, command, name, line).
+INCLUDE_EVENT = "include"
+INCLUDE_COMMANDS = frozenset({"\\input", "\\include"})
+
+# Included files are parsed in worker processes when there are several to
+# parse and together they hold at least this many bytes; below it, starting
+# the processes costs more than it saves.
+PARALLEL_THRESHOLD = 1024 * 1024
+
+GRAPH_FILENAME = "include_graph.json"
+
+
+def resolve_include(command: str, name: str, base_dir: Path) -> Path:
+    """
+    Returns the file of an \\input{name} or \\include{name}.
+
+    As in LaTeX, \\include always adds the .tex suffix and \\input adds it
+    unless the name has it or only the file without it exists.
+
+    Args:
+        command: "\\input" or "\\include".
+        name: The argument of the command.
+        base_dir: Directory of the main file.
+    """
+    path = Path(base_dir) / name.strip()
+    if path.suffix == ".tex":
+        return path
+    with_suffix = path.with_name(path.name + ".tex")
+    if command == "\\include" or with_suffix.is_file() or not path.is_file():
+        return with_suffix
+    return path
+
+
+def file_signature(path: Path):
+    """Returns the modification time and size of a file, or None if it is missing."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def fingerprint_files(paths) -> bytes:
+    """Returns a digest of the paths and contents of files, for cache keys."""
+    digest = hashlib.sha256()
+    for path in sorted(str(path) for path in paths):
+        try:
+            data = Path(path).read_bytes()
+        except OSError:
+            data = b"\0missing"
+        for part in (path.encode("utf8"), data):
+            digest.update(len(part).to_bytes(8, "little"))
+            digest.update(part)
+    return digest.digest()
+
+
+class FragmentCache:
+    """
+    Parsed files keyed by path, modification time and size, evicting the
+    least recently used ones beyond max_entries. Safe to share between
+    threads.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: Path):
+        """Returns the events of a file, or None if it changed or was not parsed."""
+        key = (path, file_signature(path))
+        with self._lock:
+            events = self._entries.get(key)
+            if events is not None:
+                self._entries.move_to_end(key)
+            return events
+
+    def put(self, path: Path, events: list, signature):
+        """Stores the events of a file, parsed when it had the given signature."""
+        with self._lock:
+            self._entries[(path, signature)] = events
+            self._entries.move_to_end((path, signature))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+FRAGMENT_CACHE = FragmentCache()
+
+
+class IncludeResolver:
+    """
+    Reads the files included by a document, parsing each of them once.
+
+    Attributes:
+        document: The main file.
+        includes: The files included by each file read so far, in order.
+    """
+
+    def __init__(self, document: Path, parse_file, cache: FragmentCache = FRAGMENT_CACHE,
+                 workers: int = None):
+        """
+        Args:
+            document: Path to the main file; includes are relative to its directory.
+            parse_file: Function parsing a file into events. It must be a
+                module-level function, to run in worker processes.
+            cache: Cache of parsed files, or None to parse every file again.
+            workers: Processes parsing large sets of files concurrently.
+                Defaults to the CPU count; 1 parses them in this process.
+        """
+        self.document = Path(document).resolve()
+        self.base_dir = self.document.parent
+        self.parse_file = parse_file
+        self.cache = cache
+        self.workers = workers
+        self.includes: dict[Path, list[Path]] = {}
+        self._events: dict[Path, list] = {}
+
+    def files(self, path: Path = None) -> list[Path]:
+        """Returns the files included by a file, by default the document, directly or not."""
+        start = path or self.document
+        found = {}
+        stack = [start]
+        while stack:
+            for included in self.includes.get(stack.pop(), ()):
+                if included not in found and included != start:
+                    found[included] = None
+                    stack.append(included)
+        return list(found)
+
+    def prefetch(self, events: list, path: Path = None):
+        """
+        Parses every file included from events, recursively, level by level,
+        and records what each file includes; the includes of path are those
+        of the last events prefetched for it.
+
+        Args:
+            events: Events of a file.
+            path: The file, by default the document.
+
+        Raises:
+            ValueError: If an included file does not exist.
+        """
+        pending = self._included(events, path or self.document)
+        while pending:
+            parsed = self._parse_all(pending)
+            pending = []
+            for included, included_events in parsed.items():
+                self._events[included] = included_events
+                pending.extend(path for path in self._included(included_events, included)
+                               if path not in self._events and path not in pending)
+
+    def load(self, command: str, name: str, includer: Path, line: int):
+        """
+        Returns the path and events of an included file.
+
+        Args:
+            command: "\\input" or "\\include".
+            name: The argument of the command.
+            includer: The file with the command.
+            line: Its line, for error messages.
+        """
+        path = self._resolve(command, name, includer, line)
+        if path not in self._events:
+            self._events.update(self._parse_all([path]))
+            self._included(self._events[path], path)
+        return path, self._events[path]
+
+    def _resolve(self, command, name, includer, line) -> Path:
+        path = resolve_include(command, name, self.base_dir).resolve()
+        if not path.is_file():
+            raise ValueError(f"{command}{{{name}}} on line {line} of {includer.name}: "
+                             f"{path} does not exist.")
+        return path
+
+    def _included(self, events, path) -> list[Path]:
+        included = [self._resolve(event[1], event[2], path, event[3])
+                    for event in events if event[0] == INCLUDE_EVENT]
+        self.includes[path] = included
+        return [path for path in dict.fromkeys(included) if path not in self._events]
+
+    def _parse_all(self, paths: list[Path]) -> dict[Path, list]:
+        results = {}
+        missing = []
+        for path in paths:
+            events = self.cache.get(path) if self.cache is not None else None
+            if events is None:
+                missing.append(path)
+            else:
+                results[path] = events
+        signatures = [file_signature(path) for path in missing]
+
+        workers = min(self.workers or os.cpu_count() or 1, len(missing))
+        size = sum(signature[1] for signature in signatures if signature is not None)
+        if workers > 1 and size >= PARALLEL_THRESHOLD:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                parsed = list(executor.map(self.parse_file, missing))
+        else:
+            parsed = [self.parse_file(path) for path in missing]
+
+        for path, signature, events in zip(missing, signatures, parsed):
+            if self.cache is not None:
+                self.cache.put(path, events, signature)
+            results[path] = events
+        return results
+
+
+class IncludeGraph:
+    """
+    The files each converted document includes, saved between runs.
+
+    Documents are the main files converted; the graph holds the direct
+    includes of every file they read, by absolute path.
+    """
+
+    def __init__(self, path: Path = None):
+        self.path = Path(path) if path else None
+        self.documents: set[str] = set()
+        self.includes: dict[str, list[str]] = {}
+
+    @classmethod
+    def load(cls, path: Path) -> "IncludeGraph":
+        """Loads a graph, or starts an empty one if the file is missing or unreadable."""
+        graph = cls(path)
+        try:
+            data = json.loads(Path(path).read_text(encoding="utf8"))
+            graph.documents = set(data["documents"])
+            graph.includes = dict(data["includes"])
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return graph
+
+    def save(self):
+        """Writes the graph to its path atomically."""
+        data = {"documents": sorted(self.documents), "includes": self.includes}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(self.path, json.dumps(data, indent=1, sort_keys=True).encode("utf8"))
+
+    def record(self, document: Path, includes: dict):
+        """
+        Records the files read to convert a document.
+
+        Args:
+            document: The main file.
+            includes: The files included by each file read, as in
+                IncludeResolver.includes.
+        """
+        self.documents.add(str(Path(document).resolve()))
+        for path, included in includes.items():
+            self.includes[str(path)] = [str(included_path) for included_path in included]
+
+    def dependencies(self, document: Path) -> list[Path] | None:
+        """
+        Returns the files a document includes, directly or not, or None if
+        the document was never recorded.
+        """
+        document = str(Path(document).resolve())
+        if document not in self.documents:
+            return None
+        found = {}
+        stack = [document]
+        while stack:
+            for included in self.includes.get(stack.pop(), ()):
+                if included not in found and included != document:
+                    found[included] = None
+                    stack.append(included)
+        return [Path(path) for path in found]
+
+    def dependents(self, path: Path) -> list[Path]:
+        """Returns the documents to rebuild when a file changes, itself included."""
+        path = Path(path).resolve()
+        return [Path(document) for document in sorted(self.documents)
+                if document == str(path) or path in self.dependencies(document)]
+
+    def documents_to_rebuild(self, paths) -> list[Path]:
+        """
+        Replaces the included files among paths by the documents including
+        them; paths the graph does not know as included are kept.
+        """
+        included = {path for paths in self.includes.values() for path in paths}
+        documents = {}
+        for path in paths:
+            resolved = Path(path).resolve()
+            if str(resolved) in included and str(resolved) not in self.documents:
+                for document in self.dependents(resolved):
+                    documents.setdefault(document, document)
+            else:
+                documents[resolved] = Path(path)
+        return sorted(documents.values())
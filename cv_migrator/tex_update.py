@@ -0,0 +1,427 @@
+"""
+Updates an existing .tex file from YAML, rewriting only the sections that
+changed.
+
+The .tex file is split into its preamble, one span per \\section (a
+transcript \\title goes with the section after it, and an \\input of whole
+sections is a span of its own) and the trailer from \\end{document} on.
+Each span is parsed on its own and compared with the section of the same
+name in the YAML:
+
+- spans whose content is the same are kept byte for byte, with their
+  comments, macros and formatting;
+- in spans whose content changed, the entries that changed are rendered by
+  yaml_to_text and the others are kept byte for byte; a span whose
+  subsections changed, or that holds free text, language levels or a
+  transcript, is replaced by the rendering of the whole section;
+- sections new in the YAML are rendered where the YAML puts them, and
+  sections no longer in it are removed.
+
+Sections follow the order of the YAML, as in a full conversion. The preamble
+and the trailer are never touched. Spans that read other files with \\input
+or \\include, or that hold more than one section, are kept as they are; a
+change to their sections is reported instead of applied.
+
+    cv-migrator to-tex cv/main_en.yaml --update
+"""
+from dataclasses import dataclass, field
+from pathlib import Path
+import difflib
+import json
+
+from .conversion_cache import write_atomic
+from .cv_model import to_plain
+from .old_text_to_yaml import locate_structure, parse_tex_file, tex_to_dict
+from .section_registry import REGISTRY
+from .tex_includes import INCLUDE_EVENT, IncludeResolver
+from .yaml_to_text import dict_to_tex, format_entry, is_transcript_section, section_to_tex_lines
+
+
+@dataclass
+class TexSpan:
+    """The source of a section of a .tex file and what it parses to."""
+    text: str
+    # The line the span starts on.
+    line: int = 1
+    # The transcript \title in force, when the span does not start with it.
+    transcript_title: str | None = None
+    starts_with_title: bool = False
+    starts_with_include: bool = False
+    content: dict = field(default_factory=dict)
+    includes: bool = False
+
+    @property
+    def name(self) -> str | None:
+        """The section the span starts, if any."""
+        return next(iter(self.content), None)
+
+    @property
+    def compound(self) -> bool:
+        """Whether the span reads included files or holds several sections."""
+        return self.includes or len(self.content) > 1
+
+
+@dataclass
+class TexUpdate:
+    """What an update did to the sections of a .tex file."""
+    kept: list[str] = field(default_factory=list)
+    rewritten: list[str] = field(default_factory=list)
+    added: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    # Sections that changed but come from included files or shared spans.
+    not_updated: list[str] = field(default_factory=list)
+
+
+def split_tex_spans(text: str) -> tuple[TexSpan, list[TexSpan], str]:
+    """
+    Splits LaTeX text into the preamble, one span per \\section, and the
+    trailer starting at \\end{document}.
+
+    Like watch_mode.split_tex_blocks, the text is split where the converter
+    sees the commands (see locate_structure), so a span may start in the
+    middle of a line. A transcript \\title starts the span of the section
+    after it. An \\input or \\include starts a span too; parse_spans joins
+    it back to the span before unless the file it reads starts a section.
+
+    Returns:
+        The preamble, the spans and the trailer. Joined, they are the text.
+    """
+    starts, end = locate_structure(text)
+    head = TexSpan("")
+    spans = []
+    current_span = head
+    current_start = 0
+    has_section = False
+    in_transcript = None
+
+    def close(offset, new_span):
+        nonlocal current_span, current_start, has_section
+        current_span.text = text[current_start:offset]
+        new_span.line = current_span.line + current_span.text.count("\n")
+        current_span = new_span
+        current_start = offset
+        has_section = False
+        spans.append(new_span)
+
+    for event, offset in starts:
+        if offset >= end:
+            break
+        kind = event[0]
+        if kind == "title":
+            if REGISTRY.is_transcript_title(event[1]):
+                close(offset, TexSpan("", starts_with_title=True))
+                in_transcript = f"\\title{{{event[1]}}}\n"
+            else:
+                in_transcript = None
+        elif kind == "section":
+            # A transcript title and the section after it are one span.
+            if not (current_span.starts_with_title and not has_section):
+                close(offset, TexSpan("", transcript_title=in_transcript))
+            has_section = True
+        elif kind == INCLUDE_EVENT:
+            close(offset, TexSpan("", transcript_title=in_transcript, starts_with_include=True))
+    current_span.text = text[current_start:end]
+    return head, spans, text[end:]
+
+
+def parse_spans(head: TexSpan, spans: list[TexSpan], document: Path = None) -> list[TexSpan]:
+    """
+    Parses the preamble and every span on their own, filling their content.
+
+    Args:
+        head: The preamble.
+        spans: The spans of split_tex_spans.
+        document: Path of the .tex file, to resolve the files it includes.
+            Without one, \\input and \\include are ignored.
+
+    Returns:
+        The spans, with those starting at an include that does not start a
+        section joined to the span before them.
+
+    Raises:
+        ValueError: If a span does not parse.
+    """
+    resolver = None
+    if document is not None:
+        resolver = IncludeResolver(document, parse_tex_file)
+
+    def parse(span):
+        text = span.text
+        if span.transcript_title:
+            text = span.transcript_title + text
+        span.content = tex_to_dict(text, resolver)
+        if resolver is not None:
+            span.includes = bool(resolver.includes.get(resolver.document))
+
+    parsed = []
+    for span in [head] + spans:
+        if span.starts_with_include:
+            try:
+                parse(span)
+            except (KeyError, ValueError):
+                # Entries or subsections outside of a section.
+                span.content = {}
+            if not span.content:
+                previous = parsed[-1]
+                previous.text += span.text
+                span = previous
+            else:
+                parsed.append(span)
+                continue
+        else:
+            parsed.append(span)
+        try:
+            parse(span)
+        except ValueError as e:
+            # Line numbers in the message are relative to the span.
+            raise ValueError(f"In the span starting on line {span.line}"
+                             f"{f' of {document.name}' if document else ''}: {e}") from e
+    return parsed[1:]
+
+
+def render_section(name: str, value, span: TexSpan = None, newline: str = "\n") -> str:
+    """
+    Renders a section as LaTeX, by default ending with a blank line.
+
+    Args:
+        name: The section name.
+        value: Its content.
+        span: The span the rendering replaces, if any. The rendering ends
+            with the same blank lines as the span, and a transcript section
+            whose span shares the \\title of the one before is rendered
+            without it.
+        newline: The line ending of the file.
+    """
+    lines = section_to_tex_lines(name, value)
+    if (span is not None and span.transcript_title and not span.starts_with_title
+            and is_transcript_section(value)):
+        lines = lines[1:]
+    text = "\n".join(lines) + "\n"
+    if newline != "\n":
+        text = text.replace("\n", newline)
+    if span is not None:
+        # Keep the blank lines that separated the span from the next one.
+        text = text.rstrip() + span.text[len(span.text.rstrip()):]
+    return text
+
+
+def _entry_key(entry) -> str:
+    return json.dumps(entry, sort_keys=True, default=str)
+
+
+def patch_section(name: str, value, span: TexSpan, newline: str = "\n") -> str | None:
+    """
+    Rewrites only the entries of a section that changed, keeping the source
+    of the others, with their comments and formatting, byte for byte.
+
+    Entries are matched by content within each subsection, so entries added,
+    removed or edited are rendered by yaml_to_text and the rest is kept.
+
+    Args:
+        name: The section name.
+        value: Its new content.
+        span: The span holding the section, and nothing else.
+        newline: The line ending of the file.
+
+    Returns:
+        The new text of the span, or None when more than entries changed,
+        or the span holds free text, language levels or a transcript; the
+        section is then rendered whole.
+    """
+    old = to_plain(span.content.get(name))
+    if (span.transcript_title or span.starts_with_title or is_transcript_section(old)
+            or is_transcript_section(value)):
+        return None
+    if isinstance(old, list) and isinstance(value, list):
+        subsections = [None]
+    elif (isinstance(old, dict) and isinstance(value, dict) and list(old) == list(value)
+          and all(isinstance(entries, list) for entries in value.values())):
+        subsections = list(old)
+    else:
+        return None
+
+    text = span.text
+    starts, _ = locate_structure(text)
+    kinds = [event[0] for event, _ in starts]
+    if (not kinds or kinds[0] != "section" or "section" in kinds[1:]
+            or not set(kinds) <= {"section", "subsection", "entry"}
+            or [event[1] for event, _ in starts if event[0] == "subsection"]
+            != [subsection for subsection in subsections if subsection is not None]):
+        return None
+
+    # The source of every command, up to the next one, split into its
+    # content and the whitespace after it; grouped by subsection.
+    offsets = [offset for _, offset in starts] + [len(text)]
+    groups = []
+    for (event, offset), end in zip(starts, offsets[1:]):
+        chunk = text[offset:end]
+        content = chunk.rstrip()
+        if event[0] == "entry":
+            groups[-1][1].append((content, chunk[len(content):]))
+        else:
+            groups.append(((content, chunk[len(content):]), []))
+
+    pieces = [text[:offsets[0]]]
+    if subsections != [None]:
+        # The section command, before its first subsection.
+        header, chunks = groups.pop(0)
+        if chunks:
+            return None
+        pieces.extend(header)
+    for subsection, (header, chunks) in zip(subsections, groups):
+        old_entries = old if subsection is None else old[subsection]
+        new_entries = value if subsection is None else value[subsection]
+        if len(chunks) != len(old_entries):
+            return None
+        # The whitespace that ends the subsection ends it after the update
+        # too; until then its last command is followed by a line break.
+        last = chunks[-1] if chunks else header
+        tail = last[1]
+        last = (last[0], tail[:tail.find("\n") + 1] or tail)
+        if chunks:
+            chunks[-1] = last
+        else:
+            header = last
+        group = [header]
+        matcher = difflib.SequenceMatcher(None, [_entry_key(entry) for entry in old_entries],
+                                          [_entry_key(entry) for entry in new_entries],
+                                          autojunk=False)
+        for operation, old_start, old_end, new_start, new_end in matcher.get_opcodes():
+            if operation == "equal":
+                group.extend(chunks[old_start:old_end])
+                continue
+            for index in range(new_start, new_end):
+                rendered = format_entry(name, subsection, new_entries[index])
+                # An edited entry keeps the whitespace after it.
+                replaced = old_start + index - new_start
+                space = chunks[replaced][1] if replaced < old_end else newline
+                group.append((rendered.replace("\n", newline), space))
+        group[-1] = (group[-1][0], tail)
+        pieces.extend(piece for pair in group for piece in pair)
+
+    new_text = "".join(pieces)
+    try:
+        if to_plain(tex_to_dict(new_text)) != {name: value}:
+            return None
+    except ValueError:
+        return None
+    return new_text
+
+
+def update_tex_text(text: str, content_dict: dict, document: Path = None) -> tuple[str, TexUpdate]:
+    """
+    Updates LaTeX text with CV content, rewriting only the sections whose
+    content changed.
+
+    Args:
+        text: The current LaTeX text.
+        content_dict: The CV content, keyed by section name.
+        document: Path of the .tex file, to resolve the files it includes.
+
+    Returns:
+        The new text, the same as text if no section changed or moved, and
+        what was done to each section.
+    """
+    content_dict = to_plain(content_dict or {})
+    newline = "\r\n" if "\r\n" in text else "\n"
+    head, spans, trailer = split_tex_spans(text)
+    spans = parse_spans(head, spans, document)
+    update = TexUpdate()
+
+    # Section name -> the spans starting it, and the span whose content the
+    # parser keeps: for a repeated section the last one.
+    own: dict[str, list[int]] = {}
+    parsed_by: dict[str, TexSpan] = {name: head for name in head.content}
+    for index, span in enumerate(spans):
+        if span.name is not None:
+            own.setdefault(span.name, []).append(index)
+        for name in span.content:
+            parsed_by[name] = span
+
+    # Output pieces, with the index of the span they come from (None for
+    # rendered sections).
+    pieces: list[tuple[int | None, str]] = []
+    placed = set()
+    for name, value in content_dict.items():
+        source = parsed_by.get(name)
+        unchanged = source is not None and to_plain(source.content[name]) == value
+        indices = own.get(name, [])
+        if not indices:
+            if source is None:
+                update.added.append(name)
+                pieces.append((None, render_section(name, value, newline=newline)))
+            elif unchanged:
+                update.kept.append(name)
+            else:
+                update.not_updated.append(name)
+            continue
+        placed.update(indices)
+        if unchanged:
+            update.kept.append(name)
+            pieces.extend((index, spans[index].text) for index in indices)
+        elif any(spans[index].compound for index in indices):
+            update.not_updated.append(name)
+            pieces.extend((index, spans[index].text) for index in indices)
+        else:
+            update.rewritten.append(name)
+            span = spans[indices[0]]
+            rewritten = patch_section(name, value, span, newline) if len(indices) == 1 else None
+            if rewritten is None:
+                rewritten = render_section(name, value, span, newline)
+            pieces.append((indices[0], rewritten))
+
+    # Spans of removed sections are dropped, unless they also hold other
+    # sections; those stay after the span they followed in the file.
+    for index, span in enumerate(spans):
+        if index in placed:
+            continue
+        if span.name is not None and not span.compound:
+            update.removed.append(span.name)
+            continue
+        if span.name is not None:
+            update.not_updated.append(span.name)
+        position = 0
+        for previous in range(index - 1, -1, -1):
+            if previous in placed:
+                position = max(i for i, (anchor, _) in enumerate(pieces)
+                               if anchor == previous) + 1
+                break
+        pieces.insert(position, (index, span.text))
+        placed.add(index)
+
+    # Spans may end in the middle of a line: a line break is added only
+    # between pieces that did not follow each other in the file.
+    pieces = [(-1, head.text)] + pieces + [(len(spans), trailer)]
+    new_text = ""
+    previous = None
+    for index, part in pieces:
+        if (new_text and part and not new_text.endswith("\n")
+                and (index is None or previous is None or index != previous + 1)):
+            new_text += newline
+        new_text += part
+        previous = index
+    return new_text, update
+
+
+def update_tex_file(tex_filepath: Path, content_dict: dict) -> TexUpdate:
+    """
+    Updates a .tex file with CV content, rewriting only the sections whose
+    content changed. The file is written atomically, and only if its text
+    changed; a missing file is written in full.
+
+    Args:
+        tex_filepath: The .tex file.
+        content_dict: The CV content, keyed by section name.
+
+    Returns:
+        What was done to each section.
+    """
+    tex_filepath = Path(tex_filepath)
+    if not tex_filepath.is_file():
+        write_atomic(tex_filepath, dict_to_tex(content_dict).encode("utf8"))
+        return TexUpdate(added=list(content_dict or {}))
+    text = tex_filepath.read_bytes().decode("utf8")
+    new_text, update = update_tex_text(text, content_dict, tex_filepath)
+    if new_text != text:
+        write_atomic(tex_filepath, new_text.encode("utf8"))
+    return update
@@ -0,0 +1,280 @@
+"""
+Columnar reading and export of university transcripts.
+
+Reads only the transcript tables of .tex or .yaml CVs, without building the
+rest of the CV tree, into one table of columns per degree. .tex files are
+tokenized as old_text_to_yaml.py does, with their included files, so rows
+read the same as in the YAML output:
+
+    cv-migrator transcript cvs/*.tex --csv grades.csv --npz grades.npz
+
+Grades and durations are kept as written, next to numeric columns (grade and
+hours, NaN when missing or not a number) held in compact float arrays. The
+aggregates use NumPy when it is installed, and plain Python otherwise;
+NumPy is required only for .npz export. It is imported on first use.
+"""
+from array import array
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+import argparse
+import csv
+import math
+import re
+import sys
+
+from .old_text_to_yaml import (CVBuilder, is_transcript_row, open_tex_source, parse_tex_events,
+                               parse_tex_file, parse_transcript_row)
+from .section_registry import load_registry_config
+from .tex_includes import IncludeResolver
+from .yaml_backend import load_yaml
+from .yaml_to_text import is_transcript_section
+
+
+_NUMBER_RE = re.compile(r'\d+(?:[.,]\d+)?')
+
+CSV_COLUMNS = ("source", "degree", "assignment", "grade", "duration", "grade_value", "hours")
+
+
+@lru_cache(maxsize=None)
+def _numpy():
+    """Returns the numpy module, or None when it is not installed."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _to_number(text) -> float:
+    """Returns the first number in text, or NaN."""
+    match = _NUMBER_RE.search(str(text)) if text is not None else None
+    return float(match.group().replace(",", ".")) if match else math.nan
+
+
+@dataclass
+class TranscriptTable:
+    """The rows of one transcript section, stored by column."""
+    source: str
+    degree: str
+    assignments: list[str] = field(default_factory=list)
+    grades: list[str] = field(default_factory=list)
+    durations: list[str] = field(default_factory=list)
+    grade_values: array = field(default_factory=lambda: array("d"))
+    hours: array = field(default_factory=lambda: array("d"))
+
+    def append(self, assignment: str, grade: str, duration: str = None):
+        """Adds a row; a missing duration is stored as an empty string."""
+        self.assignments.append(assignment)
+        self.grades.append(grade)
+        self.durations.append(duration or "")
+        self.grade_values.append(_to_number(grade))
+        self.hours.append(_to_number(duration))
+
+    def __len__(self):
+        return len(self.assignments)
+
+    def summary(self) -> dict:
+        """
+        Computes the aggregates of the table.
+
+        Returns:
+            The number of rows, the average grade, the average grade weighted
+            by hours (over rows with both numbers) and the total hours.
+        """
+        np = _numpy() if len(self) else None
+        if np is not None:
+            grades = np.frombuffer(self.grade_values, dtype=np.float64)
+            hours = np.frombuffer(self.hours, dtype=np.float64)
+            graded = ~np.isnan(grades)
+            weighted = graded & ~np.isnan(hours)
+            weight = hours[weighted].sum()
+            average = grades[graded].mean() if graded.any() else math.nan
+            weighted_average = (grades[weighted] * hours[weighted]).sum() / weight \
+                if weight else math.nan
+            total_hours = np.nansum(hours)
+        else:
+            graded = [grade for grade in self.grade_values if not math.isnan(grade)]
+            pairs = [(grade, hours) for grade, hours in zip(self.grade_values, self.hours)
+                     if not (math.isnan(grade) or math.isnan(hours))]
+            weight = sum(hours for _, hours in pairs)
+            average = sum(graded) / len(graded) if graded else math.nan
+            weighted_average = sum(grade * hours for grade, hours in pairs) / weight \
+                if weight else math.nan
+            total_hours = sum(hours for hours in self.hours if not math.isnan(hours))
+        return {
+            "rows": len(self),
+            "average": float(average),
+            "weighted_average": float(weighted_average),
+            "total_hours": float(total_hours),
+        }
+
+
+class _TranscriptReader(CVBuilder):
+    """
+    Replays the events of a LaTeX CV like CVBuilder, but only collects the
+    rows of transcript sections. Other entries are not parsed, and every row
+    is kept, even when an assignment is repeated.
+    """
+
+    def __init__(self, source: str, resolver: IncludeResolver = None):
+        super().__init__(resolver)
+        self.source = source
+        self.tables: list[TranscriptTable] = []
+        self._table = None
+
+    def _start_section(self, section_name: str):
+        super()._start_section(section_name)
+        self._table = None
+        if self.in_transcript:
+            self._table = TranscriptTable(self.source, section_name)
+            self.tables.append(self._table)
+
+    def _add_entry(self, parts: list[str], line: int):
+        pass
+
+    def _add_line(self, line: str):
+        if self.in_transcript and self._table is not None and is_transcript_row(line):
+            self._table.append(*parse_transcript_row(line))
+
+
+def read_tex_transcripts(filepath: Path) -> list[TranscriptTable]:
+    """
+    Reads the transcript tables of a LaTeX CV and of the files it includes.
+
+    Args:
+        filepath: Path to the .tex file, or "-" for stdin.
+
+    Returns:
+        One table per section of the transcript.
+    """
+    if str(filepath) == "-":
+        with open_tex_source(filepath) as source:
+            events = parse_tex_events(source)
+        reader = _TranscriptReader(str(filepath))
+    else:
+        events = parse_tex_file(filepath)
+        reader = _TranscriptReader(str(filepath), IncludeResolver(filepath, parse_tex_file))
+    reader.build(events)
+    return reader.tables
+
+
+def read_yaml_transcripts(filepath: Path) -> list[TranscriptTable]:
+    """
+    Reads the transcript sections of a YAML CV.
+
+    Args:
+        filepath: Path to the .yaml file.
+
+    Returns:
+        One table per transcript section.
+    """
+    with open(filepath, 'r', encoding="utf8") as file:
+        content = load_yaml(file) or {}
+
+    tables = []
+    for degree, section in content.items():
+        if not is_transcript_section(section):
+            continue
+        table = TranscriptTable(str(filepath), degree)
+        for assignment, details in section.items():
+            if assignment == "free_text":
+                continue
+            duration = details.get("duration")
+            table.append(str(assignment), str(details.get("grade", "")),
+                         None if duration is None else str(duration))
+        tables.append(table)
+    return tables
+
+
+def read_transcripts(filepath: Path) -> list[TranscriptTable]:
+    """Reads the transcript tables of a .tex or .yaml CV."""
+    if Path(filepath).suffix in (".yaml", ".yml"):
+        return read_yaml_transcripts(filepath)
+    return read_tex_transcripts(filepath)
+
+
+def write_csv(tables: list[TranscriptTable], stream):
+    """
+    Writes the rows of several tables as CSV.
+
+    Args:
+        tables: The tables to write.
+        stream: Open text file, created with newline="".
+    """
+    writer = csv.writer(stream)
+    writer.writerow(CSV_COLUMNS)
+    for table in tables:
+        for row in zip(table.assignments, table.grades, table.durations,
+                       table.grade_values, table.hours):
+            writer.writerow((table.source, table.degree) + row)
+
+
+def write_npz(tables: list[TranscriptTable], filepath: Path):
+    """
+    Writes the rows of several tables as NumPy arrays, one per CSV column.
+
+    Args:
+        tables: The tables to write.
+        filepath: Path of the .npz file.
+    """
+    np = _numpy()
+    if np is None:
+        raise ValueError("Writing .npz files requires NumPy; install it or use --csv.")
+    columns = {
+        "source": np.array([table.source for table in tables for _ in range(len(table))],
+                           dtype=str),
+        "degree": np.array([table.degree for table in tables for _ in range(len(table))],
+                           dtype=str),
+        "assignment": np.array([a for table in tables for a in table.assignments], dtype=str),
+        "grade": np.array([g for table in tables for g in table.grades], dtype=str),
+        "duration": np.array([d for table in tables for d in table.durations], dtype=str),
+        "grade_value": np.concatenate([np.frombuffer(table.grade_values, dtype=np.float64)
+                                       for table in tables] or [np.empty(0)]),
+        "hours": np.concatenate([np.frombuffer(table.hours, dtype=np.float64)
+                                 for table in tables] or [np.empty(0)]),
+    }
+    np.savez_compressed(filepath, **columns)
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog,
+                                     description="Extract and summarize transcript tables.")
+    parser.add_argument("inputs", nargs="+", type=Path, help=".tex or .yaml CV files.")
+    parser.add_argument("--csv", type=Path, default=None,
+                        help="Write all rows to this CSV file (- for stdout).")
+    parser.add_argument("--npz", type=Path, default=None,
+                        help="Write all rows to this NumPy .npz file.")
+    parser.add_argument("--sections-config", type=Path, default=None,
+                        help="YAML or JSON file registering extra transcript titles.")
+    args = parser.parse_args(argv)
+    if args.sections_config:
+        load_registry_config(args.sections_config)
+    if args.npz and _numpy() is None:
+        parser.error("--npz requires NumPy.")
+
+    tables = []
+    for filepath in args.inputs:
+        tables.extend(read_transcripts(filepath))
+
+    if args.csv and str(args.csv) == "-":
+        write_csv(tables, sys.stdout)
+    else:
+        for table in tables:
+            summary = table.summary()
+            print(f"{table.source}: {table.degree}: {summary['rows']} rows, "
+                  f"average {summary['average']:.2f}, "
+                  f"weighted average {summary['weighted_average']:.2f}, "
+                  f"{summary['total_hours']:.0f} hours")
+        if args.csv:
+            with open(args.csv, 'w', encoding="utf8", newline="") as file:
+                write_csv(tables, file)
+            print(f"Wrote {sum(map(len, tables))} rows to {args.csv}.")
+    if args.npz:
+        write_npz(tables, args.npz)
+        print(f"Wrote {sum(map(len, tables))} rows to {args.npz}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,323 @@
+"""
+Watch mode: reconverts .tex and .yaml files when they change.
+
+Documents are split into blocks, one per \\section of a .tex file (the
+preamble and a trailing transcript are blocks of their own) or one per
+top-level key of a .yaml file. Blocks are fingerprinted by their content
+and only the blocks whose fingerprint changed since the previous version
+are parsed and rendered again; the rest of the output is spliced from the
+previous run. A .tex block that pulls in files with \\input or \\include is
+also parsed again when one of them changes, and a change to any of them
+triggers the conversion of the watched file.
+
+    cv-migrator watch cv/ --interval 0.5
+"""
+from pathlib import Path
+import argparse
+import glob
+import hashlib
+import re
+import sys
+import time
+
+from .conversion_cache import write_atomic
+from .old_text_to_yaml import locate_structure, parse_tex_file, tex_to_dict
+from .section_registry import REGISTRY, load_registry_config
+from .tex_includes import IncludeResolver, file_signature
+from .yaml_backend import BACKENDS, dump_yaml, load_yaml, set_backend
+from .yaml_to_text import section_to_tex_lines
+
+
+# Anchors may tie blocks together, so documents defining any are always
+# converted as a whole. False positives only cost a full conversion.
+_YAML_ANCHOR_RE = re.compile(r'(?:^|\s)&\S')
+
+
+def fingerprint(text: str) -> bytes:
+    """Returns a digest identifying the content of a block."""
+    return hashlib.blake2b(text.encode("utf8"), digest_size=16).digest()
+
+
+def split_tex_blocks(text: str) -> list[str]:
+    """
+    Splits LaTeX text into the preamble, one block per \\section, and a
+    final block starting at a transcript \\title.
+
+    The text is split where the converter sees the commands (see
+    locate_structure), also in the middle of a line.
+    """
+    blocks = []
+    start = 0
+    for event, offset in locate_structure(text)[0]:
+        if event[0] == "title" and REGISTRY.is_transcript_title(event[1]):
+            # Everything after a transcript title belongs to the transcript.
+            blocks.append(text[start:offset])
+            start = offset
+            break
+        if event[0] == "section":
+            blocks.append(text[start:offset])
+            start = offset
+    blocks.append(text[start:])
+    return blocks
+
+
+def split_yaml_blocks(text: str) -> list[str]:
+    """
+    Splits YAML text into one block per top-level mapping key.
+
+    Keys start at column 0; indentless sequences ("- ") and continuation
+    lines stay with the key above them.
+    """
+    blocks = []
+    current = []
+    for line in text.splitlines(keepends=True):
+        if line[:1] not in ("", " ", "\t", "-", "#", "\n", "\r") and current:
+            blocks.append("".join(current))
+            current = []
+        current.append(line)
+    if current:
+        blocks.append("".join(current))
+    return blocks
+
+
+class IncrementalTexConverter:
+    """
+    Converts successive versions of a .tex document to YAML, re-parsing
+    only the section blocks that changed.
+
+    Attributes:
+        dependencies: The files included by the last version converted.
+    """
+
+    def __init__(self, document: Path = None):
+        """
+        Args:
+            document: Path of the document, to resolve the files it includes.
+                Without one, \\input and \\include are ignored.
+        """
+        self.document = document
+        self.dependencies: list[Path] = []
+        # Fingerprint -> (parsed content, {section: YAML text},
+        #                 ((included file, its signature), ...))
+        self._blocks: dict[bytes, tuple] = {}
+
+    def convert(self, text: str) -> tuple[str, int, int]:
+        """
+        Converts a version of the document.
+
+        Returns:
+            The YAML text, the number of blocks parsed again and the total
+            number of blocks.
+        """
+        resolver = None
+        if self.document is not None:
+            resolver = IncludeResolver(self.document, parse_tex_file)
+        blocks = {}
+        reparsed = 0
+        sections: dict[str, str] = {}
+        dependencies = {}
+        for block in split_tex_blocks(text):
+            key = fingerprint(block)
+            cached = blocks.get(key) or self._blocks.get(key)
+            if cached is not None and any(file_signature(path) != signature
+                                          for path, signature in cached[2]):
+                # A file the block includes changed.
+                cached = None
+            if cached is None:
+                reparsed += 1
+                content = tex_to_dict(block, resolver)
+                included = resolver.files() if resolver is not None else []
+                cached = (content,
+                          {name: dump_yaml({name: value}) for name, value in content.items()},
+                          tuple((path, file_signature(path)) for path in included))
+            blocks[key] = cached
+            # Same semantics as the full parse: a repeated section keeps its
+            # first position and takes the last content.
+            sections.update(cached[1])
+            dependencies.update(dict.fromkeys(path for path, _ in cached[2]))
+        self._blocks = blocks
+        self.dependencies = list(dependencies)
+
+        yaml_text = "".join(sections.values()) if sections else dump_yaml({})
+        return yaml_text, reparsed, len(blocks)
+
+
+class IncrementalYamlConverter:
+    """
+    Converts successive versions of a .yaml document to LaTeX, loading and
+    rendering only the top-level keys that changed.
+    """
+
+    def __init__(self):
+        # Fingerprint -> {section: LaTeX lines}
+        self._blocks: dict[bytes, dict] = {}
+
+    def convert(self, text: str) -> tuple[str, int, int]:
+        """
+        Converts a version of the document.
+
+        Returns:
+            The LaTeX text, the number of blocks rendered again and the total
+            number of blocks.
+        """
+        if _YAML_ANCHOR_RE.search(text):
+            self._blocks = {}
+            content = load_yaml(text) or {}
+            lines = [line for name, value in content.items()
+                     for line in section_to_tex_lines(name, value)]
+            return "\n".join(lines), 1, 1
+
+        blocks = {}
+        reparsed = 0
+        sections: dict[str, list] = {}
+        for block in split_yaml_blocks(text):
+            key = fingerprint(block)
+            cached = blocks.get(key) or self._blocks.get(key)
+            if cached is None:
+                reparsed += 1
+                content = load_yaml(block) or {}
+                if not isinstance(content, dict):
+                    raise ValueError("The top level of a CV YAML file must be a mapping.")
+                cached = {name: section_to_tex_lines(name, value)
+                          for name, value in content.items()}
+            blocks[key] = cached
+            sections.update(cached)
+        self._blocks = blocks
+
+        lines = [line for section_lines in sections.values() for line in section_lines]
+        return "\n".join(lines), reparsed, len(blocks)
+
+
+def collect_watched_files(inputs, pattern: str = None) -> set[Path]:
+    """
+    Expands files, directories and glob patterns into the .tex and .yaml
+    files to watch. Patterns that match nothing yet are not an error, since
+    files may appear while watching.
+    """
+    patterns = [pattern] if pattern else ["main*.tex", "main*.yaml"]
+    files = set()
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            for dir_pattern in patterns:
+                files.update(path.glob(dir_pattern))
+        elif path.is_file():
+            files.add(path)
+        else:
+            files.update(Path(match) for match in glob.glob(item, recursive=True))
+    return {path for path in files if path.suffix in (".tex", ".yaml") and path.is_file()}
+
+
+class WatchedFile:
+    """State of one watched input file."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.stat = None
+        self.written = None
+        if path.suffix == ".tex":
+            self.converter = IncrementalTexConverter(path)
+            self.output_path = path.with_suffix(".yaml")
+        else:
+            self.converter = IncrementalYamlConverter()
+            self.output_path = path.with_suffix(".tex")
+
+    def poll(self) -> bool:
+        """
+        Returns whether the file, or a file it included when last converted,
+        changed since the previous poll.
+        """
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return False
+        dependencies = getattr(self.converter, "dependencies", ())
+        signature = (stat.st_mtime_ns, stat.st_size,
+                     *(file_signature(path) for path in dependencies))
+        changed = signature != self.stat
+        self.stat = signature
+        return changed
+
+
+def watch(inputs, interval: float = 0.5, pattern: str = None, once: bool = False):
+    """
+    Polls the inputs and reconverts the files that change.
+
+    Each file's output is written next to it (.tex -> .yaml, .yaml -> .tex).
+    When both files of a pair are watched, outputs written by the watcher
+    are recognised by their content and not converted back.
+
+    Args:
+        inputs: Files, directories or glob patterns.
+        interval: Seconds between polls.
+        pattern: Glob used inside directories; defaults to main*.tex and main*.yaml.
+        once: Convert the current state once and return instead of polling.
+    """
+    watched: dict[Path, WatchedFile] = {}
+    first_pass = True
+    while True:
+        for path in sorted(collect_watched_files(inputs, pattern)):
+            state = watched.get(path)
+            if state is None:
+                state = watched[path] = WatchedFile(path)
+            if not state.poll():
+                continue
+
+            text = path.read_text(encoding="utf8")
+            if state.written is not None and fingerprint(text) == state.written:
+                continue
+
+            start = time.perf_counter()
+            try:
+                output, reparsed, total = state.converter.convert(text)
+            except Exception as e:
+                print(f"[FAIL] {path}: {type(e).__name__}: {e}")
+                continue
+            elapsed = (time.perf_counter() - start) * 1000
+
+            if first_pass and not once:
+                # Priming run: remember the fingerprints, leave outputs alone.
+                continue
+            if state.output_path.is_file() and \
+                    state.output_path.read_text(encoding="utf8") == output:
+                continue
+            write_atomic(state.output_path, output.encode("utf8"))
+            output_state = watched.get(state.output_path)
+            if output_state is None:
+                output_state = watched[state.output_path] = WatchedFile(state.output_path)
+            output_state.written = fingerprint(output)
+            print(f"[ OK ] {path} -> {state.output_path.name}: "
+                  f"{reparsed}/{total} block(s) reconverted in {elapsed:.1f} ms")
+
+        if once:
+            return
+        first_pass = False
+        time.sleep(interval)
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Reconvert CV files when they change.")
+    parser.add_argument("inputs", nargs="+", help="Files, directories or glob patterns.")
+    parser.add_argument("--interval", type=float, default=0.5,
+                        help="Seconds between polls (default: 0.5).")
+    parser.add_argument("--pattern", default=None,
+                        help="Glob used inside directories (default: main*.tex and main*.yaml).")
+    parser.add_argument("--sections-config", type=Path, default=None,
+                        help="YAML or JSON file registering extra sections.")
+    parser.add_argument("--yaml-backend", choices=BACKENDS, default="auto",
+                        help="YAML backend: libyaml when available (auto), or force one.")
+    args = parser.parse_args(argv)
+
+    if args.sections_config:
+        load_registry_config(args.sections_config)
+    set_backend(args.yaml_backend)
+    print(f"Watching {', '.join(args.inputs)} (Ctrl+C to stop)")
+    try:
+        watch(args.inputs, args.interval, args.pattern)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+"""
+Selection of the PyYAML backend used to load and dump CV data.
+
+The libyaml (C) loader and dumper are used when PyYAML was built with
+them, and the pure-Python ones otherwise. Both produce the same bytes: the
+C emitter folds long double-quoted scalars differently, so documents with
+strings that need double quotes (tabs, line breaks, control or astral
+characters) are emitted by the Python dumper whatever the backend.
+
+PyYAML itself is imported on first use, so commands that never load or dump
+YAML do not pay for it. The dumper classes (PythonDumper, LibyamlDumper and
+their compact variants) and the libyaml loaders are still module attributes.
+
+iter_yaml_sections loads a CV one top-level key at a time, for renderers
+that write each section as soon as it is loaded.
+"""
+import re
+
+
+BACKENDS = ("auto", "libyaml", "python")
+
+# Characters that make the emitters pick the double-quoted style.
+_DOUBLE_QUOTED_RE = re.compile('[^\x20-\x7e\xa0-\u2027\u202a-\ud7ff\ue000-\ufefe\uff00-\ufffd]')
+
+# Shorter repeated strings are written out again in compact mode, where an
+# alias would save little or nothing.
+MIN_ANCHOR_LENGTH = 16
+
+_backend = "auto"
+
+
+class _NeedsPythonEmitter(Exception):
+    pass
+
+
+_representers = []
+_classes = None
+
+# Module attributes defined by _yaml_classes on first access.
+_LAZY_ATTRIBUTES = ("PythonDumper", "CompactPythonDumper", "LibyamlDumper",
+                    "CompactLibyamlDumper", "LibyamlLoader", "StreamingLibyamlLoader",
+                    "ScannerError")
+
+
+class _CompactMixin:
+    """
+    Anchors strings of at least MIN_ANCHOR_LENGTH characters that appear
+    more than once as the same object, and writes aliases for the repeats.
+    """
+
+    def ignore_aliases(self, data):
+        if isinstance(data, str):
+            return len(data) < MIN_ANCHOR_LENGTH
+        return super().ignore_aliases(data)
+
+
+def _yaml_classes() -> dict:
+    """Imports PyYAML and defines the dumpers and loaders, once."""
+    global _classes
+    if _classes is not None:
+        return _classes
+    import yaml
+
+    class PythonDumper(yaml.SafeDumper):
+        """Pure-Python safe dumper."""
+
+    class CompactPythonDumper(_CompactMixin, PythonDumper):
+        """Pure-Python safe dumper writing aliases for repeated strings."""
+
+    classes = {"PythonDumper": PythonDumper, "CompactPythonDumper": CompactPythonDumper,
+               "LibyamlDumper": None, "CompactLibyamlDumper": None, "LibyamlLoader": None,
+               "StreamingLibyamlLoader": None, "ScannerError": yaml.scanner.ScannerError}
+
+    if yaml.__with_libyaml__:
+        class LibyamlDumper(yaml.CSafeDumper):
+            """libyaml safe dumper that refuses strings it would fold differently."""
+
+            def represent_str(self, data):
+                if _DOUBLE_QUOTED_RE.search(data):
+                    raise _NeedsPythonEmitter
+                return super().represent_str(data)
+
+        LibyamlDumper.add_representer(str, LibyamlDumper.represent_str)
+
+        class CompactLibyamlDumper(_CompactMixin, LibyamlDumper):
+            """libyaml safe dumper writing aliases for repeated strings."""
+
+        class StreamingLibyamlLoader(yaml.cyaml.CParser, yaml.composer.Composer,
+                                     yaml.constructor.SafeConstructor, yaml.resolver.Resolver):
+            """
+            Safe loader parsing events with libyaml and composing nodes in
+            Python, so that a document can be composed one node at a time.
+            """
+
+            def __init__(self, stream):
+                yaml.cyaml.CParser.__init__(self, stream)
+                yaml.composer.Composer.__init__(self)
+                yaml.constructor.SafeConstructor.__init__(self)
+                yaml.resolver.Resolver.__init__(self)
+
+        classes.update(LibyamlDumper=LibyamlDumper, CompactLibyamlDumper=CompactLibyamlDumper,
+                       LibyamlLoader=yaml.CSafeLoader,
+                       StreamingLibyamlLoader=StreamingLibyamlLoader)
+
+    for name, cls in classes.items():
+        if isinstance(cls, type) and cls.__module__ == __name__:
+            cls.__qualname__ = name
+    for data_type, representer in _representers:
+        _add_representer(classes, data_type, representer)
+    _classes = classes
+    return classes
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        return _yaml_classes()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _with_libyaml() -> bool:
+    import yaml
+    return yaml.__with_libyaml__
+
+
+def _add_representer(classes: dict, data_type, representer):
+    for name in ("PythonDumper", "CompactPythonDumper", "LibyamlDumper", "CompactLibyamlDumper"):
+        if classes[name] is not None:
+            classes[name].add_representer(data_type, representer)
+
+
+def set_backend(backend: str):
+    """
+    Selects the backend used by load_yaml and dump_yaml.
+
+    Args:
+        backend: "auto" to use libyaml when available, "libyaml" to require
+            it, or "python".
+    """
+    global _backend
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown YAML backend {backend!r}; use one of {', '.join(BACKENDS)}.")
+    if backend == "libyaml" and not _with_libyaml():
+        raise ValueError("The libyaml backend was requested but PyYAML was built without it.")
+    _backend = backend
+
+
+def get_backend(backend: str = None) -> str:
+    """Returns "libyaml" or "python", resolving "auto" and the default."""
+    backend = backend or _backend
+    if backend == "auto":
+        return "libyaml" if _with_libyaml() else "python"
+    return backend
+
+
+def register_representer(data_type, representer):
+    """
+    Registers a representer on the dumpers of every backend.
+
+    Representers registered before PyYAML is imported are added when the
+    dumpers are defined.
+    """
+    _representers.append((data_type, representer))
+    if _classes is not None:
+        _add_representer(_classes, data_type, representer)
+
+
+def load_yaml(stream, backend: str = None):
+    """
+    Loads a YAML document with the safe loader of the selected backend.
+
+    Args:
+        stream: YAML text or an open file.
+        backend: Overrides the backend selected with set_backend.
+
+    Returns:
+        The loaded data.
+    """
+    import yaml
+    classes = _yaml_classes()
+    loader = classes["LibyamlLoader"] if get_backend(backend) == "libyaml" else yaml.SafeLoader
+    return yaml.load(stream, Loader=loader)
+
+
+def iter_yaml_sections(stream, backend: str = None):
+    """
+    Loads a YAML document whose top level is a mapping one key at a time.
+
+    Only the current value is held in memory, with the nodes of the anchors
+    defined so far, which later values may alias. Unlike load_yaml, a key
+    repeated at the top level is yielded twice.
+
+    Args:
+        stream: YAML text or an open file, read in chunks.
+        backend: Overrides the backend selected with set_backend.
+
+    Yields:
+        Tuples of key and value, in document order.
+
+    Raises:
+        ValueError: If the top level is not a mapping.
+    """
+    import yaml
+    classes = _yaml_classes()
+    if get_backend(backend) == "libyaml":
+        loader = classes["StreamingLibyamlLoader"](stream)
+    else:
+        loader = yaml.SafeLoader(stream)
+    try:
+        loader.get_event()
+        if loader.check_event(yaml.StreamEndEvent):
+            return
+        loader.get_event()
+        if not loader.check_event(yaml.MappingStartEvent):
+            if loader.construct_object(loader.compose_node(None, None)) is None:
+                return
+            raise ValueError("The top level of a CV YAML file must be a mapping.")
+        loader.get_event()
+        while not loader.check_event(yaml.MappingEndEvent):
+            key = loader.construct_object(loader.compose_node(None, None), deep=True)
+            value = loader.construct_object(loader.compose_node(None, None), deep=True)
+            # Forget the objects built for this value; aliases to its
+            # anchors build them again from the nodes.
+            loader.constructed_objects = {}
+            loader.recursive_objects = {}
+            yield key, value
+    finally:
+        loader.dispose()
+
+
+def dump_yaml(data, stream=None, backend: str = None, compact: bool = False, **kwargs):
+    """
+    Dumps data as block-style YAML, keeping key order and unicode text.
+
+    Args:
+        data: The data to dump.
+        stream: Open file to write to. If None, the YAML text is returned.
+        backend: Overrides the backend selected with set_backend.
+        compact: Write the first occurrence of a long string that appears
+            several times as the same object with an anchor, and the rest as
+            aliases. Equal strings only share an object once interned (see
+            cv_model.intern_shared_fields).
+        kwargs: Extra options for yaml.dump.
+
+    Returns:
+        The YAML text when stream is None.
+    """
+    import yaml
+    classes = _yaml_classes()
+    options = dict(default_flow_style=False, allow_unicode=True, sort_keys=False)
+    options.update(kwargs)
+    if get_backend(backend) == "libyaml":
+        try:
+            # Nodes are built before anything is emitted, so a fallback
+            # never leaves partial output in the stream.
+            dumper = classes["CompactLibyamlDumper" if compact else "LibyamlDumper"]
+            return yaml.dump(data, stream, Dumper=dumper, **options)
+        except _NeedsPythonEmitter:
+            pass
+    dumper = classes["CompactPythonDumper" if compact else "PythonDumper"]
+    return yaml.dump(data, stream, Dumper=dumper, **options)
@@ -0,0 +1,504 @@
+from contextlib import nullcontext
+from functools import lru_cache
+from pathlib import Path
+import argparse
+import io
+import re
+import sys
+
+from . import profiling, yaml_backend
+from .conversion_cache import open_atomic
+from .cv_model import (CourseEntry, EducationEntry, GenericEntry, LanguageExamEntry,
+                       PosterEntry, PublicationEntry)
+from .emitters import FORMATS, emitter_for_path, get_emitter
+from .section_registry import REGISTRY, load_registry_config
+from .yaml_backend import BACKENDS, load_yaml, set_backend
+
+
+def convert_yaml_to_tex(filepath: Path, input_format: str = None,
+                        streaming: bool = False, update: bool = False) -> Path:
+    """
+    Converts a YAML CV file back to LaTeX format.
+
+    JSON, JSON Lines and MessagePack files written by old_text_to_yaml.py
+    are accepted too.
+    
+    Args:
+        filepath: Path to the file to convert.
+        input_format: One of emitters.FORMATS. Defaults to the format of the
+            file suffix, or YAML.
+        streaming: Load, render and write one section at a time (see
+            stream_file_to_tex) instead of the whole CV at once.
+        update: Rewrite only the sections of the existing .tex file whose
+            content changed, keeping the rest of it byte for byte (see
+            tex_update). The file is not written if nothing changed.
+
+    Returns:
+        The path of the written .tex file.
+    """
+    emitter = get_emitter(input_format) if input_format else emitter_for_path(filepath)
+    tex_filepath = filepath.with_suffix('.tex')
+    try:
+        if streaming:
+            stream_file_to_tex(filepath, tex_filepath, emitter)
+            return tex_filepath
+        with profiling.stage("read"):
+            if emitter.binary:
+                stream = io.BytesIO(filepath.read_bytes())
+            else:
+                stream = io.StringIO(filepath.read_text(encoding="utf8"))
+        with profiling.stage("load"):
+            content_dict = emitter.load(stream)
+    except yaml_backend.ScannerError as e:
+        print(f"Error parsing YAML file: {e}")
+        print("\nThe YAML file contains syntax errors. Common issues:")
+        print("  - Unquoted strings with colons (:) - these need to be in quotes")
+        print("  - Unquoted strings with special characters")
+        print("\nTo fix: Either manually quote problematic values or regenerate the YAML")
+        print("from the original .tex file with cv-migrator to-yaml.")
+        sys.exit(1)
+    
+    if update:
+        # Imported here: updating parses the .tex, which plain conversions
+        # do not need.
+        from .tex_update import update_tex_file
+        with profiling.stage("write"):
+            result = update_tex_file(tex_filepath, content_dict)
+        for section_name in result.not_updated:
+            print(f"Warning: section {section_name} of {tex_filepath} was not updated: it is "
+                  f"read from an included file or shares its lines with other sections.",
+                  file=sys.stderr)
+        return tex_filepath
+
+    latex_text = dict_to_tex(content_dict)
+
+    # Write to .tex file
+    with profiling.stage("write"):
+        with open(tex_filepath, 'w', encoding="utf8") as tex_file:
+            tex_file.write(latex_text)
+    return tex_filepath
+
+
+def stream_file_to_tex(filepath: Path, tex_filepath: Path, emitter=None):
+    """
+    Converts a CV file to LaTeX one section at a time.
+
+    Each section is loaded, rendered and written before the next one is
+    read, so memory holds a single section instead of the whole CV and its
+    LaTeX. YAML and JSON Lines are read lazily; other formats are loaded
+    whole first. The output replaces tex_filepath only once complete.
+
+    Args:
+        filepath: Path to the file to convert.
+        tex_filepath: Path of the .tex file to write.
+        emitter: The format of the file; defaults to the one of its suffix.
+    """
+    emitter = emitter or emitter_for_path(filepath)
+    if emitter.binary:
+        source = open(filepath, 'rb')
+    else:
+        source = open(filepath, 'r', encoding="utf8")
+    with source, open_atomic(tex_filepath) as output:
+        if emitter.iter_sections is not None:
+            sections = emitter.iter_sections(source)
+        else:
+            with profiling.stage("load"):
+                sections = (emitter.load(source) or {}).items()
+        write_tex_sections(profiling.profiled_lines("load", sections), output)
+
+
+def yaml_to_dict(source) -> dict:
+    """
+    Loads YAML CV data.
+
+    Args:
+        source: YAML text or an open file.
+
+    Returns:
+        The CV content, keyed by section name.
+    """
+    return load_yaml(source)
+
+
+def yaml_to_tex_text(source) -> str:
+    """
+    Renders YAML CV data as LaTeX without touching the filesystem.
+
+    Args:
+        source: YAML text, an open file, or an already loaded dictionary.
+
+    Returns:
+        The LaTeX text.
+    """
+    if not isinstance(source, dict):
+        source = yaml_to_dict(source)
+    return dict_to_tex(source)
+
+
+def dict_to_tex(content_dict: dict) -> str:
+    """
+    Renders CV content as LaTeX.
+
+    Args:
+        content_dict: The CV content, keyed by section name.
+
+    Returns:
+        The LaTeX text.
+    """
+    latex_lines = []
+    for section_name, section_content in content_dict.items():
+        latex_lines.extend(section_to_tex_lines(section_name, section_content))
+    return '\n'.join(latex_lines)
+
+
+def write_tex_sections(sections, stream):
+    """
+    Renders sections as LaTeX, writing each one as soon as it is rendered.
+
+    The output is the same as dict_to_tex of the same sections.
+
+    Args:
+        sections: Iterable of (section name, content) pairs.
+        stream: Open text file to write to.
+    """
+    separator = ""
+    for section_name, section_content in sections:
+        text = '\n'.join(section_to_tex_lines(section_name, section_content))
+        with profiling.stage("write"):
+            stream.write(separator)
+            stream.write(text)
+        separator = '\n'
+
+
+def section_to_tex_lines(section_name, section_content) -> list[str]:
+    """
+    Renders one section as LaTeX lines, including its trailing blank line.
+
+    Args:
+        section_name: The name of the section.
+        section_content: The content of the section.
+
+    Returns:
+        The LaTeX lines of the section.
+    """
+    latex_lines = []
+
+    # Check if this is a university transcript section
+    if is_transcript_section(section_content):
+        latex_lines.append(r"\title{University Transcript}")
+        latex_lines.append(f"\\section{{{section_name}}}")
+        latex_lines.append("")
+        # Add transcript table
+        for assignment, details in section_content.items():
+            if assignment == "free_text":
+                continue
+            grade = details.get("grade", "")
+            duration = details.get("duration", "")
+            if duration:
+                latex_lines.append(f"{assignment} & {grade} & {duration} \\\\")
+            else:
+                latex_lines.append(f"{assignment} & {grade} \\\\")
+        latex_lines.append("")
+        return latex_lines
+    
+    # Regular section
+    latex_lines.append(f"\\section{{{section_name}}}")
+    
+    # Handle list-based sections (like Participation in Conferences)
+    if isinstance(section_content, list):
+        for entry in section_content:
+            latex_entry = format_entry(section_name, None, entry)
+            latex_lines.append(latex_entry)
+        latex_lines.append("")
+        return latex_lines
+    
+    # Handle dict-based sections
+    for key, value in section_content.items():
+        if key == "free_text":
+            # Add free text lines
+            for text_line in value:
+                latex_lines.append(markdown_to_latex(text_line))
+            continue
+        
+        # Check if this is a language entry (simple dict with 'level' key)
+        if isinstance(value, dict) and "level" in value and len(value) == 1:
+            level = value["level"]
+            latex_lines.append(f"\\cvitemwithcomment{{{key}}}{{{level}}}{{}}")
+            continue
+        
+        # Check if this is a subsection (list of entries)
+        if isinstance(value, list):
+            latex_lines.append(f"\\subsection{{{key}}}")
+            for entry in value:
+                latex_entry = format_entry(section_name, key, entry)
+                latex_lines.append(latex_entry)
+            continue
+    
+    latex_lines.append("")
+    return latex_lines
+
+
+def is_transcript_section(section_content):
+    """
+    Checks if a section is a university transcript section.
+    
+    Args:
+        section_content: The content of the section.
+    
+    Returns:
+        True if this is a transcript section, False otherwise.
+    """
+    if not isinstance(section_content, dict):
+        return False
+    
+    # Check if the first entry has 'grade' key (typical of transcript)
+    for key, value in section_content.items():
+        if key == "free_text":
+            continue
+        if isinstance(value, dict) and "grade" in value:
+            return True
+        break
+    return False
+
+
+def format_entry(section_name, subsection_name, entry):
+    """
+    Formats a single entry as a LaTeX \\cventry command.
+    
+    Args:
+        section_name: The name of the section.
+        subsection_name: The name of the subsection (or None).
+        entry: The entry data dictionary.
+    
+    Returns:
+        A formatted LaTeX \\cventry string.
+    """
+    with profiling.entry(section_name, subsection_name):
+        with profiling.stage("section_dispatch"):
+            format_function = REGISTRY.formatter(section_name, subsection_name)
+        with profiling.stage(getattr(format_function, "__name__", "format")):
+            return format_function(entry)
+
+
+def format_education_entry(entry):
+    """
+    Formats an education/experience entry.
+    Format: \\cventry{date}{name}{}{location}{}{description}
+    """
+    entry = EducationEntry.coerce(entry)
+    return format_located_entry(entry.date, entry.name, entry.location, entry.description)
+
+
+def format_generic_entry(entry):
+    """
+    Formats an entry of a section without a dedicated kind.
+    Format: \\cventry{date}{name}{}{location}{}{description}{extras...}
+    """
+    entry = GenericEntry.coerce(entry)
+    return format_located_entry(entry.date, entry.name, entry.location, entry.description,
+                                entry.extras)
+
+
+def format_located_entry(date, name, location, description, extras=()):
+    """
+    Formats the fields shared by education and generic entries.
+    """
+    # Split location if it contains a comma (sub_location, location format)
+    location_parts = location.split(", ", 1)
+    if len(location_parts) == 2:
+        sub_location, main_location = location_parts
+        fields = [date, name, sub_location, main_location]
+    else:
+        fields = [date, name, "", location]
+    
+    # Add empty field
+    fields.append("")
+    return build_cventry(fields, description, extras)
+
+
+def format_publication_entry(entry):
+    """
+    Formats a publication entry.
+    Format: \\cventry{date}{title}{journal}{authors}{}{description}
+    """
+    entry = PublicationEntry.coerce(entry)
+    fields = [entry.date, entry.title, entry.journal, entry.authors, ""]
+    return build_cventry(fields, entry.description)
+
+
+def format_poster_entry(entry):
+    """
+    Formats a poster/presentation entry.
+    Format: \\cventry{date}{title}{event}{authors}{}{description}
+    """
+    entry = PosterEntry.coerce(entry)
+    fields = [entry.date, entry.title, entry.event, entry.authors, ""]
+    return build_cventry(fields, entry.description)
+
+
+def format_course_entry(entry):
+    """
+    Formats a course/conference entry.
+    Format: \\cventry{date}{name}{extension}{location}{language}{description}
+    """
+    entry = CourseEntry.coerce(entry)
+    fields = [entry.date, entry.name, entry.extension, entry.location]
+    
+    # Add language field if present
+    if entry.language:
+        fields.append(f"Language: {entry.language}")
+    else:
+        fields.append("")
+    return build_cventry(fields, entry.description)
+
+
+def format_language_exam_entry(entry):
+    """
+    Formats a language exam entry.
+    Format: \\cventry{date}{name}{}{}{}{description}
+    """
+    entry = LanguageExamEntry.coerce(entry)
+    fields = [entry.date, entry.name, "", "", ""]
+    return build_cventry(fields, entry.description)
+
+
+def build_cventry(fields, description, extras=()):
+    """
+    Builds a \\cventry command, converting every field from Markdown once.
+    
+    Args:
+        fields: The fields before the description.
+        description: List of description strings, or a single string.
+        extras: Fields after the description.
+    
+    Returns:
+        The \\cventry string.
+    """
+    parts = [markdown_to_latex(field) for field in fields]
+    
+    # Add description
+    if isinstance(description, list):
+        parts.append(format_description(description))
+    else:
+        parts.append(markdown_to_latex(str(description)))
+    
+    # Add extras if present
+    parts.extend(markdown_to_latex(str(extra)) for extra in extras)
+    return "\\cventry" + "".join("{" + part + "}" for part in parts)
+
+
+def format_description(description):
+    """
+    Formats a description list into a single string.
+    
+    Args:
+        description: List of description strings.
+    
+    Returns:
+        Formatted description string.
+    """
+    if not description:
+        return ""
+    
+    # Join description parts with line continuation
+    # Filter out empty strings to avoid issues with split descriptions
+    formatted_parts = [markdown_to_latex(str(part).strip()) for part in description if str(part).strip()]
+    
+    if not formatted_parts:
+        return ""
+    elif len(formatted_parts) == 1:
+        return formatted_parts[0]
+    else:
+        # Use \\ continuation for multi-line descriptions
+        return " \\\\\n".join(formatted_parts)
+
+
+# Markdown links, bold, italics and superscripts. Bold may hold italics and
+# italics may hold bold; "***text***" is read as italic bold, the way the
+# LaTeX to Markdown direction writes \textit{\textbf{text}}. Contents are
+# converted recursively, but link targets are left as they are.
+_MARKDOWN_RE = re.compile(r"""
+    \[(?P<link_text>[^\]]+)\]\((?P<url>[^\)]+)\)
+  | \*\*\*(?P<bold_italic>[^*]+)\*\*\*
+  | (?<!\*)\*(?P<italic>(?:[^*]|\*\*[^*]+\*\*)+?)\*(?!\*)
+  | \*\*(?P<bold>(?:[^*]|\*[^*]+\*)+)\*\*
+  | \^(?P<superscript>[^^]+)\^
+""", re.VERBOSE)
+
+
+def _markdown_match_to_latex(match):
+    kind = match.lastgroup
+    if kind == "url":
+        return f"\\href{{{match['url']}}}{{{markdown_to_latex(match['link_text'])}}}"
+    content = markdown_to_latex(match[kind])
+    if kind == "bold_italic":
+        return f"\\textit{{\\textbf{{{content}}}}}"
+    if kind == "bold":
+        return f"\\textbf{{{content}}}"
+    if kind == "italic":
+        return f"\\textit{{{content}}}"
+    return f"$^{{{content}}}$"
+
+
+@profiling.profiled("inline_markup")
+@lru_cache(maxsize=4096)
+def markdown_to_latex(text):
+    """
+    Converts Markdown formatting back to LaTeX in a single pass.
+
+    Results are cached, since author lists, venues and locations repeat
+    across entries.
+    
+    Args:
+        text: Text with Markdown formatting.
+    
+    Returns:
+        Text with LaTeX formatting.
+    """
+    return _MARKDOWN_RE.sub(_markdown_match_to_latex, text)
+
+
+REGISTRY.bind_handlers("cv_migrator.yaml_to_text", globals())
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Convert a YAML CV back to LaTeX.")
+    parser.add_argument("yaml_file", type=Path,
+                        help="Path to the .yaml (or .json, .jsonl, .msgpack) file.")
+    parser.add_argument("--sections-config", type=Path, default=None,
+                        help="YAML or JSON file registering extra sections.")
+    parser.add_argument("--yaml-backend", choices=BACKENDS, default="auto",
+                        help="YAML loader: libyaml when available (auto), or force one.")
+    parser.add_argument("--format", choices=FORMATS, default=None,
+                        help="Input format (default: from the file suffix).")
+    parser.add_argument("--profile", nargs="?", const="-", default=None, metavar="REPORT",
+                        help="Write a JSON report of the time spent per stage to REPORT "
+                             "(default: stderr).")
+    parser.add_argument("--stream", action="store_true",
+                        help="Load, render and write one section at a time, so memory holds "
+                             "a single section (YAML and JSON Lines).")
+    parser.add_argument("--update", action="store_true",
+                        help="Rewrite only the sections of the existing .tex file that changed, "
+                             "keeping its preamble, macros and formatting.")
+    args = parser.parse_args(argv)
+    if args.update and args.stream:
+        parser.error("--update and --stream cannot be combined.")
+    if args.sections_config:
+        load_registry_config(args.sections_config)
+    set_backend(args.yaml_backend)
+
+    # Specify the path to the .yaml file
+    yaml_file_path = args.yaml_file
+    
+    # Convert the .yaml file to .tex
+    with profiling.Profiler() if args.profile else nullcontext() as profiler:
+        convert_yaml_to_tex(yaml_file_path, args.format, args.stream, args.update)
+    if profiler:
+        profiling.write_report(profiler.report(file=str(yaml_file_path), direction="to-tex"),
+                               args.profile)
+    print(f"Converted {yaml_file_path} to LaTeX format.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+import os
+import time
+
+from cv_migrator.batch_migrate import convert_file
+from cv_migrator.conversion_cache import ConversionCache
+
+PUBLICATIONS = (
+    "\\subsection{Publications}\n"
+    "\\cventry{2021}{A paper}{Journal}{A. Corbat}{}{}\n"
+)
+
+
+def write_cv(tmp_path):
+    (tmp_path / "pubs.tex").write_text(PUBLICATIONS, encoding="utf8")
+    main = tmp_path / "main.tex"
+    main.write_text("\\section{Production}\n\\input{pubs}\n", encoding="utf8")
+    return main
+
+
+def status(main, cache, dependencies, cache_extra=b""):
+    _, ok, _, error, cache_status, _, _ = convert_file(main, "to-yaml", cache, cache_extra,
+                                                       dependencies=dependencies)
+    assert ok, error
+    return cache_status
+
+
+def test_keys_depend_on_the_data_the_direction_and_the_extra(tmp_path):
+    cache = ConversionCache(tmp_path)
+    key = cache.key(b"data", "to-yaml")
+
+    assert cache.key(b"data", "to-yaml") == key
+    assert len({key, cache.key(b"other", "to-yaml"), cache.key(b"data", "to-tex"),
+                cache.key(b"data", "to-yaml", b"config")}) == 4
+    # Parts are length prefixed, so moving bytes between them changes the key.
+    assert cache.key(b"ab", "to-yaml", b"c") != cache.key(b"b", "to-yaml", b"ca")
+
+
+def test_put_and_get(tmp_path):
+    cache = ConversionCache(tmp_path / "cache")
+    key = cache.key(b"data", "to-yaml")
+
+    assert cache.get(key) is None
+    cache.put(key, b"output")
+    assert cache.get(key) == b"output"
+
+
+def test_unchanged_inputs_are_served_from_the_cache(tmp_path):
+    main = write_cv(tmp_path)
+    output = tmp_path / "main.yaml"
+    cache = ConversionCache(tmp_path / "cache")
+    dependencies = [(tmp_path / "pubs.tex").resolve()]
+
+    # Without the dependencies of the input the cache is only filled.
+    assert status(main, cache, None) == "miss"
+    converted = output.read_bytes()
+    assert status(main, cache, dependencies) == "unchanged"
+    output.unlink()
+    assert status(main, cache, dependencies) == "hit"
+    assert output.read_bytes() == converted
+    output.write_text("edited", encoding="utf8")
+    assert status(main, cache, dependencies) == "hit"
+    assert output.read_bytes() == converted
+
+
+def test_changed_includes_and_extras_miss(tmp_path):
+    main = write_cv(tmp_path)
+    cache = ConversionCache(tmp_path / "cache")
+    dependencies = [(tmp_path / "pubs.tex").resolve()]
+    status(main, cache, None)
+
+    assert status(main, cache, dependencies, b"config") == "miss"
+    assert status(main, cache, dependencies, b"config") == "unchanged"
+    (tmp_path / "pubs.tex").write_text(PUBLICATIONS.replace("A paper", "Revised"),
+                                       encoding="utf8")
+    assert status(main, cache, dependencies) == "miss"
+    assert "Revised" in (tmp_path / "main.yaml").read_text(encoding="utf8")
+    main.write_text(main.read_text(encoding="utf8") + "Free text\n", encoding="utf8")
+    assert status(main, cache, dependencies) == "miss"
+
+
+def test_evict_removes_old_entries_then_the_least_recently_used(tmp_path):
+    cache = ConversionCache(tmp_path, max_bytes=10, max_age=60 * 60)
+    keys = [cache.key(name.encode(), "to-yaml") for name in "abcd"]
+    now = time.time()
+    for age, key in zip((2 * 60 * 60, 30, 20, 10), keys):
+        cache.put(key, b"x" * 4)
+        path = tmp_path / key[:2] / key
+        os.utime(path, (now - age, now - age))
+
+    assert cache.evict() == (2, 8)
+    assert [cache.get(key) is not None for key in keys] == [False, False, True, True]
+    assert ConversionCache(tmp_path / "missing").evict() == (0, 0)
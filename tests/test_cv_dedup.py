@@ -0,0 +1,96 @@
+from pathlib import Path
+
+from cv_migrator.cv_dedup import (DuplicateFinder, author_surnames, canonical_entry,
+                                  find_duplicates, main, read_entries, title_words)
+from cv_migrator.cv_index import IndexedEntry
+
+ENGLISH = (
+    "\\section{Production}\n"
+    "\\subsection{Publications}\n"
+    "\\cventry{2021}{A paper on \\textbf{things}}{Journal of Stuff}"
+    "{\\underline{A. Corbat}, B. Author}{}{DOI: 10.1/1}\n"
+    "\\cventry{2021}{A paper on things}{Other Journal}{C. Other, D. Someone}{}{}\n"
+)
+SPANISH = (
+    "\\section{Producción}\n"
+    "\\subsection{Publicaciones}\n"
+    "\\cventry{2021}{A PAPER ON \\textit{Things}.}{Journal of Stuff}"
+    "{Corbat, A. and Author, B.}{}{}\n"
+)
+
+
+def publication(title, authors, source="main.tex", **fields):
+    return IndexedEntry(Path(source), "Production", "Publications", 0,
+                        {"title": title, "authors": authors, **fields})
+
+
+def titles(cluster):
+    return [(item.source.name, item.entry["title"]) for item in cluster]
+
+
+def write_cvs(tmp_path):
+    (tmp_path / "main_en.tex").write_text(ENGLISH, encoding="utf8")
+    (tmp_path / "main_es.tex").write_text(SPANISH, encoding="utf8")
+    return [tmp_path / "main_en.tex", tmp_path / "main_es.tex"]
+
+
+def test_titles_and_authors_are_normalized():
+    assert title_words("A PAPER on *Things*.") == title_words("a paper on **things**")
+    assert author_surnames("**A. Corbat**, B. Áuthor") == \
+        author_surnames("Corbat, A. and Author, B.") == {"corbat", "author"}
+
+
+def test_duplicates_are_found_across_languages(tmp_path):
+    clusters = find_duplicates(read_entries(write_cvs(tmp_path))).clusters()
+
+    assert [titles(cluster) for cluster in clusters] == [
+        [("main_en.tex", "A paper on **things**"), ("main_es.tex", "A PAPER ON *Things*.")]]
+    assert [item.section for item in clusters[0]] == ["Production", "Producción"]
+
+
+def test_near_duplicates_are_found_through_a_shared_band():
+    first = "Fast single molecule imaging of protein dynamics in living cells"
+    second = "Fast single molecule imaging of protein dynamics in live cells"
+    finder = DuplicateFinder()
+    signatures = [finder.hasher.signature(title_words(title)) for title in (first, second)]
+    bands = [signature[band * finder.rows:(band + 1) * finder.rows]
+             for signature in signatures for band in range(finder.bands)]
+
+    # Not copies, so not joined by the exact-match shortcut, and sharing
+    # some bands but not all.
+    assert title_words(first) != title_words(second)
+    assert 0 < sum(a == b for a, b in zip(bands[:finder.bands], bands[finder.bands:])) \
+        < finder.bands
+    finder.add(publication(first, "A. Corbat"), "publication")
+    finder.add(publication(second, "Corbat, A."), "publication")
+    finder.add(publication("An unrelated title", "A. Corbat"), "publication")
+
+    assert [titles(cluster) for cluster in finder.clusters()] == [
+        [("main.tex", first), ("main.tex", second)]]
+
+
+def test_same_title_with_other_authors_stays_separate():
+    finder = DuplicateFinder()
+    finder.add(publication("A paper on things", "A. Corbat, B. Author"), "publication")
+    finder.add(publication("A paper on things", "C. Other, D. Someone"), "publication")
+    finder.add(publication("A paper on things", "Author, B.; Corbat, A."), "publication")
+
+    clusters = finder.clusters(min_size=1)
+
+    assert [[item.entry["authors"] for item in cluster] for cluster in clusters] == [
+        ["A. Corbat, B. Author", "Author, B.; Corbat, A."], ["C. Other, D. Someone"]]
+
+
+def test_canonical_entry_is_the_most_complete():
+    cluster = [publication("A paper", "A. Corbat", journal=""),
+               publication("A paper", "A. Corbat", journal="Journal", date="2021"),
+               publication("A paper", "A. Corbat", journal="J.", date="2021")]
+
+    assert canonical_entry(cluster) is cluster[1]
+
+
+def test_summary_counts_clusters(tmp_path, capsys):
+    assert main([str(path) for path in write_cvs(tmp_path)]) == 0
+
+    assert "Found 1 cluster of duplicates among 3 publications and posters." \
+        in capsys.readouterr().out
@@ -0,0 +1,80 @@
+import os
+
+from cv_migrator.cv_index import CVIndex
+
+PUBLICATIONS = (
+    "\\section{Production}\n"
+    "\\subsection{Publications}\n"
+    "\\cventry{2019}{First paper}{Journal of Stuff}{\\underline{A. Corbat}, B. Author}{}{}\n"
+    "\\cventry{2022}{Second paper}{Nature Stuff}{C. Other}{}{}\n"
+)
+
+
+def write(path, text, mtime_ns=None):
+    path.write_text(text, encoding="utf8")
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def titles(entries):
+    return [entry.entry["title"] for entry in entries]
+
+
+def test_unchanged_sources_are_skipped(tmp_path):
+    main = tmp_path / "main.tex"
+    write(main, PUBLICATIONS)
+    with CVIndex(tmp_path / "cvs.sqlite") as index:
+        first = index.update([main])
+        second = index.update([main])
+        # Touched, with the same content.
+        write(main, PUBLICATIONS, main.stat().st_mtime_ns + 10**9)
+        third = index.update([main])
+
+        assert (first.indexed, first.unchanged, first.entries) == (1, 0, 2)
+        assert (second.indexed, second.unchanged, second.entries) == (0, 1, 0)
+        assert (third.indexed, third.unchanged, third.entries) == (0, 1, 0)
+        assert titles(index.query(subsection="Publications")) == ["First paper", "Second paper"]
+
+
+def test_changed_sources_replace_their_entries(tmp_path):
+    main = tmp_path / "main.tex"
+    other = tmp_path / "other.tex"
+    write(main, PUBLICATIONS)
+    write(other, PUBLICATIONS.replace("First", "Third"))
+    with CVIndex(tmp_path / "cvs.sqlite") as index:
+        index.update([main, other])
+        write(main, PUBLICATIONS.replace("{2019}{First paper}", "{2023}{Revised paper}"),
+              main.stat().st_mtime_ns + 10**9)
+        summary = index.update([main, other])
+
+        assert (summary.indexed, summary.unchanged, summary.entries) == (1, 1, 2)
+        assert titles(index.query(source=main)) == ["Revised paper", "Second paper"]
+        assert titles(index.query(since=2023)) == ["Revised paper"]
+        assert titles(index.query(author="Corbat")) == ["Revised paper", "Third paper"]
+        assert titles(index.query(venue="nature")) == ["Second paper", "Second paper"]
+
+
+def test_failed_updates_keep_the_previous_entries(tmp_path):
+    main = tmp_path / "main.tex"
+    write(main, PUBLICATIONS)
+    with CVIndex(tmp_path / "cvs.sqlite") as index:
+        index.update([main])
+        write(main, PUBLICATIONS + "\\cventry{2023}{Unclosed", main.stat().st_mtime_ns + 10**9)
+        summary = index.update([main])
+
+        assert summary.indexed == 0 and [path for path, _ in summary.errors] == [main]
+        assert titles(index.query()) == ["First paper", "Second paper"]
+
+
+def test_prune_removes_deleted_sources(tmp_path):
+    main = tmp_path / "main.tex"
+    other = tmp_path / "other.tex"
+    write(main, PUBLICATIONS)
+    write(other, PUBLICATIONS)
+    with CVIndex(tmp_path / "cvs.sqlite") as index:
+        index.update([main, other])
+        other.unlink()
+
+        assert index.prune() == 1
+        assert index.sources() == [main.resolve()]
+        assert len(index.query()) == 2
@@ -0,0 +1,97 @@
+from concurrent.futures import ThreadPoolExecutor
+import io
+import json
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from cv_migrator.cv_worker import serve_stdio
+from cv_migrator.old_text_to_yaml import tex_to_yaml_text
+
+ROOT = Path(__file__).resolve().parent.parent
+
+TEX = ("\\section{Education}\n\\subsection{Degrees}\n"
+       "\\cventry{2010}{Lic}{UBA}{Buenos Aires}{}{}\n")
+
+
+@pytest.fixture(params=["thread", "process"])
+def worker_socket(request, tmp_path):
+    socket_path = tmp_path / "worker.sock"
+    process = subprocess.Popen([sys.executable, "-m", "cv_migrator.cv_worker",
+                                "--socket", str(socket_path), "--workers", "4",
+                                "--pool", request.param],
+                               cwd=ROOT, stderr=subprocess.PIPE)
+    deadline = time.monotonic() + 10
+    while not socket_path.exists():
+        if process.poll() is not None or time.monotonic() > deadline:
+            process.kill()
+            pytest.fail(f"The worker did not start: {process.stderr.read().decode()}")
+        time.sleep(0.02)
+    yield socket_path
+    process.terminate()
+    _, stderr = process.communicate(timeout=10)
+    # Callbacks failing after the connection closed are only logged.
+    assert b"exception calling callback" not in stderr
+    assert b"Traceback" not in stderr
+
+
+def exchange(socket_path, requests):
+    """Sends requests, half-closes the connection and reads every response."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(30)
+        client.connect(str(socket_path))
+        client.sendall("".join(json.dumps(request) + "\n" for request in requests).encode())
+        client.shutdown(socket.SHUT_WR)
+        data = b""
+        while chunk := client.recv(65536):
+            data += chunk
+    return [json.loads(line) for line in data.decode().splitlines()]
+
+
+def test_every_response_of_concurrent_connections_arrives(worker_socket):
+    def connection(number):
+        requests = [{"id": f"{number}-{i}", "direction": "to-yaml", "text": TEX}
+                    for i in range(5)]
+        requests.append({"id": f"{number}-bad", "direction": "sideways", "text": ""})
+        return requests, exchange(worker_socket, requests)
+
+    with ThreadPoolExecutor(max_workers=50) as pool:
+        results = list(pool.map(connection, range(100)))
+
+    for requests, responses in results:
+        assert sorted(response["id"] for response in responses) == \
+            sorted(request["id"] for request in requests)
+        for response in responses:
+            if response["id"].endswith("-bad"):
+                assert not response["ok"] and "Unknown direction" in response["error"]
+            else:
+                assert response["ok"] and "Lic" in response["result"]
+
+
+def test_responses_come_before_the_connection_is_closed(worker_socket):
+    expected = tex_to_yaml_text(TEX)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(30)
+        client.connect(str(worker_socket))
+        reader = client.makefile("rb")
+        for i in range(3):
+            request = {"id": i, "direction": "to-yaml", "text": TEX}
+            client.sendall((json.dumps(request) + "\n").encode())
+            assert json.loads(reader.readline()) == {"id": i, "ok": True, "result": expected}
+
+
+def test_serve_stdio_restores_sys_stdout(monkeypatch):
+    original = io.StringIO()
+    monkeypatch.setattr(sys, "stdout", original)
+    requests = io.StringIO(json.dumps({"id": 1, "direction": "to-yaml", "text": TEX}) + "\n")
+    responses = io.StringIO()
+
+    serve_stdio(requests, responses)
+
+    assert sys.stdout is original and original.getvalue() == ""
+    assert json.loads(responses.getvalue()) == {"id": 1, "ok": True,
+                                                "result": tex_to_yaml_text(TEX)}
@@ -0,0 +1,37 @@
+import io
+
+from cv_migrator.emitters import get_emitter, iter_entries, iter_records
+
+CONTENT = {
+    "Skills": {
+        "Other": [{"name": "Misc", "date": "2020", "location": "Place", "description": ""}],
+        "free_text": ["Python, LaTeX and **microscopy**."],
+    },
+    "Languages": {"English": {"level": "Advanced"}},
+}
+
+
+def dump_jsonl(content):
+    stream = io.StringIO()
+    get_emitter("jsonl").dump(content, stream)
+    stream.seek(0)
+    return stream
+
+
+def test_free_text_has_its_own_records():
+    records = list(iter_records(CONTENT))
+
+    assert {"record": "text", "section": "Skills",
+            "text": "Python, LaTeX and **microscopy**."} in records
+    assert all(record.get("subsection") != "free_text" for record in records)
+
+
+def test_iter_entries_yields_only_entries():
+    entries = list(iter_entries(dump_jsonl(CONTENT)))
+
+    assert entries == [("Skills", "Other", CONTENT["Skills"]["Other"][0])]
+
+
+def test_jsonl_round_trip_keeps_free_text():
+    assert get_emitter("jsonl").load(dump_jsonl(CONTENT)) == CONTENT
+
@@ -0,0 +1,47 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+MALFORMED = (
+    "\\section{Production}\n"
+    "\\subsection{Publications}\n"
+    "\\cventry{2021}{Good paper}{Journal}{A. Corbat}{}{}\n"
+    "\\cventry{2022}{Bad paper}\n"
+    "\\subsection{Posters and Oral Presentations}\n"
+    "\\cventry{2019}{Bad poster}{Meeting}\n"
+)
+
+
+def run(*args):
+    return subprocess.run([sys.executable, *args], cwd=ROOT, capture_output=True, text=True,
+                          check=True)
+
+
+def test_keep_going_report_is_json(tmp_path):
+    main = tmp_path / "main.tex"
+    main.write_text(MALFORMED, encoding="utf8")
+
+    result = run("-m", "cv_migrator.old_text_to_yaml", str(main), "--keep-going")
+
+    report = json.loads(result.stderr)
+    assert report["files"] == 1 and report["failures"] == 2
+    assert [(failure["line"], failure["subsection"]) for failure in report["diagnostics"]] == [
+        (4, "Publications"), (6, "Posters and Oral Presentations")]
+    errors = [failure["error"] for failure in report["diagnostics"]]
+    assert "publication entry (2)" in errors[0] and "poster entry (3)" in errors[1]
+    assert "Good paper" in (tmp_path / "main.yaml").read_text(encoding="utf8")
+
+
+def test_batch_keep_going_report_is_json(tmp_path):
+    for name in ("a", "b"):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "main.tex").write_text(MALFORMED, encoding="utf8")
+
+    result = run("-m", "cv_migrator.batch_migrate", str(tmp_path / "a"), str(tmp_path / "b"),
+                 "--no-cache", "--keep-going")
+
+    report = json.loads(result.stderr)
+    assert report["files"] == 2 and report["failures"] == 4
@@ -0,0 +1,83 @@
+from cv_migrator.latex_tokenizer import COMMAND, GROUP, NEWLINE, TEXT, tokenize
+from cv_migrator.old_text_to_yaml import locate_structure, parse_tex_events, tex_to_dict
+from cv_migrator.tex_update import split_tex_spans
+from cv_migrator.watch_mode import split_tex_blocks
+
+SOURCE = (
+    "\\begin{document}\n"
+    "Intro with \\textbf{bold} text \\section{Education}\n"
+    "\\subsection{Degrees} \\cventry{2010}{Degree}{University}{City}{}{}\n"
+    "% \\section{Commented}\n"
+    "Some \\href{https://example.org}{link} \\section*{Skills}\n"
+    "\\end{document}\n"
+)
+
+
+def test_tokens_keep_their_line_and_column():
+    tokens = list(tokenize("a \\textbf{b}\n  \\section{C}"))
+
+    assert [(token.kind, token.text, token.line, token.column) for token in tokens] == [
+        (TEXT, "a ", 1, 1),
+        (COMMAND, "\\textbf", 1, 3),
+        (GROUP, "{b}", 1, 10),
+        (NEWLINE, "\n", 1, 13),
+        (TEXT, "  ", 2, 1),
+        (COMMAND, "\\section", 2, 3),
+        (GROUP, "{C}", 2, 11),
+    ]
+
+
+def test_lines_without_line_breaks_end_their_line():
+    tokens = list(tokenize(["a\n", "b", "c"]))
+
+    assert [(token.kind, token.text, token.line) for token in tokens] == [
+        (TEXT, "a", 1), (NEWLINE, "\n", 1), (TEXT, "b", 2), (NEWLINE, "\n", 2), (TEXT, "c", 3)]
+
+
+def test_splitlines_input_parses_like_the_text():
+    source = ("\\section{Other}\nfirst line\nsecond line\n"
+              "\\subsection{Misc}\n\\cventry{2020}{Two\nlines}{Place}{City}{}{}\n")
+
+    assert tex_to_dict(source.splitlines()) == tex_to_dict(source)
+    assert tex_to_dict(source.splitlines())["Other"]["free_text"] == ["first line", "second line"]
+
+
+def test_inline_commands_stay_in_their_line():
+    events = parse_tex_events(["\\section{A}\n", "Intro with \\textbf{bold} and \\emph{it}\n"])
+
+    assert events == [("section", "A"), ("line", "Intro with **bold** and \\emph{it}", 2)]
+
+
+def test_commands_in_the_middle_of_a_line_are_events():
+    events = parse_tex_events(SOURCE.splitlines(keepends=True))
+
+    assert [event[0] for event in events] == [
+        "line", "line", "section", "subsection", "entry", "line", "section", "line"]
+    assert events[1] == ("line", "Intro with **bold** text", 2)
+    assert events[4][2] == 3
+    assert events[5] == ("line", "Some [link](https://example.org)", 5)
+
+
+def test_structure_is_located_where_the_parser_sees_it():
+    starts, end = locate_structure(SOURCE)
+
+    assert [(event[:2], SOURCE[offset:offset + 9]) for event, offset in starts] == [
+        (("section", "Education"), "\\section{"),
+        (("subsection", "Degrees"), "\\subsecti"),
+        (("entry", ["2010", "Degree", "University", "City"]), "\\cventry{"),
+        (("section", "Skills"), "\\section*"),
+    ]
+    assert SOURCE[end:] == "\\end{document}\n"
+
+
+def test_splits_agree_with_the_converter():
+    content = tex_to_dict(SOURCE)
+    blocks = split_tex_blocks(SOURCE)
+    head, spans, trailer = split_tex_spans(SOURCE)
+
+    assert "".join(blocks) == SOURCE
+    assert blocks[0] == "\\begin{document}\nIntro with \\textbf{bold} text "
+    assert [list(tex_to_dict(block)) for block in blocks[1:]] == [[name] for name in content]
+    assert head.text + "".join(span.text for span in spans) + trailer == SOURCE
+    assert [span.text for span in spans] == blocks[1:-1] + [blocks[-1][:-len(trailer)]]
+    assert [span.line for span in spans] == [2, 5]
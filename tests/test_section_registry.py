@@ -0,0 +1,34 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from cv_migrator.section_registry import SectionRegistry
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_only_the_requested_handler_is_resolved():
+    registry = SectionRegistry()
+    registry.register_kind("thing", parse="json:loads", format="no_such_module:dumps")
+    registry.register_section("Things", "thing")
+
+    assert registry.parser("Things") is __import__("json").loads
+
+
+def test_each_direction_imports_only_its_converter(tmp_path):
+    tex = tmp_path / "main.tex"
+    tex.write_text("\\section{Education}\n\\subsection{Degrees}\n"
+                   "\\cventry{2010}{Lic}{UBA}{Buenos Aires}{}{}\n", encoding="utf8")
+    script = ("import sys\n"
+              "from cv_migrator.cli import main\n"
+              "main([sys.argv[1], sys.argv[2]])\n"
+              "print(' '.join(sorted(m for m in ('old_text_to_yaml', 'yaml_to_text', "
+              "'latex_tokenizer', 'tex_includes') if 'cv_migrator.' + m in sys.modules)))\n")
+
+    def imported(*args):
+        result = subprocess.run([sys.executable, "-c", script, *args], cwd=ROOT, check=True,
+                                capture_output=True, text=True)
+        return result.stdout.splitlines()[-1].split()
+
+    assert "yaml_to_text" not in imported("to-yaml", str(tex))
+    assert imported("to-tex", str(tex.with_suffix(".yaml"))) == ["yaml_to_text"]
@@ -0,0 +1,121 @@
+import os
+
+import pytest
+
+from cv_migrator.cv_model import to_plain
+from cv_migrator.old_text_to_yaml import parse_tex_file, tex_to_dict
+from cv_migrator.tex_includes import FragmentCache, IncludeGraph, IncludeResolver, resolve_include
+
+PUBLICATIONS = (
+    "\\subsection{Publications}\n"
+    "\\cventry{2021}{A paper}{Journal}{A. Corbat}{}{}\n"
+)
+
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf8")
+    return path
+
+
+def convert(document):
+    resolver = IncludeResolver(document, parse_tex_file, cache=None)
+    return to_plain(tex_to_dict(document.read_text(encoding="utf8"), resolver)), resolver
+
+
+def test_include_always_adds_the_tex_suffix(tmp_path):
+    write(tmp_path / "part", "")
+
+    assert resolve_include("\\include", "part", tmp_path) == tmp_path / "part.tex"
+    assert resolve_include("\\include", "part.tex", tmp_path) == tmp_path / "part.tex"
+
+
+def test_input_adds_the_tex_suffix_unless_only_the_bare_file_exists(tmp_path):
+    write(tmp_path / "bare", "")
+    write(tmp_path / "both", "")
+    write(tmp_path / "both.tex", "")
+
+    assert resolve_include("\\input", "bare", tmp_path) == tmp_path / "bare"
+    assert resolve_include("\\input", "both", tmp_path) == tmp_path / "both.tex"
+    assert resolve_include("\\input", "missing", tmp_path) == tmp_path / "missing.tex"
+    assert resolve_include("\\input", " sections/part.tex ", tmp_path) == \
+        tmp_path / "sections" / "part.tex"
+
+
+def test_included_files_are_read_where_they_are_included(tmp_path):
+    main = write(tmp_path / "main.tex", "\\section{Production}\n\\input{sections/pubs}\n")
+    pubs = write(tmp_path / "sections" / "pubs.tex", PUBLICATIONS)
+
+    content, resolver = convert(main)
+
+    assert [entry["title"] for entry in content["Production"]["Publications"]] == ["A paper"]
+    assert resolver.files() == [pubs.resolve()]
+
+
+def test_include_cycles_are_an_error(tmp_path):
+    main = write(tmp_path / "main.tex", "\\section{A}\n\\input{b}\n")
+    write(tmp_path / "b.tex", "Text\n\\input{main}\n")
+
+    with pytest.raises(ValueError, match=r"\\input\{main\} on line 2 of b.tex includes main.tex "
+                                         r"within itself"):
+        convert(main)
+
+
+def test_missing_includes_are_an_error(tmp_path):
+    main = write(tmp_path / "main.tex", "\\section{A}\n\\include{missing}\n")
+
+    with pytest.raises(ValueError, match="missing.tex does not exist"):
+        convert(main)
+
+
+def test_fragments_are_parsed_again_when_their_file_changes(tmp_path):
+    pubs = write(tmp_path / "pubs.tex", PUBLICATIONS)
+    main = write(tmp_path / "main.tex", "\\section{Production}\n\\input{pubs}\n")
+    parsed = []
+
+    def parse(path):
+        parsed.append(path.name)
+        return parse_tex_file(path)
+
+    cache = FragmentCache()
+    for _ in range(2):
+        IncludeResolver(main, parse, cache=cache).prefetch(parse_tex_file(main))
+    assert parsed == ["pubs.tex"]
+
+    write(pubs, PUBLICATIONS.replace("A paper", "A longer paper"))
+    resolver = IncludeResolver(main, parse, cache=cache)
+    resolver.prefetch(parse_tex_file(main))
+    _, events = resolver.load("\\input", "pubs", main, 2)
+
+    assert parsed == ["pubs.tex", "pubs.tex"]
+    assert events[1][1][1] == "A longer paper"
+
+
+def test_fragment_cache_evicts_the_least_recently_used(tmp_path):
+    paths = [write(tmp_path / f"{name}.tex", name) for name in "abc"]
+    cache = FragmentCache(max_entries=2)
+    for path in paths[:2]:
+        cache.put(path, [path.stem], (os.stat(path).st_mtime_ns, os.stat(path).st_size))
+    cache.get(paths[0])
+    cache.put(paths[2], ["c"], (os.stat(paths[2]).st_mtime_ns, os.stat(paths[2]).st_size))
+
+    assert [cache.get(path) for path in paths] == [["a"], None, ["c"]]
+
+
+def test_changed_fragments_rebuild_the_documents_including_them(tmp_path):
+    write(tmp_path / "pubs.tex", PUBLICATIONS)
+    write(tmp_path / "talks.tex", "\\input{pubs}\n")
+    documents = [write(tmp_path / f"main_{language}.tex", f"\\section{{S}}\n\\input{{{part}}}\n")
+                 for language, part in (("en", "talks"), ("es", "pubs"))]
+    other = write(tmp_path / "other.tex", "\\section{Other}\n")
+    graph = IncludeGraph(tmp_path / "graph.json")
+    for document in documents + [other]:
+        graph.record(document, convert(document)[1].includes)
+    graph.save()
+    graph = IncludeGraph.load(tmp_path / "graph.json")
+
+    assert graph.documents_to_rebuild([tmp_path / "pubs.tex"]) == \
+        [document.resolve() for document in documents]
+    assert graph.documents_to_rebuild([tmp_path / "talks.tex"]) == [documents[0].resolve()]
+    assert graph.documents_to_rebuild([other, tmp_path / "new.tex"]) == \
+        [tmp_path / "new.tex", other]
@@ -0,0 +1,95 @@
+import copy
+
+from cv_migrator.cv_model import to_plain
+from cv_migrator.old_text_to_yaml import tex_to_dict
+from cv_migrator.tex_update import update_tex_file, update_tex_text
+
+CV = (
+    "\\documentclass{moderncv}\n"
+    "\\begin{document}\n"
+    "\\section{Experience}\n"
+    "\\subsection{Teaching}\n"
+    "% Most recent first.\n"
+    "\\cventry{2018}{Teaching Assistant}{UBA}{Buenos Aires}{}{Physics 1 \\\\\n"
+    "Physics 2}\n"
+    "\\cventry{2017}{Tutor}{UBA}{Buenos Aires}{}{}\n"
+    "\n"
+    "\\section{Production}\n"
+    "\\subsection{Publications}\n"
+    "\\cventry{2021}{First paper}{Journal of Stuff}{\\underline{A. Corbat}, B. Author}{}{}\n"
+    "\\cventry{2022}{Second paper}{Nature Stuff}{\\underline{A. Corbat}, B. Author}{}{}\n"
+    "\\subsection{Outreach Experience}\n"
+    "\\cventry{2019}{Science day}{Museum}{A. Corbat}{}{}\n"
+    "\n"
+    "\\end{document}\n"
+)
+
+
+def content():
+    return to_plain(tex_to_dict(CV))
+
+
+def changed_lines(old, new):
+    old_lines, new_lines = old.splitlines(), new.splitlines()
+    return ([line for line in old_lines if line not in new_lines],
+            [line for line in new_lines if line not in old_lines])
+
+
+def test_no_op_update_keeps_the_file(tmp_path):
+    tex = tmp_path / "main.tex"
+    tex.write_bytes(CV.replace("\n", "\r\n").encode("utf8"))
+    mtime_ns = tex.stat().st_mtime_ns
+
+    update = update_tex_file(tex, content())
+
+    assert tex.read_bytes() == CV.replace("\n", "\r\n").encode("utf8")
+    assert tex.stat().st_mtime_ns == mtime_ns
+    assert update.kept == ["Experience", "Production"] and not update.rewritten
+
+
+def test_one_entry_update_rewrites_only_that_entry():
+    cv = content()
+    cv["Production"]["Publications"][1]["title"] = "Second paper, revised"
+
+    new_text, update = update_tex_text(CV, cv)
+
+    assert update.rewritten == ["Production"] and update.kept == ["Experience"]
+    assert changed_lines(CV, new_text) == (
+        ["\\cventry{2022}{Second paper}{Nature Stuff}{\\underline{A. Corbat}, B. Author}{}{}"],
+        ["\\cventry{2022}{Second paper, revised}{Nature Stuff}{\\textbf{A. Corbat}, B. Author}"
+         "{}{}"],
+    )
+    assert to_plain(tex_to_dict(new_text)) == cv
+
+
+def test_entries_around_a_change_keep_their_source():
+    cv = content()
+    teaching = cv["Experience"]["Teaching"]
+    teaching[1]["date"] = "2016"
+    teaching.insert(1, dict(teaching[1], name="Mentor"))
+    del cv["Production"]["Publications"][0]
+
+    new_text, update = update_tex_text(CV, cv)
+
+    assert update.rewritten == ["Experience", "Production"]
+    assert "% Most recent first.\n" in new_text
+    assert "{Physics 1 \\\\\nPhysics 2}\n" in new_text
+    assert changed_lines(CV, new_text) == (
+        ["\\cventry{2017}{Tutor}{UBA}{Buenos Aires}{}{}",
+         "\\cventry{2021}{First paper}{Journal of Stuff}{\\underline{A. Corbat}, B. Author}{}{}"],
+        ["\\cventry{2016}{Mentor}{UBA}{Buenos Aires}{}{}",
+         "\\cventry{2016}{Tutor}{UBA}{Buenos Aires}{}{}"],
+    )
+    assert to_plain(tex_to_dict(new_text)) == cv
+
+
+def test_new_subsections_render_the_whole_section():
+    cv = content()
+    cv["Production"]["Posters"] = []
+    expected = copy.deepcopy(cv)
+
+    new_text, update = update_tex_text(CV, cv)
+
+    assert update.rewritten == ["Production"]
+    assert "\\underline" not in new_text and "\\subsection{Posters}\n" in new_text
+    assert to_plain(tex_to_dict(new_text)) == expected
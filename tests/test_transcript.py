@@ -0,0 +1,50 @@
+from cv_migrator.cv_model import to_plain
+from cv_migrator.old_text_to_yaml import parse_tex_file, tex_to_dict
+from cv_migrator.tex_includes import IncludeResolver
+from cv_migrator.transcript import read_tex_transcripts, read_transcripts
+
+TRANSCRIPT = (
+    "\\title{University Transcript}\n"
+    "\\section{Licenciatura}\n"
+    "Algebra & 10 & 60 hs \\\\ % retaken\n"
+    "% Analisis & 3 \\\\\n"
+    "Fisica \\textbf{1} & 9 \\\\\n"
+    "\\input{doctorado}\n"
+)
+
+
+def write_cv(tmp_path):
+    (tmp_path / "doctorado.tex").write_text(
+        "\\section{Doctorado}\nOptica & 8 & 40 hs \\\\\n", encoding="utf8")
+    main = tmp_path / "main.tex"
+    main.write_text(TRANSCRIPT, encoding="utf8")
+    return main
+
+
+def columns(table):
+    return list(zip(table.assignments, table.grades, table.durations))
+
+
+def test_comments_are_not_part_of_rows(tmp_path):
+    licenciatura = read_tex_transcripts(write_cv(tmp_path))[0]
+
+    assert columns(licenciatura) == [("Algebra", "10", "60 hs"), ("Fisica **1**", "9", "")]
+    assert list(licenciatura.hours)[0] == 60.0
+
+
+def test_included_transcripts_are_read(tmp_path):
+    tables = read_tex_transcripts(write_cv(tmp_path))
+
+    assert [table.degree for table in tables] == ["Licenciatura", "Doctorado"]
+    assert columns(tables[1]) == [("Optica", "8", "40 hs")]
+
+
+def test_rows_match_the_yaml_conversion(tmp_path):
+    main = write_cv(tmp_path)
+    content = to_plain(tex_to_dict(main.read_text(encoding="utf8"),
+                                   IncludeResolver(main, parse_tex_file)))
+
+    for table in read_transcripts(main):
+        rows = {assignment: {"grade": grade, **({"duration": duration} if duration else {})}
+                for assignment, grade, duration in columns(table)}
+        assert rows == content[table.degree]
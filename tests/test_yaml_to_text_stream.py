@@ -0,0 +1,53 @@
+import pytest
+
+from cv_migrator.cv_model import to_plain
+from cv_migrator.emitters import get_emitter
+from cv_migrator.old_text_to_yaml import tex_to_dict
+from cv_migrator.yaml_to_text import convert_yaml_to_tex
+
+CV = (
+    "\\section{Education}\n"
+    "\\subsection{Degrees}\n"
+    "\\cventry{2010--2016}{Licenciatura en \\textbf{Física}}{Universidad de Buenos Aires}"
+    "{Buenos Aires}{}{Thesis: \\textit{Something nice}}\n"
+    "\\section{Experience}\n"
+    "\\subsection{Teaching and Mentoring Experience}\n"
+    "\\cventry{2018}{Teaching Assistant}{UBA}{Buenos Aires}{}{Physics 1 \\\\\n"
+    "Physics 2 with \\href{https://example.com}{a link}}\n"
+    "\\section{Production}\n"
+    "\\subsection{Publications}\n"
+    "\\cventry{2021}{A paper}{Journal of Stuff}{\\underline{A. Corbat}, B. Author}{}"
+    "{DOI: 10.1/1}\n"
+    "\\subsection{Posters and Oral Presentations}\n"
+    "\\cventry{2019}{A poster}{Some Meeting}{\\underline{A. Corbat}}{}{Poster}\n"
+    "\\section{Participation in Conferences and Schools}\n"
+    "\\cventry{2019}{Summer School}{40 hs}{Trieste, Italy}{Language: English}{}\n"
+    "\\section{Languages}\n"
+    "\\cvitemwithcomment{English}{Advanced}{}\n"
+    "\\subsection{International Exams}\n"
+    "\\cventry{2015}{FCE}{}{}{}{Grade A}\n"
+    "\\section{Skills}\n"
+    "\\subsection{Other}\n"
+    "\\cventry{2020}{Misc}{Place}{City}{}{}\n"
+    "Python, LaTeX and \\textbf{microscopy}.\n"
+)
+TRANSCRIPT = (
+    "\\title{University Transcript}\n"
+    "\\section{Licenciatura}\n"
+    "Algebra & 10 & 60 hs \\\\\n"
+    "Fisica \\textbf{1} & 9 \\\\\n"
+)
+
+
+@pytest.mark.parametrize("output_format", ["yaml", "jsonl", "json"])
+@pytest.mark.parametrize("tex", [CV, TRANSCRIPT], ids=["cv", "transcript"])
+def test_streaming_writes_the_same_bytes(tmp_path, tex, output_format):
+    path = tmp_path / f"main.{output_format}"
+    with open(path, 'w', encoding="utf8") as stream:
+        get_emitter(output_format).dump(to_plain(tex_to_dict(tex)), stream)
+
+    expected = convert_yaml_to_tex(path).read_bytes()
+    streamed = convert_yaml_to_tex(path, streaming=True).read_bytes()
+
+    assert b"\\section{" in expected
+    assert streamed == expected